@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""This script measures the time spent by the garbage collector while detecting screen events, and
+the memory retained by the frames, screens, quadrangles, and events produced during the detection.
+
+A synthetic video is used, in which a single projection screen is shown in every frame. The screen
+moves slightly every few frames, and the page shown in the screen changes periodically, so that all
+kinds of screen events are produced.
+
+Usage: python -m benchmark.events [NUM_FRAMES]
+
+"""
+
+from datetime import datetime, timedelta, timezone
+import gc
+import sys
+from time import perf_counter
+import tracemalloc
+
+import numpy as np
+
+from video699.event.screen import ScreenEventDetector, ScreenEventDetectorScreen
+from video699.interface import PageDetectorABC, ScreenDetectorABC, VideoABC
+from video699.quadrangle.geos import GEOSConvexQuadrangle
+from video699.quadrangle.rtree import RTreeDequeConvexQuadrangleTracker
+from video699.video.file import VideoFileFrame
+
+
+NUM_FRAMES = 20000
+VIDEO_FPS = 25
+VIDEO_WIDTH = 64
+VIDEO_HEIGHT = 48
+MOVEMENT_PERIOD = 5
+PAGE_PERIOD = 100
+
+
+class _SyntheticVideo(VideoABC):
+    """A video, whose frames share the same image data.
+
+    Parameters
+    ----------
+    num_frames : int
+        The number of frames in the video.
+    """
+
+    def __init__(self, num_frames):
+        self._num_frames = num_frames
+        self._bgr_image = np.zeros((VIDEO_HEIGHT, VIDEO_WIDTH, 3), dtype=np.uint8)
+
+    @property
+    def fps(self):
+        return VIDEO_FPS
+
+    @property
+    def width(self):
+        return VIDEO_WIDTH
+
+    @property
+    def height(self):
+        return VIDEO_HEIGHT
+
+    @property
+    def datetime(self):
+        return datetime(2018, 1, 1, tzinfo=timezone.utc)
+
+    @property
+    def uri(self):
+        return 'https://github.com/video699/implementation-system/benchmark/events.py'
+
+    def __iter__(self):
+        for frame_index in range(self._num_frames):
+            duration = timedelta(seconds=frame_index / VIDEO_FPS)
+            yield VideoFileFrame(self, frame_index + 1, duration, self._bgr_image)
+
+
+class _SyntheticScreenDetector(ScreenDetectorABC):
+    def __init__(self):
+        self.screens = []
+
+    def detect(self, frame):
+        offset = (frame.number // MOVEMENT_PERIOD) % 2
+        coordinates = GEOSConvexQuadrangle(
+            top_left=(10 + offset, 10),
+            top_right=(50 + offset, 10),
+            bottom_left=(10 + offset, 40),
+            bottom_right=(50 + offset, 40),
+        )
+        screen = ScreenEventDetectorScreen(frame, coordinates)
+        self.screens.append(screen)
+        return (screen, )
+
+
+class _SyntheticPageDetector(PageDetectorABC):
+    def detect(self, frame, appeared_screens, existing_screens, disappeared_screens):
+        page = frame.number // PAGE_PERIOD
+        return {
+            screen: page
+            for screens in (appeared_screens, existing_screens)
+            for screen, _ in screens
+        }
+
+
+def _detect_events(num_frames):
+    screen_detector = _SyntheticScreenDetector()
+    detector = ScreenEventDetector(
+        _SyntheticVideo(num_frames),
+        RTreeDequeConvexQuadrangleTracker(2),
+        screen_detector,
+        _SyntheticPageDetector(),
+    )
+    return list(detector), screen_detector.screens
+
+
+def main():
+    num_frames = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_FRAMES
+
+    gc_durations = []
+
+    def measure_gc(phase, info):
+        if phase == 'start':
+            gc_durations.append(-perf_counter())
+        else:
+            gc_durations[-1] += perf_counter()
+
+    gc.collect()
+    gc.callbacks.append(measure_gc)
+    start = perf_counter()
+    events, screens = _detect_events(num_frames)
+    duration = perf_counter() - start
+    gc.callbacks.remove(measure_gc)
+    del events, screens
+
+    gc.collect()
+    tracemalloc.start()
+    events, screens = _detect_events(num_frames)
+    gc.collect()
+    num_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('{} frames, {} events'.format(num_frames, len(events)))
+    print('Detection:         {:.3f}s, {:.1f}us per frame'.format(
+        duration,
+        duration * 1e6 / num_frames,
+    ))
+    print('Garbage collector: {:.3f}s in {} collections'.format(
+        sum(gc_durations),
+        len(gc_durations),
+    ))
+    print('Retained memory:   {:.0f} bytes per frame'.format(num_bytes / num_frames))
+
+
+if __name__ == '__main__':
+    main()
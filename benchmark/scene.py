@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""This script compares the speed of the scene detection using the RGBA image data of video frames
+with the speed of the scene detection using the downscaled grayscale image data of video frames, and
+with the speed of the scene detection using an adaptive threshold.
+
+The frames of a video are decoded in advance, so that only the scene detection is measured. When no
+video is specified, a synthetic video is used. To help re-check the ``max_mean_distance``
+configuration option on real footage, the script also reports the distances between consecutive
+frames. It computes them both with the wrapping subtraction of the RGBA image data and as the true
+mean absolute difference between thumbnails, scaled by 4/3.
+
+Usage: python -m benchmark.scene [VIDEO_PATHNAME] [NUM_FRAMES]
+
+"""
+
+from datetime import datetime, timezone
+import sys
+from time import perf_counter
+
+import cv2 as cv
+import numpy as np
+
+from video699.common import RGBA_DISTANCE_PER_GRAY_DISTANCE
+from video699.frame.image import ImageFrame
+from video699.interface import VideoABC
+from video699.video.file import VideoFile
+from video699.video.scene import (
+    AdaptiveThresholdSceneDetector,
+    CONFIGURATION,
+    FrameImageDistanceSceneDetector,
+)
+
+
+NUM_REPETITIONS = 3
+SYNTHETIC_NUM_FRAMES = 250
+SYNTHETIC_WIDTH = 1280
+SYNTHETIC_HEIGHT = 720
+SYNTHETIC_SCENE_LENGTH = 25
+
+
+class _DecodedVideo(VideoABC):
+    """A video, whose frames are produced from decoded BGR image data.
+
+    Parameters
+    ----------
+    bgr_images : sequence of array_like
+        The image data of the frames.
+    """
+
+    def __init__(self, bgr_images):
+        self._bgr_images = bgr_images
+
+    @property
+    def fps(self):
+        return 25
+
+    @property
+    def width(self):
+        return self._bgr_images[0].shape[1]
+
+    @property
+    def height(self):
+        return self._bgr_images[0].shape[0]
+
+    @property
+    def datetime(self):
+        return datetime(2018, 1, 1, tzinfo=timezone.utc)
+
+    @property
+    def uri(self):
+        return 'https://github.com/video699/implementation-system/benchmark/scene.py'
+
+    def __iter__(self):
+        for frame_index, bgr_image in enumerate(self._bgr_images):
+            yield ImageFrame(self, frame_index + 1, bgr_image=bgr_image)
+
+
+def _synthetic_images():
+    gradient = np.linspace(0, 64, SYNTHETIC_WIDTH, dtype=np.float32).astype(np.uint8)
+    background = np.dstack([np.tile(gradient, (SYNTHETIC_HEIGHT, 1))] * 3)
+    for frame_index in range(SYNTHETIC_NUM_FRAMES):
+        scene_number = frame_index // SYNTHETIC_SCENE_LENGTH
+        yield cv.add(background, (scene_number * 19, ) * 3 + (0, ))
+
+
+def _decoded_images(pathname, num_frames):
+    video = VideoFile(pathname, datetime.now(timezone.utc))
+    for frame_index, frame in enumerate(video):
+        if frame_index >= num_frames:
+            break
+        yield cv.cvtColor(frame.rgb_image, cv.COLOR_RGB2BGR)
+
+
+def _measure(bgr_images, scene_detector_factory):
+    best_duration, num_scenes = float('inf'), None
+    for _ in range(NUM_REPETITIONS):
+        video = _DecodedVideo(bgr_images)
+        start = perf_counter()
+        num_scenes = sum(1 for _ in scene_detector_factory(video))
+        best_duration = min(best_duration, perf_counter() - start)
+    return best_duration, num_scenes
+
+
+def _distances(bgr_images):
+    rgba_distances, thumbnail_distances = [], []
+    frames = list(_DecodedVideo(bgr_images))
+    for previous_frame, current_frame in zip(frames, frames[1:]):
+        rgba_distances.append(np.mean((current_frame.image - previous_frame.image) / 255.0))
+        thumbnail_distances.append(
+            cv.norm(current_frame.thumbnail_image, previous_frame.thumbnail_image, cv.NORM_L1) /
+            255.0 / current_frame.thumbnail_image.size * RGBA_DISTANCE_PER_GRAY_DISTANCE
+        )
+    return rgba_distances, thumbnail_distances
+
+
+def main():
+    if len(sys.argv) > 1:
+        num_frames = int(sys.argv[2]) if len(sys.argv) > 2 else SYNTHETIC_NUM_FRAMES
+        bgr_images = list(_decoded_images(sys.argv[1], num_frames))
+    else:
+        bgr_images = list(_synthetic_images())
+    height, width, _ = bgr_images[0].shape
+    print('{} frames, {}x{}px, best of {} repetitions'.format(
+        len(bgr_images),
+        width,
+        height,
+        NUM_REPETITIONS,
+    ))
+    rgba_duration, rgba_num_scenes = _measure(bgr_images, FrameImageDistanceSceneDetector)
+    print('RGBA image data:      {:.3f}s, {:.2f}ms per frame, {} scenes'.format(
+        rgba_duration,
+        rgba_duration * 1000 / len(bgr_images),
+        rgba_num_scenes,
+    ))
+    thumbnail_duration, thumbnail_num_scenes = _measure(
+        bgr_images,
+        lambda video: FrameImageDistanceSceneDetector(video, thumbnails=True),
+    )
+    print('Grayscale thumbnails: {:.3f}s, {:.2f}ms per frame, {} scenes'.format(
+        thumbnail_duration,
+        thumbnail_duration * 1000 / len(bgr_images),
+        thumbnail_num_scenes,
+    ))
+    print('Speedup: {:.1f}x'.format(rgba_duration / thumbnail_duration))
+    if len(bgr_images) > 1:
+        print('Distances between consecutive frames (median, 95th percentile, maximum):')
+        for name, distances in zip(('RGBA image data', 'Grayscale thumbnails'), _distances(bgr_images)):
+            print('  {:21} {:.4f}, {:.4f}, {:.4f}'.format(
+                name + ':',
+                *np.percentile(distances, (50, 95, 100)),
+            ))
+        print('  max_mean_distance:    {:.4f}'.format(CONFIGURATION.getfloat('max_mean_distance')))
+    adaptive_duration, adaptive_num_scenes = _measure(bgr_images, AdaptiveThresholdSceneDetector)
+    print('Adaptive threshold:   {:.3f}s, {:.2f}ms per frame, {} scenes'.format(
+        adaptive_duration,
+        adaptive_duration * 1000 / len(bgr_images),
+        adaptive_num_scenes,
+    ))
+
+
+if __name__ == '__main__':
+    main()
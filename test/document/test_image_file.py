@@ -2,10 +2,11 @@
 
 import os
 import unittest
+from unittest.mock import patch
 
 import cv2 as cv
 
-from video699.document.image_file import ImageFileDocument
+from video699.document.image_file import ImageFileDocument, ImageFileDocumentPage
 
 
 RESOURCES_PATHNAME = os.path.join(os.path.dirname(__file__), 'test_image_file')
@@ -136,6 +137,52 @@ class TestImageFileDocumentPage(unittest.TestCase):
         for coordinates in screen_corners:
             self.assertEqual(0, alpha[coordinates])
 
+    def test_render_many(self):
+        sizes = (
+            (PAGE_IMAGE_WIDTH // 10, PAGE_IMAGE_HEIGHT // 10),
+            (PAGE_IMAGE_WIDTH // 2 + PAGE_IMAGE_HORIZONTAL_MARGIN, PAGE_IMAGE_HEIGHT // 2),
+            (PAGE_IMAGE_WIDTH // 4, PAGE_IMAGE_HEIGHT // 4),
+        )
+        images = self.first_page.render_many(sizes)
+        self.assertEqual(len(sizes), len(images))
+        for (width, height), image in zip(sizes, images):
+            self.assertEqual((height, width, 4), image.shape)
+            self.assertIs(image, self.first_page.render(width, height))
+
+            red, green, blue, alpha = cv.split(image)
+            position = (height * 5 // 16, width // 2)
+            self.assertEqual(0, blue[position])
+            self.assertEqual(0, green[position])
+            self.assertEqual(255, red[position])
+            self.assertEqual(255, alpha[position])
+
+        *_, alpha = cv.split(images[1])
+        self.assertEqual(0, alpha[0, 0])
+        self.assertEqual(0, alpha[-1, -1])
+
+    def test_render_rgb(self):
+        width = PAGE_IMAGE_WIDTH // 4 + PAGE_IMAGE_HORIZONTAL_MARGIN
+        height = PAGE_IMAGE_HEIGHT // 4
+        rgb_image = self.first_page.render_rgb(width, height)
+        self.assertEqual((height, width, 3), rgb_image.shape)
+
+        red, green, blue = cv.split(rgb_image)
+        position = (height * 5 // 16, width // 2)
+        self.assertEqual(0, blue[position])
+        self.assertEqual(0, green[position])
+        self.assertEqual(255, red[position])
+        self.assertEqual(0, red[0, 0])
+        self.assertEqual(0, red[-1, -1])
+
+    def test_prerender_rgb(self):
+        size = (PAGE_IMAGE_WIDTH // 10, PAGE_IMAGE_HEIGHT // 10)
+        with patch.object(ImageFileDocumentPage, 'render_rgb', autospec=True) as render_rgb:
+            pages = list(self.document.prerender((size, ), rgb=True))
+        self.assertEqual([self.first_page, self.second_page], pages)
+        self.assertEqual(2, render_rgb.call_count)
+        render_rgb.assert_any_call(self.first_page, *size)
+        render_rgb.assert_any_call(self.second_page, *size)
+
 
 if __name__ == '__main__':
     unittest.main()
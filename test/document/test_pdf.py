@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 
 import os
+from tempfile import TemporaryDirectory
 import unittest
+from unittest.mock import patch
 
 import cv2 as cv
+import fitz
+import numpy as np
 
-from video699.document.pdf import PDFDocument
+from video699.cache import get_render_cache
+from video699.document.pdf import CONFIGURATION, DOCUMENT_CONFIGURATION, PDFDocument
 
 
 DOCUMENT_PATHNAME = os.path.join(
@@ -19,6 +24,15 @@ PAGE_IMAGE_WIDTH = 2550
 PAGE_IMAGE_HEIGHT = 3300
 PAGE_IMAGE_HORIZONTAL_MARGIN = 100
 PAGE_IMAGE_VERTICAL_MARGIN = 200
+IMAGE_CACHE = CONFIGURATION['image_cache']
+
+
+def setUpModule():
+    CONFIGURATION['image_cache'] = 'no'
+
+
+def tearDownModule():
+    CONFIGURATION['image_cache'] = IMAGE_CACHE
 
 
 class TestPDFDocument(unittest.TestCase):
@@ -40,6 +54,60 @@ class TestPDFDocument(unittest.TestCase):
         with self.assertRaises(StopIteration):
             next(page_iterator)
 
+    def test_opens_without_rendering(self):
+        with patch.object(fitz.Page, 'getPixmap', side_effect=AssertionError):
+            document = PDFDocument(DOCUMENT_PATHNAME)
+            page = next(iter(document))
+            self.assertEqual(612, page._default_width)
+            self.assertEqual(792, page._default_height)
+
+
+class TestPDFDocumentPrerender(unittest.TestCase):
+    """Tests the ability of the PDFDocument class to render pages in advance in parallel.
+
+    """
+
+    def setUp(self):
+        self.document = PDFDocument(DOCUMENT_PATHNAME)
+        self.configuration = dict(DOCUMENT_CONFIGURATION)
+        DOCUMENT_CONFIGURATION['num_workers'] = '2'
+        DOCUMENT_CONFIGURATION['min_num_parallel_pages'] = '1'
+
+    def tearDown(self):
+        for key, value in self.configuration.items():
+            DOCUMENT_CONFIGURATION[key] = value
+
+    def test_prerender(self):
+        sizes = ((100, 100), (50, 60))
+        pages = list(self.document.prerender(sizes))
+        self.assertEqual(list(self.document), pages)
+
+        namespace = get_render_cache().namespace('PDFDocumentPage.render')
+        for page in pages:
+            for width, height in sizes:
+                num_hits = namespace.num_hits
+                image = page.render(width, height)
+                self.assertEqual(num_hits + 1, namespace.num_hits)
+                self.assertEqual((height, width, 4), image.shape)
+
+        pages = list(self.document.prerender(sizes, rgb=True))
+        namespace = get_render_cache().namespace('PDFDocumentPage.render_rgb')
+        for page in pages:
+            for width, height in sizes:
+                num_hits = namespace.num_hits
+                image = page.render_rgb(width, height)
+                self.assertEqual(num_hits + 1, namespace.num_hits)
+                self.assertEqual((height, width, 3), image.shape)
+
+        DOCUMENT_CONFIGURATION['num_workers'] = '1'
+        document = PDFDocument(DOCUMENT_PATHNAME)
+        for page, serial_page in zip(pages, document.prerender(sizes)):
+            for width, height in sizes:
+                self.assertTrue(np.array_equal(
+                    page.render(width, height),
+                    serial_page.render(width=width, height=height),
+                ))
+
 
 class TestPDFDocumentPage(unittest.TestCase):
     """Tests the ability of the PDFDocumentPage class to render pages and produce page numbers.
@@ -118,6 +186,27 @@ class TestPDFDocumentPage(unittest.TestCase):
         self.assertEqual(0, red[position])
         self.assertEqual(255, alpha[position])
 
+    def test_render_rgb(self):
+        width = PAGE_IMAGE_WIDTH // 4 + PAGE_IMAGE_HORIZONTAL_MARGIN
+        height = PAGE_IMAGE_HEIGHT // 4
+        rgb_image = self.first_page.render_rgb(width, height)
+        self.assertEqual((height, width, 3), rgb_image.shape)
+        self.assertIs(rgb_image, self.first_page.render_rgb(width=width, height=height))
+
+        red, green, blue = cv.split(rgb_image)
+        position = (height * 5 // 16, width // 2)
+        self.assertEqual(0, blue[position])
+        self.assertEqual(0, green[position])
+        self.assertEqual(255, red[position])
+        for position in ((0, 0), (height - 1, width - 1)):
+            self.assertEqual(0, blue[position])
+            self.assertEqual(0, green[position])
+            self.assertEqual(0, red[position])
+
+        rgba_image = self.first_page.render(width, height)
+        difference = cv.absdiff(cv.cvtColor(rgba_image, cv.COLOR_RGBA2RGB), rgb_image)
+        self.assertLess(difference.mean(), 2.0)
+
     def test_wider_aspect_ratio(self):
         image = self.first_page.render(
             PAGE_IMAGE_WIDTH + PAGE_IMAGE_HORIZONTAL_MARGIN,
@@ -161,5 +250,49 @@ class TestPDFDocumentPage(unittest.TestCase):
             self.assertEqual(0, alpha[coordinates])
 
 
+class TestPDFDocumentPageImageCache(unittest.TestCase):
+    """Tests the ability of the PDFDocumentPage class to store rendered pages in the cache directory.
+
+    """
+
+    def setUp(self):
+        self.configuration = dict(CONFIGURATION)
+        CONFIGURATION['image_cache'] = 'yes'
+        self.cache_dirname = TemporaryDirectory()
+        self.cache_dirname_patch = patch(
+            'video699.document.pdf.get_cache_dirname',
+            return_value=self.cache_dirname.name,
+        )
+        self.cache_dirname_patch.start()
+
+    def tearDown(self):
+        self.cache_dirname_patch.stop()
+        self.cache_dirname.cleanup()
+        for key, value in self.configuration.items():
+            CONFIGURATION[key] = value
+
+    def _render(self, width, height):
+        get_render_cache().clear()
+        page = next(iter(PDFDocument(DOCUMENT_PATHNAME)))
+        return page.render(width, height)
+
+    def test_rerender_from_cache(self):
+        for compression in ('yes', 'no'):
+            CONFIGURATION['image_cache_compression'] = compression
+            image = self._render(100, 120)
+            with patch('video699.document.pdf._render_page', side_effect=AssertionError):
+                cached_image = self._render(100, 120)
+            self.assertTrue(np.array_equal(image, cached_image))
+        self.assertEqual(2, len(os.listdir(self.cache_dirname.name)))
+
+    def test_eviction(self):
+        CONFIGURATION['image_cache_max_bytes'] = '1'
+        image = self._render(100, 130)
+        with patch('video699.document.pdf._render_page', return_value=image) as render_page:
+            self._render(100, 130)
+        render_page.assert_called_once()
+        self.assertEqual([], os.listdir(self.cache_dirname.name))
+
+
 if __name__ == '__main__':
     unittest.main()
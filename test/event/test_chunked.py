@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+from functools import partial
+from io import BytesIO
+import os
+import unittest
+
+from lxml import etree
+from lxml.etree import xmlfile, XMLSchema
+
+from video699.document.image_file import ImageFileDocument
+from video699.event.chunked import CONFIGURATION, ChunkedScreenEventDetector
+from video699.event.screen import (
+    ScreenEventDetector,
+    ScreenEventDetectorVideo,
+    ScreenEventDetectorScreenDetector,
+    ScreenEventDetectorPageDetector,
+)
+from video699.interface import VideoABC
+from video699.quadrangle.rtree import RTreeDequeConvexQuadrangleTracker
+from test.document.test_image_file import FIRST_PAGE_IMAGE_PATHNAME, SECOND_PAGE_IMAGE_PATHNAME
+from test.event.test_screen import (
+    VIDEO_FPS,
+    VIDEO_WIDTH,
+    VIDEO_HEIGHT,
+    VIDEO_DATETIME,
+    FIRST_COORDINATES,
+    SECOND_COORDINATES,
+)
+
+
+XML_SCHEMA_PATHNAME = os.path.join(os.path.dirname(__file__), 'schema.xsd')
+
+
+class _FrameRangeVideo(VideoABC):
+    """A video that contains only the frames of another video in a range.
+
+    The video reports a nominal framerate and an estimated number of frames, which need not match
+    the frames of the other video, such as a video file with a variable framerate. Like a video
+    file with a frame stride, the video skips frames counted from the first frame in the range.
+
+    """
+
+    def __init__(self, video, first_frame_number=1, last_frame_number=None, fps=None,
+                 num_frames=None, frame_stride=1):
+        self._video = video
+        self._first_frame_number = first_frame_number
+        self._last_frame_number = last_frame_number
+        self._fps = fps if fps is not None else video.fps
+        self._frame_stride = frame_stride
+        self.num_frames = num_frames
+
+    @property
+    def fps(self):
+        return self._fps
+
+    @property
+    def width(self):
+        return self._video.width
+
+    @property
+    def height(self):
+        return self._video.height
+
+    @property
+    def datetime(self):
+        return self._video.datetime
+
+    @property
+    def uri(self):
+        return self._video.uri
+
+    def frames(self, start=None, end=None):
+        return iter(_FrameRangeVideo(
+            self._video, start or 1, end, self._fps, self.num_frames, self._frame_stride,
+        ))
+
+    def __iter__(self):
+        for frame in self._video:
+            if frame.number < self._first_frame_number:
+                continue
+            if self._last_frame_number is not None and frame.number > self._last_frame_number:
+                break
+            if (frame.number - self._first_frame_number) % self._frame_stride:
+                continue
+            yield frame
+
+
+def _video(num_repetitions=1):
+    document = ImageFileDocument((FIRST_PAGE_IMAGE_PATHNAME, SECOND_PAGE_IMAGE_PATHNAME))
+    first_page, second_page = document
+    return ScreenEventDetectorVideo(
+        fps=VIDEO_FPS,
+        width=VIDEO_WIDTH,
+        height=VIDEO_HEIGHT,
+        datetime=VIDEO_DATETIME,
+        quadrangles=(
+            FIRST_COORDINATES,
+            FIRST_COORDINATES,
+            SECOND_COORDINATES,
+            SECOND_COORDINATES,
+            SECOND_COORDINATES,
+            FIRST_COORDINATES,
+        ) * num_repetitions,
+        pages=(
+            first_page,
+            second_page,
+            second_page,
+            first_page,
+            None,
+            second_page,
+        ) * num_repetitions,
+    )
+
+
+def _event_detector(first_frame_number, last_frame_number, num_repetitions=1, frame_stride=1):
+    return ScreenEventDetector(
+        _FrameRangeVideo(
+            _video(num_repetitions),
+            first_frame_number,
+            last_frame_number,
+            frame_stride=frame_stride,
+        ),
+        RTreeDequeConvexQuadrangleTracker(),
+        ScreenEventDetectorScreenDetector(),
+        ScreenEventDetectorPageDetector(),
+    )
+
+
+def _write_xml(event_detector):
+    f = BytesIO()
+    with xmlfile(f) as xf:
+        event_detector.write_xml(xf)
+    f.seek(0)
+    return etree.parse(f)
+
+
+class TestChunkedScreenEventDetector(unittest.TestCase):
+    """Tests the ability of the ChunkedScreenEventDetector class to stitch screen events.
+
+    """
+
+    def setUp(self):
+        self.xml_schema = XMLSchema(file=XML_SCHEMA_PATHNAME)
+        self.video = _FrameRangeVideo(_video())
+        self.num_frames = len(list(self.video))
+        self.expected_xml_document = _write_xml(_event_detector(1, self.num_frames))
+
+    def test_empty(self):
+        detector = ChunkedScreenEventDetector(
+            self.video,
+            _event_detector,
+            last_frame_number=0,
+            num_processes=2,
+        )
+        self.assertEqual([], list(detector))
+
+    def test_same_as_sequential(self):
+        for num_chunks in (1, 2, 3, self.num_frames):
+            detector = ChunkedScreenEventDetector(
+                self.video,
+                _event_detector,
+                last_frame_number=self.num_frames,
+                num_processes=2,
+                num_chunks=num_chunks,
+            )
+            xml_document = _write_xml(detector)
+            self.xml_schema.assertValid(xml_document)
+            self.assertEqual(
+                etree.tostring(self.expected_xml_document),
+                etree.tostring(xml_document),
+            )
+
+    def test_same_as_sequential_with_overlapping_chunks(self):
+        num_repetitions = 4
+        num_overlap_frames = CONFIGURATION['num_overlap_frames']
+        CONFIGURATION['num_overlap_frames'] = '2'
+        try:
+            for frame_stride in (1, 2, 3):
+                event_detector = partial(
+                    _event_detector,
+                    num_repetitions=num_repetitions,
+                    frame_stride=frame_stride,
+                )
+                video = _FrameRangeVideo(
+                    _video(num_repetitions),
+                    fps=VIDEO_FPS * 2,
+                    frame_stride=frame_stride,
+                )
+                num_frames = len(list(_FrameRangeVideo(_video(num_repetitions))))
+                expected_xml_document = _write_xml(event_detector(1, None))
+                for num_chunks in (2, 3, 5):
+                    for last_frame_number, estimated_num_frames in (
+                                (num_frames, None),
+                                (None, num_frames - 4),
+                                (None, num_frames + 4),
+                            ):
+                        video.num_frames = estimated_num_frames
+                        detector = ChunkedScreenEventDetector(
+                            video,
+                            event_detector,
+                            last_frame_number=last_frame_number,
+                            num_processes=2,
+                            num_chunks=num_chunks,
+                            frame_stride=frame_stride,
+                        )
+                        xml_document = _write_xml(detector)
+                        self.xml_schema.assertValid(xml_document)
+                        self.assertEqual(
+                            etree.tostring(expected_xml_document),
+                            etree.tostring(xml_document),
+                        )
+        finally:
+            CONFIGURATION['num_overlap_frames'] = num_overlap_frames
+
+
+if __name__ == '__main__':
+    unittest.main()
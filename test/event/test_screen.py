@@ -1,15 +1,20 @@
 # -*- coding: utf-8 -*-
 
+from datetime import datetime, timedelta, timezone
 from io import BytesIO
 import os
+from tempfile import TemporaryDirectory
 import unittest
 
+import cv2 as cv
 from dateutil.parser import parse as datetime_parse
 from lxml import etree
 from lxml.etree import xmlfile, XMLSchema
+import numpy as np
 
 from video699.document.image_file import ImageFileDocument
 from video699.event.screen import (
+    MultiCameraScreenEventDetector,
     ScreenEventDetector,
     ScreenEventDetectorVideo,
     ScreenEventDetectorScreenDetector,
@@ -21,6 +26,8 @@ from video699.event.screen import (
 )
 from video699.quadrangle.geos import GEOSConvexQuadrangle
 from video699.quadrangle.rtree import RTreeDequeConvexQuadrangleTracker
+from video699.video.scene import FrameImageDistanceSceneDetector
+from video699.video.stream import StreamVideo
 from test.document.test_image_file import FIRST_PAGE_IMAGE_PATHNAME, SECOND_PAGE_IMAGE_PATHNAME
 
 VIDEO_FPS = 15
@@ -32,6 +39,28 @@ SECOND_COORDINATES = GEOSConvexQuadrangle((20, 20), (40, 20), (20, 40), (40, 40)
 XML_SCHEMA_PATHNAME = os.path.join(os.path.dirname(__file__), 'schema.xsd')
 
 
+def write_video(pathname, bgr_images, fps=VIDEO_FPS):
+    """Writes synthetic video frames to a Motion JPEG video file.
+
+    Parameters
+    ----------
+    pathname : str
+        The pathname of the video file.
+    bgr_images : iterable of array_like
+        The image data of the video frames as OpenCV CV_8UC3 BGR matrices of the same size.
+    fps : scalar, optional
+        The framerate of the video in frames per second. ``VIDEO_FPS`` if unspecified.
+    """
+
+    writer = None
+    for bgr_image in bgr_images:
+        if writer is None:
+            height, width, _ = bgr_image.shape
+            writer = cv.VideoWriter(pathname, cv.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+        writer.write(bgr_image)
+    writer.release()
+
+
 class TestScreenEventDetector(unittest.TestCase):
     """Tests the ability of the ScreenEventDetector class to produce events, and valid XML output.
 
@@ -146,6 +175,188 @@ class TestScreenEventDetector(unittest.TestCase):
         xml_document = etree.parse(f)
         self.xml_schema.assertValid(xml_document)
 
+    def test_streaming(self):
+        quadrangles = (FIRST_COORDINATES, FIRST_COORDINATES, SECOND_COORDINATES)
+        pages = (self.first_page, self.second_page, self.second_page)
+        video = ScreenEventDetectorVideo(
+            fps=VIDEO_FPS,
+            width=VIDEO_WIDTH,
+            height=VIDEO_HEIGHT,
+            datetime=datetime.now(timezone.utc),
+            quadrangles=quadrangles,
+            pages=pages,
+        )
+        detector = ScreenEventDetector(
+            video,
+            self.quadrangle_tracker,
+            self.screen_detector,
+            self.page_detector,
+            latency_budget=timedelta(hours=1),
+        )
+        screen_events = list(detector)
+        self.assertEqual(4, len(screen_events))
+        self.assertEqual(4, len(detector.latencies))
+        for latency in detector.latencies:
+            self.assertLess(latency, timedelta(hours=1))
+
+        video = ScreenEventDetectorVideo(
+            fps=VIDEO_FPS,
+            width=VIDEO_WIDTH,
+            height=VIDEO_HEIGHT,
+            datetime=VIDEO_DATETIME,
+            quadrangles=quadrangles,
+            pages=pages,
+        )
+        detector = ScreenEventDetector(
+            video,
+            self.quadrangle_tracker,
+            self.screen_detector,
+            self.page_detector,
+            latency_budget=timedelta(hours=1),
+        )
+        screen_events = list(detector)
+        self.assertEqual(4, len(screen_events))
+        self.assertEqual(4, len(detector.latencies))
+        for latency in detector.latencies:
+            self.assertGreater(latency, timedelta(hours=1))
+
+    def test_streaming_scene_detector(self):
+        num_frames = 10
+        with TemporaryDirectory() as dirname:
+            pathname = os.path.join(dirname, 'stream.avi')
+            write_video(pathname, (
+                np.full((VIDEO_HEIGHT // 8, VIDEO_WIDTH // 8, 3), frame_number * 20, dtype=np.uint8)
+                for frame_number in range(num_frames)
+            ))
+
+            video = StreamVideo(
+                pathname,
+                queue_size=num_frames,
+                latency_budget=timedelta(hours=1),
+                buffer_pool=True,
+            )
+            detector = ScreenEventDetector(
+                FrameImageDistanceSceneDetector(video),
+                self.quadrangle_tracker,
+                self.screen_detector,
+                self.page_detector,
+                latency_budget=timedelta(),
+            )
+            screen_events = list(detector)
+            video.close()
+        self.assertEqual(0, len(screen_events))
+        self.assertEqual(0, video.num_dropped_frames)
+
+
+class TestMultiCameraScreenEventDetector(unittest.TestCase):
+    """Tests the ability of the MultiCameraScreenEventDetector class to merge events from videos.
+
+    """
+
+    def setUp(self):
+        image_pathnames = (
+            FIRST_PAGE_IMAGE_PATHNAME,
+            SECOND_PAGE_IMAGE_PATHNAME,
+        )
+        self.document = ImageFileDocument(image_pathnames)
+        page_iterator = iter(self.document)
+        self.first_page = next(page_iterator)
+        self.second_page = next(page_iterator)
+
+        self.xml_schema = XMLSchema(file=XML_SCHEMA_PATHNAME)
+        self.screen_detector = ScreenEventDetectorScreenDetector()
+        self.page_detector = ScreenEventDetectorPageDetector()
+
+        self.first_video = ScreenEventDetectorVideo(
+            fps=VIDEO_FPS,
+            width=VIDEO_WIDTH,
+            height=VIDEO_HEIGHT,
+            datetime=VIDEO_DATETIME,
+            quadrangles=(FIRST_COORDINATES, FIRST_COORDINATES),
+            pages=(self.first_page, self.second_page),
+        )
+        self.second_video = ScreenEventDetectorVideo(
+            fps=VIDEO_FPS,
+            width=VIDEO_WIDTH,
+            height=VIDEO_HEIGHT,
+            datetime=VIDEO_DATETIME,
+            quadrangles=(SECOND_COORDINATES,),
+            pages=(self.second_page,),
+        )
+
+    def test_merges_events(self):
+        num_detect_calls = []
+        detect_many = self.page_detector.detect_many
+
+        def counting_detect_many(frames_screens):
+            frames_screens = list(frames_screens)
+            num_detect_calls.append(len(frames_screens))
+            return detect_many(frames_screens)
+
+        self.page_detector.detect_many = counting_detect_many
+        detector = MultiCameraScreenEventDetector(
+            (self.first_video, self.second_video),
+            (RTreeDequeConvexQuadrangleTracker(), RTreeDequeConvexQuadrangleTracker()),
+            self.screen_detector,
+            self.page_detector,
+        )
+        self.assertEqual(self.first_video, detector.video)
+        screen_events = list(detector)
+        self.assertEqual([2, 2, 1], num_detect_calls)
+        self.assertEqual(5, len(screen_events))
+        screen_event_iterator = iter(screen_events)
+
+        screen_event = next(screen_event_iterator)
+        self.assertTrue(isinstance(screen_event, ScreenAppearedEvent))
+        first_screen_id = screen_event.screen_id
+        self.assertEqual(self.first_video, screen_event.frame.video)
+        self.assertEqual(1, screen_event.frame.number)
+        self.assertEqual(self.first_page, screen_event.page)
+
+        screen_event = next(screen_event_iterator)
+        self.assertTrue(isinstance(screen_event, ScreenAppearedEvent))
+        second_screen_id = screen_event.screen_id
+        self.assertNotEqual(first_screen_id, second_screen_id)
+        self.assertEqual(self.second_video, screen_event.frame.video)
+        self.assertEqual(1, screen_event.frame.number)
+        self.assertEqual(self.second_page, screen_event.page)
+
+        screen_event = next(screen_event_iterator)
+        self.assertTrue(isinstance(screen_event, ScreenChangedContentEvent))
+        self.assertEqual(first_screen_id, screen_event.screen_id)
+        self.assertEqual(self.first_video, screen_event.frame.video)
+        self.assertEqual(2, screen_event.frame.number)
+
+        screen_event = next(screen_event_iterator)
+        self.assertTrue(isinstance(screen_event, ScreenDisappearedEvent))
+        self.assertEqual(second_screen_id, screen_event.screen_id)
+        self.assertEqual(self.second_video, screen_event.frame.video)
+        self.assertEqual(2, screen_event.frame.number)
+
+        screen_event = next(screen_event_iterator)
+        self.assertTrue(isinstance(screen_event, ScreenDisappearedEvent))
+        self.assertEqual(first_screen_id, screen_event.screen_id)
+        self.assertEqual(self.first_video, screen_event.frame.video)
+        self.assertEqual(3, screen_event.frame.number)
+
+        f = BytesIO()
+        with xmlfile(f) as xf:
+            detector.write_xml(xf)
+        f.seek(0)
+        xml_document = etree.parse(f)
+        self.xml_schema.assertValid(xml_document)
+
+    def test_invalid_quadrangle_trackers(self):
+        with self.assertRaises(ValueError):
+            MultiCameraScreenEventDetector(
+                (self.first_video, self.second_video),
+                (RTreeDequeConvexQuadrangleTracker(),),
+                self.screen_detector,
+                self.page_detector,
+            )
+        with self.assertRaises(ValueError):
+            MultiCameraScreenEventDetector((), (), self.screen_detector, self.page_detector)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ProcessPoolExecutor
+import gc
+from multiprocessing.shared_memory import SharedMemory
+import os
+import pickle
+from tempfile import TemporaryDirectory
+import unittest
+
+from dateutil.parser import parse as datetime_parse
+import numpy as np
+from video699.event.screen import ScreenEventDetectorScreen
+from video699.frame.shared import SharedMemoryFrame, SharedMemoryFrameVideo
+from video699.quadrangle.geos import GEOSConvexQuadrangle
+from video699.video.file import CONFIGURATION as FILE_CONFIGURATION, VideoFile
+from video699.video.shared import SharedMemoryVideo
+from test.event.test_screen import write_video
+
+
+VIDEO_FPS = 25
+VIDEO_WIDTH = 64
+VIDEO_HEIGHT = 48
+VIDEO_DATETIME = datetime_parse('2018-01-01T00:00:00+00:00')
+NUM_FRAMES = 5
+SCREEN_COORDINATES = GEOSConvexQuadrangle((8, 8), (40, 8), (8, 32), (40, 32))
+CACHE_INDEX = FILE_CONFIGURATION['cache_index']
+
+
+def setUpModule():
+    FILE_CONFIGURATION['cache_index'] = 'no'
+
+
+def tearDownModule():
+    FILE_CONFIGURATION['cache_index'] = CACHE_INDEX
+
+
+def _render_screen(screen):
+    return screen.frame.number, screen.render(16, 12)
+
+
+class TestSharedMemoryFrame(unittest.TestCase):
+    """Tests the ability of the SharedMemoryFrame class to pass image data to other processes.
+
+    """
+
+    def setUp(self):
+        self.dirname = TemporaryDirectory()
+        pathname = os.path.join(self.dirname.name, 'frames.avi')
+        write_video(pathname, (
+            np.full((VIDEO_HEIGHT, VIDEO_WIDTH, 3), 40 * frame_number, dtype=np.uint8)
+            for frame_number in range(1, NUM_FRAMES + 1)
+        ), VIDEO_FPS)
+        self.video = SharedMemoryVideo(VideoFile(pathname, VIDEO_DATETIME))
+
+    def tearDown(self):
+        self.dirname.cleanup()
+
+    def test_attributes(self):
+        frame = next(iter(self.video))
+        self.assertEqual(1, frame.number)
+        self.assertEqual(VIDEO_WIDTH, frame.width)
+        self.assertEqual(VIDEO_HEIGHT, frame.height)
+        self.assertEqual(VIDEO_DATETIME, frame.datetime)
+        self.assertEqual((VIDEO_HEIGHT, VIDEO_WIDTH, 4), frame.image.shape)
+        self.assertTrue(np.all(frame.image[:, :, 3] == 255))
+        frame.release()
+
+    def test_pickle(self):
+        frame = next(iter(self.video))
+        pickled_frame = pickle.dumps(frame)
+        self.assertLess(len(pickled_frame), frame.image.nbytes / 10)
+
+        unpickled_frame = pickle.loads(pickled_frame)
+        self.assertIsInstance(unpickled_frame.video, SharedMemoryFrameVideo)
+        self.assertEqual(self.video.uri, unpickled_frame.video.uri)
+        self.assertEqual(frame.number, unpickled_frame.number)
+        self.assertEqual(frame.datetime, unpickled_frame.datetime)
+        self.assertTrue(np.array_equal(frame.image, unpickled_frame.image))
+        self.assertFalse(unpickled_frame.image.flags.writeable)
+        self.assertEqual(unpickled_frame, pickle.loads(pickled_frame))
+
+        frame.image[0, 0] = (1, 2, 3, 4)
+        self.assertEqual([1, 2, 3, 4], list(unpickled_frame.image[0, 0]))
+
+        unpickled_frame.release()
+        frame.release()
+
+    def test_reference_counting(self):
+        frame = SharedMemoryFrame(
+            self.video,
+            1,
+            self.video.datetime - self.video.datetime,
+            bgr_image=np.zeros((VIDEO_HEIGHT, VIDEO_WIDTH, 3), dtype=np.uint8),
+        )
+        name = frame.name
+        frame.retain()
+        frame.release()
+        SharedMemory(name).close()
+        frame.release()
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name)
+        with self.assertRaises(ValueError):
+            frame.image
+        with self.assertRaises(ValueError):
+            frame.retain()
+        frame.release()
+
+    def test_finalization(self):
+        frame = next(iter(self.video))
+        name = frame.name
+        unpickled_frame = pickle.loads(pickle.dumps(frame))
+        del unpickled_frame
+        gc.collect()
+        SharedMemory(name).close()
+
+        del frame
+        gc.collect()
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name)
+
+    def test_worker_processes(self):
+        frames = list(self.video)
+        screens = [ScreenEventDetectorScreen(frame, SCREEN_COORDINATES) for frame in frames]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(_render_screen, screens))
+        self.assertEqual(NUM_FRAMES, len(results))
+        for screen, (frame_number, image) in zip(screens, results):
+            self.assertEqual(screen.frame.number, frame_number)
+            self.assertTrue(np.array_equal(screen.render(16, 12), image))
+        for frame in frames:
+            frame.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
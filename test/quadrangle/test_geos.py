@@ -213,6 +213,35 @@ class TestGEOSConvexQuadrangle(unittest.TestCase):
         self.assertEqual(0, red[black_circle_coordinates])
         self.assertEqual(255, alpha[black_circle_coordinates])
 
+    def test_rescaled_green_screen(self):
+        coordinate_map = GEOSConvexQuadrangle(
+            top_left=(95, 385),
+            top_right=(560, 360),
+            bottom_left=(75, 440),
+            bottom_right=(570, 450),
+        )
+        rescaled_width = int(coordinate_map.width / 2)
+        rescaled_height = coordinate_map.height * 2
+        screen_image = coordinate_map.transform(self.frame_image, rescaled_width, rescaled_height)
+        height, width, _ = screen_image.shape
+        self.assertEqual(rescaled_width, width)
+        self.assertEqual(rescaled_height, height)
+
+        red, green, blue, alpha = cv.split(screen_image)
+
+        screen_corners = ((0, 0), (0, width - 1), (height - 1, 0), (height - 1, width - 1))
+        for coordinates in screen_corners:
+            self.assertEqual(0, blue[coordinates])
+            self.assertEqual(255, green[coordinates])
+            self.assertEqual(0, red[coordinates])
+            self.assertEqual(255, alpha[coordinates])
+
+        black_circle_coordinates = (int((height - 1) / 2), (width - 1) - int((height - 1) / 16))
+        self.assertEqual(0, blue[black_circle_coordinates])
+        self.assertEqual(0, green[black_circle_coordinates])
+        self.assertEqual(0, red[black_circle_coordinates])
+        self.assertEqual(255, alpha[black_circle_coordinates])
+
     def test_blue_screen(self):
         coordinate_map = GEOSConvexQuadrangle(
             top_left=(462, 112),
@@ -262,6 +291,16 @@ class TestGEOSConvexQuadrangle(unittest.TestCase):
         self.assertEqual(255, red[red_rectangle_coordinates])
         self.assertEqual(255, alpha[red_rectangle_coordinates])
 
+    def test_bounds(self):
+        quadrangle = GEOSConvexQuadrangle(
+            top_left=(5, 3),
+            top_right=(3, 5),
+            bottom_left=(3, 1),
+            bottom_right=(1, 3),
+        )
+        self.assertEqual((1, 1), quadrangle.top_left_bound)
+        self.assertEqual((5, 5), quadrangle.bottom_right_bound)
+
     def test_area(self):
         empty_quadrangle = GEOSConvexQuadrangle(
             top_left=(0, 0),
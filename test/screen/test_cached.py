@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from video699.event.screen import ScreenEventDetectorScreen
+from video699.interface import ScreenDetectorABC
+from video699.screen.cached import CachedScreenDetector
+from test.event.test_screen import FIRST_COORDINATES
+
+
+class _CountingScreenDetector(ScreenDetectorABC):
+    def __init__(self):
+        self.num_detected_frames = 0
+
+    def detect(self, frame):
+        self.num_detected_frames += 1
+        return [ScreenEventDetectorScreen(frame, FIRST_COORDINATES)]
+
+
+class TestCachedScreenDetector(unittest.TestCase):
+    """Tests the ability of the CachedScreenDetector class to reuse screens detected in advance.
+
+    """
+
+    def setUp(self):
+        self.screen_detector = _CountingScreenDetector()
+        self.cached_screen_detector = CachedScreenDetector(self.screen_detector)
+
+    def test_reuses_cached_screens(self):
+        frame = object()
+        screens = self.cached_screen_detector.detect_and_cache(frame)
+        self.assertIsInstance(screens, tuple)
+        self.assertIs(screens, self.cached_screen_detector.detect_and_cache(frame))
+        self.assertIs(screens, self.cached_screen_detector.detect(frame))
+        self.assertEqual(1, self.screen_detector.num_detected_frames)
+        self.assertEqual(1, self.cached_screen_detector.num_detected_frames)
+
+        self.cached_screen_detector.detect(frame)
+        self.assertEqual(2, self.screen_detector.num_detected_frames)
+        self.assertEqual(1, self.cached_screen_detector.num_detected_frames)
+
+    def test_forget(self):
+        frame = object()
+        self.cached_screen_detector.detect_and_cache(frame)
+        self.cached_screen_detector.forget(frame)
+        self.cached_screen_detector.forget(frame)
+        self.cached_screen_detector.detect(frame)
+        self.assertEqual(2, self.screen_detector.num_detected_frames)
+
+
+if __name__ == '__main__':
+    unittest.main()
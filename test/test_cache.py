@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import unittest
+
+import numpy as np
+from video699.cache import RenderCache, get_render_cache, render_cached
+
+
+class _Owner(object):
+    def __init__(self, name):
+        self.name = name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __eq__(self, other):
+        return isinstance(other, _Owner) and self.name == other.name
+
+
+class _Image(object):
+    @render_cached('_Image.render')
+    def render(self, width=None, height=None):
+        return np.zeros((height or 1, width or 1), dtype=np.uint8)
+
+
+def _render(num_bytes):
+    return lambda: np.zeros(num_bytes, dtype=np.uint8)
+
+
+class TestRenderCache(unittest.TestCase):
+    """Tests the ability of the RenderCache class to cache image data within a byte budget.
+
+    """
+
+    def setUp(self):
+        self.cache = RenderCache(max_bytes=100)
+
+    def test_hits_and_misses(self):
+        owner = _Owner('first')
+        first_image = self.cache.get('render', owner, (10, ), _render(10))
+        second_image = self.cache.get('render', owner, (10, ), _render(10))
+        third_image = self.cache.get('render', owner, (20, ), _render(20))
+        self.assertIs(first_image, second_image)
+        self.assertIsNot(first_image, third_image)
+        namespace = self.cache.namespace('render')
+        self.assertEqual(1, namespace.num_hits)
+        self.assertEqual(2, namespace.num_misses)
+        self.assertEqual(30, namespace.num_bytes)
+        self.assertEqual(30, self.cache.num_bytes)
+        self.assertEqual(2, len(self.cache))
+
+    def test_equal_owners(self):
+        owner = _Owner('first')
+        first_image = self.cache.get('render', owner, (), _render(10))
+        second_image = self.cache.get('render', _Owner('first'), (), _render(10))
+        self.assertIs(first_image, second_image)
+        self.assertEqual(1, self.cache.namespace('render').num_hits)
+
+    def test_namespaces(self):
+        owner = _Owner('first')
+        first_image = self.cache.get('first', owner, (), _render(10))
+        second_image = self.cache.get('second', owner, (), _render(30))
+        self.assertIsNot(first_image, second_image)
+        self.assertEqual(10, self.cache.namespace('first').num_bytes)
+        self.assertEqual(30, self.cache.namespace('second').num_bytes)
+        self.assertEqual({'first', 'second'}, set(self.cache.namespaces))
+
+    def test_byte_budget(self):
+        owners = [_Owner(owner_number) for owner_number in range(4)]
+        for owner in owners[:3]:
+            self.cache.get('render', owner, (), _render(40))
+        namespace = self.cache.namespace('render')
+        self.assertEqual(1, namespace.num_evictions)
+        self.assertEqual(80, self.cache.num_bytes)
+        self.assertEqual(2, len(self.cache))
+
+        self.cache.get('render', owners[1], (), _render(40))
+        self.cache.get('render', owners[3], (), _render(40))
+        self.assertEqual(2, namespace.num_evictions)
+        self.cache.get('render', owners[1], (), _render(40))
+        self.assertEqual(2, namespace.num_hits)
+        self.cache.get('render', owners[2], (), _render(40))
+        self.assertEqual(5, namespace.num_misses)
+        self.assertEqual(3, namespace.num_evictions)
+
+    def test_too_large(self):
+        owner = _Owner('first')
+        self.cache.get('render', owner, (), _render(10))
+        self.cache.get('render', owner, (1, ), _render(101))
+        self.assertEqual(1, len(self.cache))
+        self.assertEqual(10, self.cache.num_bytes)
+        self.assertEqual(0, self.cache.namespace('render').num_evictions)
+
+    def test_finalized_owner(self):
+        owner = _Owner('first')
+        self.cache.get('render', owner, (), _render(10))
+        self.cache.get('render', owner, (1, ), _render(20))
+        self.assertEqual(2, len(self.cache))
+        del owner
+        gc.collect()
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.num_bytes)
+        self.assertEqual(0, self.cache.namespace('render').num_bytes)
+        self.assertEqual(0, self.cache.namespace('render').num_evictions)
+
+    def test_clear(self):
+        self.cache.get('render', _Owner('first'), (), _render(10))
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.num_bytes)
+        self.assertEqual({}, self.cache.namespaces)
+
+
+class TestRenderCached(unittest.TestCase):
+    """Tests the ability of the render_cached decorator to cache image data rendered by a method.
+
+    """
+
+    def test_equivalent_arguments(self):
+        image = _Image()
+        self.assertIs(image.render(), image.render(None, None))
+        self.assertIs(image.render(), image.render(height=None))
+        self.assertIs(image.render(2, 3), image.render(height=3, width=2))
+        self.assertIsNot(image.render(), image.render(2, 3))
+        self.assertEqual(2, get_render_cache().namespace('_Image.render').num_misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
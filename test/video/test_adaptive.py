@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from dateutil.parser import parse as datetime_parse
+import numpy as np
+
+from video699.event.screen import ScreenEventDetectorScreen
+from video699.frame.image import ImageFrame
+from video699.interface import ScreenDetectorABC, VideoABC
+from video699.quadrangle.geos import GEOSConvexQuadrangle
+from video699.video.adaptive import AdaptiveSampledVideo
+
+
+VIDEO_FPS = 25
+VIDEO_WIDTH = 64
+VIDEO_HEIGHT = 48
+VIDEO_DATETIME = datetime_parse('2018-01-01T00:00:00+00:00')
+NUM_FRAMES = 100
+TRANSITION_FRAME_NUMBER = 37
+COORDINATES = GEOSConvexQuadrangle((10, 10), (40, 10), (10, 30), (40, 30))
+
+
+class _TransitionVideo(VideoABC):
+    """A video, whose frames change from black to white in a single frame.
+
+    """
+
+    def __init__(self):
+        black_image = np.zeros((VIDEO_HEIGHT, VIDEO_WIDTH, 4), dtype=np.uint8)
+        white_image = np.full((VIDEO_HEIGHT, VIDEO_WIDTH, 4), 255, dtype=np.uint8)
+        self._frames = [
+            ImageFrame(
+                self,
+                frame_number,
+                black_image if frame_number < TRANSITION_FRAME_NUMBER else white_image,
+            ) for frame_number in range(1, NUM_FRAMES + 1)
+        ]
+
+    @property
+    def fps(self):
+        return VIDEO_FPS
+
+    @property
+    def width(self):
+        return VIDEO_WIDTH
+
+    @property
+    def height(self):
+        return VIDEO_HEIGHT
+
+    @property
+    def datetime(self):
+        return VIDEO_DATETIME
+
+    @property
+    def uri(self):
+        return 'test:transition-video'
+
+    def __iter__(self):
+        return iter(self._frames)
+
+
+class _CountingScreenDetector(ScreenDetectorABC):
+    """A screen detector that detects a single screen in every frame, and counts the frames.
+
+    """
+
+    def __init__(self, coordinates=COORDINATES):
+        self.coordinates = coordinates
+        self.frame_numbers = []
+
+    def detect(self, frame):
+        self.frame_numbers.append(frame.number)
+        return (ScreenEventDetectorScreen(frame, self.coordinates),)
+
+
+class TestAdaptiveSampledVideo(unittest.TestCase):
+    """Tests the ability of the AdaptiveSampledVideo class to locate transitions in a sparse sample.
+
+    """
+
+    def setUp(self):
+        self.screen_detector = _CountingScreenDetector()
+        self.video = AdaptiveSampledVideo(_TransitionVideo(), self.screen_detector)
+
+    def test_locates_transition(self):
+        frame_numbers = [frame.number for frame in self.video]
+        self.assertEqual(NUM_FRAMES, self.video.num_read_frames)
+        self.assertEqual([1, 26], frame_numbers[:2])
+        self.assertEqual(TRANSITION_FRAME_NUMBER, frame_numbers[2])
+        self.assertEqual(NUM_FRAMES, frame_numbers[-1])
+        self.assertLess(len(frame_numbers), NUM_FRAMES)
+        self.assertEqual(sorted(frame_numbers), frame_numbers)
+
+    def test_reuses_detected_screens(self):
+        for frame in self.video:
+            screens = self.video.screen_detector.detect(frame)
+            self.assertEqual(1, len(screens))
+        frame_numbers = self.screen_detector.frame_numbers
+        self.assertEqual(len(set(frame_numbers)), len(frame_numbers))
+        self.assertEqual(len(frame_numbers), self.video.num_detected_frames)
+        self.assertLess(len(frame_numbers), NUM_FRAMES)
+
+    def test_degenerate_screens(self):
+        coordinates = GEOSConvexQuadrangle((10, 10), (40, 10), (10, 10), (40, 10))
+        screen_detector = _CountingScreenDetector(coordinates)
+        video = AdaptiveSampledVideo(_TransitionVideo(), screen_detector)
+        frame_numbers = [frame.number for frame in video]
+        self.assertEqual(list(range(1, NUM_FRAMES + 1)), frame_numbers)
+
+
+if __name__ == '__main__':
+    unittest.main()
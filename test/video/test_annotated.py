@@ -4,7 +4,7 @@ import unittest
 
 import cv2 as cv
 from dateutil.parser import parse as datetime_parse
-from video699.document.pdf import PDFDocument
+from video699.document.pdf import CONFIGURATION as PDF_CONFIGURATION, PDFDocument
 from video699.video.annotated import get_videos, AnnotatedSampledVideoScreenDetector
 
 
@@ -33,6 +33,15 @@ FIRST_DOCUMENT_NUM_PAGES = 32
 SECOND_DOCUMENT_NUM_PAGES = 10
 FIRST_SCREEN_WIDTH = 369
 FIRST_SCREEN_HEIGHT = 283
+PDF_IMAGE_CACHE = PDF_CONFIGURATION['image_cache']
+
+
+def setUpModule():
+    PDF_CONFIGURATION['image_cache'] = 'no'
+
+
+def tearDownModule():
+    PDF_CONFIGURATION['image_cache'] = PDF_IMAGE_CACHE
 
 
 class TestAnnotatedSampledVideo(unittest.TestCase):
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+import os
+from tempfile import TemporaryDirectory
+import unittest
+from unittest.mock import patch
+
+from dateutil.parser import parse as datetime_parse
+import numpy as np
+from video699.event.screen import ScreenEventDetectorVideo
+from video699.video.cached import CONFIGURATION, CachedVideo
+from video699.video.file import CONFIGURATION as FILE_CONFIGURATION, VideoFile
+from test.event.test_screen import write_video
+
+
+VIDEO_PATHNAME = os.path.join(
+    os.path.dirname(__file__),
+    'test_file',
+    'sample_video_file.mov',
+)
+VIDEO_WIDTH = 640
+VIDEO_HEIGHT = 480
+VIDEO_DATETIME = datetime_parse('2018-01-01T00:00:00+00:00')
+VIDEO_FPS = 25
+NUM_FRAMES = 10
+CACHE_INDEX = FILE_CONFIGURATION['cache_index']
+
+
+def setUpModule():
+    FILE_CONFIGURATION['cache_index'] = 'no'
+
+
+def tearDownModule():
+    FILE_CONFIGURATION['cache_index'] = CACHE_INDEX
+
+
+def _write_video(pathname, first_intensity):
+    write_video(pathname, (
+        np.full(
+            (VIDEO_HEIGHT // 10, VIDEO_WIDTH // 10, 3),
+            first_intensity + 10 * frame_index,
+            dtype=np.uint8,
+        )
+        for frame_index in range(NUM_FRAMES)
+    ), VIDEO_FPS)
+
+
+class TestCachedVideo(unittest.TestCase):
+    """Tests the ability of the CachedVideo class to cache decoded video frames.
+
+    """
+
+    def setUp(self):
+        self.video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)
+        self.dirname = TemporaryDirectory()
+        self.cache_dirname_patch = patch(
+            'video699.video.cached.get_cache_dirname',
+            return_value=self.dirname.name,
+        )
+        self.cache_dirname_patch.start()
+
+    def tearDown(self):
+        self.cache_dirname_patch.stop()
+        self.dirname.cleanup()
+
+    def test_video_properties(self):
+        cached_video = CachedVideo(self.video)
+        self.assertEqual(self.video.fps, cached_video.fps)
+        self.assertEqual(VIDEO_WIDTH, cached_video.width)
+        self.assertEqual(VIDEO_HEIGHT, cached_video.height)
+        self.assertEqual(self.video.datetime, cached_video.datetime)
+        self.assertEqual(self.video.uri, cached_video.uri)
+        self.assertEqual(1, len(cached_video))
+
+    def test_reads_same_frame(self):
+        frame = next(iter(VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)))
+        cached_video = CachedVideo(self.video)
+        for _ in range(2):
+            cached_frame, = list(cached_video)
+            self.assertEqual(frame.number, cached_frame.number)
+            self.assertEqual(frame.duration, cached_frame.duration)
+            self.assertTrue((frame.image == cached_frame.image).all())
+
+        cached_video = CachedVideo(VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME))
+        self.assertTrue((frame.image == cached_video[0].image).all())
+
+    def test_downscaled_frames(self):
+        cached_video = CachedVideo(self.video, width=VIDEO_WIDTH // 4)
+        self.assertEqual(VIDEO_WIDTH // 4, cached_video.width)
+        self.assertEqual(VIDEO_HEIGHT // 4, cached_video.height)
+        frame = cached_video[-1]
+        self.assertEqual(1, frame.number)
+        height, width, _ = frame.image.shape
+        self.assertEqual(VIDEO_WIDTH // 4, width)
+        self.assertEqual(VIDEO_HEIGHT // 4, height)
+
+    def test_random_access(self):
+        cached_video = CachedVideo(self.video)
+        with self.assertRaises(IndexError):
+            cached_video[1]
+        with self.assertRaises(ValueError):
+            CachedVideo(self.video, frame_stride=0)
+
+    def test_modified_video_file(self):
+        pathname = os.path.join(self.dirname.name, 'modified.avi')
+        _write_video(pathname, 0)
+        cached_video = CachedVideo(VideoFile(pathname, VIDEO_DATETIME))
+        first_intensity = int(cached_video[0].image[0, 0, 0])
+
+        _write_video(pathname, 100)
+        os.utime(pathname, ns=(0, 0))
+        cached_video = CachedVideo(VideoFile(pathname, VIDEO_DATETIME))
+        self.assertLess(first_intensity + 50, int(cached_video[0].image[0, 0, 0]))
+
+    def test_frame_range(self):
+        pathname = os.path.join(self.dirname.name, 'range.avi')
+        _write_video(pathname, 0)
+        self.assertEqual(NUM_FRAMES, len(CachedVideo(VideoFile(pathname, VIDEO_DATETIME))))
+        start = timedelta(seconds=(NUM_FRAMES // 2) / VIDEO_FPS)
+        cached_video = CachedVideo(VideoFile(pathname, VIDEO_DATETIME, start=start))
+        self.assertEqual(NUM_FRAMES - NUM_FRAMES // 2, len(cached_video))
+        self.assertEqual(NUM_FRAMES // 2 + 1, cached_video[0].number)
+        cached_video = CachedVideo(VideoFile(pathname, VIDEO_DATETIME, frame_stride=2))
+        self.assertEqual(NUM_FRAMES // 2, len(cached_video))
+
+    def test_refuses_video_without_cache_key(self):
+        video = ScreenEventDetectorVideo(
+            VIDEO_FPS, VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_DATETIME, quadrangles=(), pages=(),
+        )
+        with self.assertRaises(ValueError):
+            CachedVideo(video)
+        self.assertEqual([], os.listdir(self.dirname.name))
+
+    def test_evicts_least_recently_used_frames(self):
+        cache_max_bytes = CONFIGURATION['cache_max_bytes']
+        try:
+            cached_video = CachedVideo(self.video)
+            cached_pathnames = os.listdir(self.dirname.name)
+            for pathname in cached_pathnames:
+                os.utime(os.path.join(self.dirname.name, pathname), ns=(0, 0))
+            num_bytes = sum(
+                os.path.getsize(os.path.join(self.dirname.name, pathname))
+                for pathname in cached_pathnames
+            )
+            CONFIGURATION['cache_max_bytes'] = str(num_bytes)
+
+            downscaled_video = CachedVideo(
+                VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME),
+                width=VIDEO_WIDTH // 4,
+            )
+            self.assertEqual(2, len(os.listdir(self.dirname.name)))
+            for pathname in cached_pathnames:
+                self.assertNotIn(pathname, os.listdir(self.dirname.name))
+            self.assertEqual(1, len(cached_video))
+            self.assertEqual(VIDEO_WIDTH // 4, downscaled_video[0].width)
+        finally:
+            CONFIGURATION['cache_max_bytes'] = cache_max_bytes
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import os
+from shutil import which
+import unittest
+from unittest.mock import patch
+
+from dateutil.parser import parse as datetime_parse
+from video699.configuration import get_configuration
+from video699.video.ffmpeg import FFmpegVideoFile
+from video699.video.file import CONFIGURATION as FILE_CONFIGURATION, VideoFile
+
+
+FFMPEG_EXECUTABLE = get_configuration()['FFmpegVideoFile']['executable']
+VIDEO_PATHNAME = os.path.join(
+    os.path.dirname(__file__),
+    'test_file',
+    'sample_video_file.mov',
+)
+VIDEO_FPS = 25
+VIDEO_WIDTH = 640
+VIDEO_HEIGHT = 480
+VIDEO_DATETIME = datetime_parse('2018-01-01T00:00:00+00:00')
+
+CACHE_INDEX = FILE_CONFIGURATION['cache_index']
+
+
+def setUpModule():
+    FILE_CONFIGURATION['cache_index'] = 'no'
+
+
+def tearDownModule():
+    FILE_CONFIGURATION['cache_index'] = CACHE_INDEX
+
+
+@unittest.skipIf(which(FFMPEG_EXECUTABLE) is None, 'FFmpeg is not installed')
+class TestFFmpegVideoFile(unittest.TestCase):
+    """Tests the ability of the FFmpegVideoFile class to read a RLE-encoded video file.
+
+    """
+
+    def test_video_properties(self):
+        video = FFmpegVideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)
+        self.assertEqual(VIDEO_FPS, video.fps)
+        self.assertEqual(VIDEO_WIDTH, video.width)
+        self.assertEqual(VIDEO_HEIGHT, video.height)
+        video.close()
+
+    def test_reads_same_frame(self):
+        frame = next(iter(VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)))
+        ffmpeg_frame, = list(FFmpegVideoFile(VIDEO_PATHNAME, VIDEO_DATETIME))
+        self.assertEqual(frame.number, ffmpeg_frame.number)
+        self.assertEqual(frame.duration, ffmpeg_frame.duration)
+        self.assertTrue((frame.image == ffmpeg_frame.image).all())
+
+    def test_scaled_frame(self):
+        video = FFmpegVideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, width=VIDEO_WIDTH // 2)
+        self.assertEqual(VIDEO_WIDTH // 2, video.width)
+        self.assertEqual(VIDEO_HEIGHT // 2, video.height)
+        frame, = list(video)
+        height, width, _ = frame.image.shape
+        self.assertEqual(VIDEO_WIDTH // 2, width)
+        self.assertEqual(VIDEO_HEIGHT // 2, height)
+
+    def test_frames_in_range(self):
+        video = FFmpegVideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, frame_stride=10)
+        self.assertEqual([1], [frame.number for frame in video.frames(1, 1)])
+        self.assertEqual([], list(video.frames(2)))
+        with self.assertRaises(ValueError):
+            video.seek(0)
+
+    def test_cache_key(self):
+        video = FFmpegVideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)
+        scaled_video = FFmpegVideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, width=VIDEO_WIDTH // 2)
+        sampled_video = FFmpegVideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, frame_stride=2)
+        self.assertEqual(video.cache_key(), FFmpegVideoFile(VIDEO_PATHNAME, VIDEO_DATETIME).cache_key())
+        self.assertNotEqual(video.cache_key(), scaled_video.cache_key())
+        self.assertNotEqual(video.cache_key(), sampled_video.cache_key())
+        self.assertNotEqual(video.cache_key(), VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME).cache_key())
+        cache_key = video.cache_key()
+        video.frames(2)
+        self.assertNotEqual(cache_key, video.cache_key())
+        self.assertEqual(cache_key.split('\0')[:-2], video.cache_key(frame_range=False).split('\0'))
+        for video in (video, scaled_video, sampled_video):
+            video.close()
+
+    def test_sampled_frame_numbers(self):
+        video = FFmpegVideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, frame_stride=10)
+        self.assertEqual([1, 11, 21], video.sampled_frame_numbers(range(1, 30)))
+        video.frames(2, 20)
+        self.assertEqual([2, 12], video.sampled_frame_numbers(range(1, 30)))
+        video.close()
+
+    def test_invalid_parameters(self):
+        with patch('sys.unraisablehook') as unraisablehook:
+            with self.assertRaises(ValueError):
+                FFmpegVideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, frame_stride=0)
+            with self.assertRaises(OSError):
+                FFmpegVideoFile(VIDEO_PATHNAME + '.missing', VIDEO_DATETIME)
+            gc.collect()
+        unraisablehook.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,18 @@
 # -*- coding: utf-8 -*-
 
+from datetime import timedelta
+import gc
 import os
+import shutil
+from tempfile import TemporaryDirectory
 import unittest
+from unittest.mock import patch
 
 import cv2 as cv
 from dateutil.parser import parse as datetime_parse
-from video699.video.file import VideoFile
+from video699.frame.pool import FrameBufferPool
+from video699.interface import FRAMEABC_CONFIGURATION
+from video699.video.file import CONFIGURATION as FILE_CONFIGURATION, VideoFile
 
 
 VIDEO_PATHNAME = os.path.join(
@@ -17,6 +24,15 @@ VIDEO_FPS = 25
 VIDEO_WIDTH = 640
 VIDEO_HEIGHT = 480
 VIDEO_DATETIME = datetime_parse('2018-01-01T00:00:00+00:00')
+CACHE_INDEX = FILE_CONFIGURATION['cache_index']
+
+
+def setUpModule():
+    FILE_CONFIGURATION['cache_index'] = 'no'
+
+
+def tearDownModule():
+    FILE_CONFIGURATION['cache_index'] = CACHE_INDEX
 
 
 class TestVideoFile(unittest.TestCase):
@@ -68,6 +84,23 @@ class TestVideoFile(unittest.TestCase):
         self.assertEqual(255, red[position])
         self.assertEqual(255, alpha[position])
 
+    def test_image_views(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)
+        frame = next(iter(video))
+
+        rgb_image = frame.rgb_image
+        self.assertEqual((VIDEO_HEIGHT, VIDEO_WIDTH, 3), rgb_image.shape)
+        self.assertTrue((cv.cvtColor(frame.image, cv.COLOR_RGBA2RGB) == rgb_image).all())
+
+        gray_image = frame.gray_image
+        self.assertEqual((VIDEO_HEIGHT, VIDEO_WIDTH), gray_image.shape)
+        self.assertTrue((cv.cvtColor(frame.image, cv.COLOR_RGBA2GRAY) == gray_image).all())
+
+        thumbnail_image = frame.thumbnail_image
+        self.assertEqual(2, len(thumbnail_image.shape))
+        self.assertGreaterEqual(VIDEO_WIDTH, thumbnail_image.shape[1])
+        self.assertIs(thumbnail_image, frame.thumbnail_image)
+
     def test_produces_single_frame(self):
         video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)
         frame_iterator = iter(video)
@@ -76,5 +109,204 @@ class TestVideoFile(unittest.TestCase):
             next(frame_iterator)
 
 
+class TestPrefetchingVideoFile(unittest.TestCase):
+    """Tests the ability of the VideoFile class to read a video file in a background thread.
+
+    """
+
+    def test_reads_same_frame(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)
+        prefetching_video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, prefetch=True)
+        frame = next(iter(video))
+        prefetched_frame = next(iter(prefetching_video))
+        self.assertEqual(frame.number, prefetched_frame.number)
+        self.assertEqual(frame.duration, prefetched_frame.duration)
+        self.assertTrue((frame.image == prefetched_frame.image).all())
+
+    def test_produces_single_frame(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, prefetch=True)
+        frame_iterator = iter(video)
+        next(frame_iterator)
+        with self.assertRaises(StopIteration):
+            next(frame_iterator)
+
+    def test_close(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, prefetch=True)
+        frame_iterator = iter(video)
+        video.close()
+        with self.assertRaises(StopIteration):
+            next(frame_iterator)
+
+
+class TestSampledVideoFile(unittest.TestCase):
+    """Tests the ability of the VideoFile class to skip video frames.
+
+    """
+
+    def test_frame_stride_produces_first_frame(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, frame_stride=10)
+        frame_iterator = iter(video)
+        frame = next(frame_iterator)
+        self.assertEqual(1, frame.number)
+        with self.assertRaises(StopIteration):
+            next(frame_iterator)
+
+    def test_sample_fps_produces_first_frame(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, sample_fps=1)
+        frame_iterator = iter(video)
+        frame = next(frame_iterator)
+        self.assertEqual(1, frame.number)
+        with self.assertRaises(StopIteration):
+            next(frame_iterator)
+
+    def test_invalid_sampling(self):
+        with patch('sys.unraisablehook') as unraisablehook:
+            with self.assertRaises(ValueError):
+                VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, frame_stride=10, sample_fps=1)
+            with self.assertRaises(ValueError):
+                VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, frame_stride=0)
+            with self.assertRaises(ValueError):
+                VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, sample_fps=0)
+            gc.collect()
+        unraisablehook.assert_not_called()
+
+
+class TestSeekableVideoFile(unittest.TestCase):
+    """Tests the ability of the VideoFile class to reposition a video.
+
+    """
+
+    def test_seek_repeats_iteration(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)
+        first_frame, = list(video)
+        video.seek(1)
+        second_frame, = list(video)
+        self.assertEqual(first_frame.number, second_frame.number)
+        self.assertEqual(first_frame.duration, second_frame.duration)
+        self.assertTrue((first_frame.image == second_frame.image).all())
+
+    def test_frames_in_range(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, prefetch=True)
+        frames = list(video.frames(1, 1))
+        self.assertEqual([1], [frame.number for frame in frames])
+        frames = list(video.frames(2))
+        self.assertEqual([], frames)
+
+    def test_time_range(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, start=timedelta(seconds=1))
+        self.assertEqual([], list(video))
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, end=timedelta(seconds=1))
+        self.assertEqual([1], [frame.number for frame in video])
+
+    def test_invalid_seek(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)
+        with self.assertRaises(ValueError):
+            video.seek(0)
+
+
+class TestVideoFileIndex(unittest.TestCase):
+    """Tests the ability of the VideoFile class to store frame timestamp indices in a bounded cache.
+
+    """
+
+    def setUp(self):
+        self.dirname = TemporaryDirectory()
+        self.index_dirname = os.path.join(self.dirname.name, 'video-index')
+        os.mkdir(self.index_dirname)
+        self.cache_dirname_patch = patch(
+            'video699.video.file.get_cache_dirname',
+            return_value=self.index_dirname,
+        )
+        self.cache_dirname_patch.start()
+        self.index_cache_max_bytes = FILE_CONFIGURATION['index_cache_max_bytes']
+        FILE_CONFIGURATION['cache_index'] = 'yes'
+
+    def tearDown(self):
+        FILE_CONFIGURATION['cache_index'] = 'no'
+        FILE_CONFIGURATION['index_cache_max_bytes'] = self.index_cache_max_bytes
+        self.cache_dirname_patch.stop()
+        self.dirname.cleanup()
+
+    def _copy_video(self, basename):
+        pathname = os.path.join(self.dirname.name, basename)
+        shutil.copyfile(VIDEO_PATHNAME, pathname)
+        return pathname
+
+    def test_stores_index(self):
+        pathname = self._copy_video('first.mov')
+        self.assertEqual(1, len(list(VideoFile(pathname, VIDEO_DATETIME))))
+        self.assertEqual(1, len(os.listdir(self.index_dirname)))
+        with patch('video699.video.file.cv.VideoCapture.get', return_value=0):
+            self.assertEqual(1, VideoFile(pathname, VIDEO_DATETIME).num_frames)
+
+    def test_evicts_least_recently_used_index(self):
+        first_pathname = self._copy_video('first.mov')
+        list(VideoFile(first_pathname, VIDEO_DATETIME))
+        first_index_pathname, = (
+            os.path.join(self.index_dirname, basename)
+            for basename in os.listdir(self.index_dirname)
+        )
+        os.utime(first_index_pathname, ns=(0, 0))
+        FILE_CONFIGURATION['index_cache_max_bytes'] = str(os.path.getsize(first_index_pathname))
+
+        second_pathname = self._copy_video('second.mov')
+        list(VideoFile(second_pathname, VIDEO_DATETIME))
+        index_basenames = os.listdir(self.index_dirname)
+        self.assertEqual(1, len(index_basenames))
+        self.assertNotIn(os.path.basename(first_index_pathname), index_basenames)
+
+
+class TestBufferPoolVideoFile(unittest.TestCase):
+    """Tests the ability of the VideoFile class to decode frames into recycled buffers.
+
+    """
+
+    def test_reads_same_frame(self):
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME)
+        pooled_video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, buffer_pool=True)
+        frame = next(iter(video))
+        pooled_frame = next(iter(pooled_video))
+        self.assertEqual(frame.number, pooled_frame.number)
+        self.assertTrue((frame.image == pooled_frame.image).all())
+        self.assertTrue((frame.gray_image == pooled_frame.gray_image).all())
+
+    def test_release_recycles_buffers(self):
+        buffer_pool = FrameBufferPool()
+        video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, buffer_pool=buffer_pool)
+        frame = next(iter(video))
+        image = frame.image
+        self.assertEqual(0, len(buffer_pool))
+        frame.release()
+        self.assertEqual(2, len(buffer_pool))
+        self.assertIs(image, buffer_pool.acquire(image.shape))
+        with self.assertRaises(ValueError):
+            frame.image
+
+        video.seek(1)
+        frame = next(iter(video))
+        self.assertEqual(VIDEO_WIDTH, frame.image.shape[1])
+        frame.release()
+        frame.release()
+        self.assertEqual(2, len(buffer_pool))
+
+    def test_thumbnail_outlives_release(self):
+        thumbnail_width = FRAMEABC_CONFIGURATION['thumbnail_width']
+        FRAMEABC_CONFIGURATION['thumbnail_width'] = str(VIDEO_WIDTH)
+        try:
+            buffer_pool = FrameBufferPool()
+            video = VideoFile(VIDEO_PATHNAME, VIDEO_DATETIME, buffer_pool=buffer_pool)
+            frame = next(iter(video))
+            gray_image = frame.gray_image
+            thumbnail_image = frame.thumbnail_image
+            self.assertIsNot(gray_image, thumbnail_image)
+            self.assertTrue((gray_image == thumbnail_image).all())
+            expected_thumbnail_image = thumbnail_image.copy()
+            frame.release()
+            buffer_pool.acquire(gray_image.shape).fill(1)
+            self.assertTrue((expected_thumbnail_image == thumbnail_image).all())
+        finally:
+            FRAMEABC_CONFIGURATION['thumbnail_width'] = thumbnail_width
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+import os
+from tempfile import TemporaryDirectory
+import unittest
+from unittest.mock import Mock
+
+from dateutil.parser import parse as datetime_parse
+import numpy as np
+from video699.event.screen import ScreenEventDetectorScreen
+from video699.interface import ScreenDetectorABC
+from video699.quadrangle.geos import GEOSConvexQuadrangle
+from video699.video.file import CONFIGURATION as FILE_CONFIGURATION, VideoFile
+from video699.video.scene import (
+    AdaptiveThresholdSceneDetector,
+    FrameImageDistanceSceneDetector,
+    ScreenRegionSceneDetector,
+)
+from test.event.test_screen import write_video
+
+
+VIDEO_FPS = 25
+VIDEO_WIDTH = 64
+VIDEO_HEIGHT = 48
+VIDEO_DATETIME = datetime_parse('2018-01-01T00:00:00+00:00')
+SCENE_FRAME_NUMBERS = [1, 11, 21]
+NUM_FRAMES = 30
+CACHE_INDEX = FILE_CONFIGURATION['cache_index']
+
+
+def setUpModule():
+    FILE_CONFIGURATION['cache_index'] = 'no'
+
+
+def tearDownModule():
+    FILE_CONFIGURATION['cache_index'] = CACHE_INDEX
+
+
+def _scene_intensity(frame_number):
+    scene_number = sum(frame_number >= number for number in SCENE_FRAME_NUMBERS)
+    return 127 * (scene_number - 1)
+
+
+def _write_video(pathname, width, height, intensity):
+    write_video(pathname, (
+        np.full((height, width, 3), intensity(frame_number), dtype=np.uint8)
+        for frame_number in range(1, NUM_FRAMES + 1)
+    ), VIDEO_FPS)
+
+
+class TestFrameImageDistanceSceneDetector(unittest.TestCase):
+    """Tests the ability of the FrameImageDistanceSceneDetector class to detect scene transitions.
+
+    """
+
+    def setUp(self):
+        self.dirname = TemporaryDirectory()
+        self.pathname = os.path.join(self.dirname.name, 'scenes.avi')
+        _write_video(self.pathname, VIDEO_WIDTH, VIDEO_HEIGHT, _scene_intensity)
+
+    def tearDown(self):
+        self.dirname.cleanup()
+
+    def test_detects_scenes(self):
+        video = VideoFile(self.pathname, VIDEO_DATETIME)
+        scene_detector = FrameImageDistanceSceneDetector(video)
+        self.assertEqual(VIDEO_FPS, scene_detector.fps)
+        self.assertEqual(VIDEO_WIDTH, scene_detector.width)
+        self.assertEqual(SCENE_FRAME_NUMBERS, [frame.number for frame in scene_detector])
+
+    def test_detects_scenes_in_thumbnails(self):
+        video = VideoFile(self.pathname, VIDEO_DATETIME, buffer_pool=True)
+        scene_detector = FrameImageDistanceSceneDetector(video, thumbnails=True)
+        frames = list(scene_detector)
+        self.assertEqual(SCENE_FRAME_NUMBERS, [frame.number for frame in frames])
+        for frame in frames:
+            height, width, _ = frame.image.shape
+            self.assertEqual(VIDEO_WIDTH, width)
+            self.assertEqual(VIDEO_HEIGHT, height)
+
+    def test_detects_scenes_with_adaptive_threshold(self):
+        video = VideoFile(self.pathname, VIDEO_DATETIME)
+        scene_detector = AdaptiveThresholdSceneDetector(video)
+        self.assertEqual(SCENE_FRAME_NUMBERS, [frame.number for frame in scene_detector])
+
+    def test_detects_scenes_in_proxy_video(self):
+        video = VideoFile(self.pathname, VIDEO_DATETIME)
+        proxy_video = VideoFile(self.pathname, VIDEO_DATETIME, buffer_pool=True)
+        scene_detector = FrameImageDistanceSceneDetector(video, proxy_video)
+        frames = list(scene_detector)
+        self.assertEqual(SCENE_FRAME_NUMBERS, [frame.number for frame in frames])
+        for frame in frames:
+            height, width, _ = frame.image.shape
+            self.assertEqual(VIDEO_WIDTH, width)
+            self.assertEqual(VIDEO_HEIGHT, height)
+
+    def test_reads_original_frames_for_proxy_frames(self):
+        proxy_pathname = os.path.join(self.dirname.name, 'proxy.avi')
+        _write_video(
+            proxy_pathname,
+            VIDEO_WIDTH // 4,
+            VIDEO_HEIGHT // 4,
+            lambda frame_number: 255 - _scene_intensity(frame_number),
+        )
+        video = VideoFile(self.pathname, VIDEO_DATETIME)
+        video._cap = Mock(wraps=video._cap)
+        proxy_video = VideoFile(proxy_pathname, VIDEO_DATETIME, frame_stride=2)
+        scene_detector = FrameImageDistanceSceneDetector(video, proxy_video)
+        for frame_number in SCENE_FRAME_NUMBERS:
+            frame = next(scene_detector)
+            self.assertEqual(frame_number, frame.number)
+            height, width, _ = frame.image.shape
+            self.assertEqual(VIDEO_WIDTH, width)
+            self.assertEqual(VIDEO_HEIGHT, height)
+            self.assertAlmostEqual(
+                _scene_intensity(frame_number),
+                int(frame.image[0, 0, 0]),
+                delta=2,
+            )
+        with self.assertRaises(StopIteration):
+            next(scene_detector)
+        video._cap.open.assert_not_called()
+
+
+class _ScreenRegionSceneDetectorScreenDetector(ScreenDetectorABC):
+    def __init__(self, coordinates):
+        self.coordinates = coordinates
+        self.num_detected_frames = 0
+
+    def detect(self, frame):
+        self.num_detected_frames += 1
+        return (ScreenEventDetectorScreen(frame, self.coordinates),)
+
+
+class TestScreenRegionSceneDetector(unittest.TestCase):
+    """Tests the ability of the ScreenRegionSceneDetector class to detect scene transitions in screens.
+
+    """
+
+    def setUp(self):
+        self.dirname = TemporaryDirectory()
+        self.pathname = os.path.join(self.dirname.name, 'screens.avi')
+        self.width, self.height = 160, 120
+        self._write_video(self.pathname)
+        self.coordinates = GEOSConvexQuadrangle((80, 20), (150, 20), (80, 100), (150, 100))
+
+    def tearDown(self):
+        self.dirname.cleanup()
+
+    def _images(self, lit_frame_number=None):
+        for frame_number in range(1, NUM_FRAMES + 1):
+            scene_number = sum(frame_number >= number for number in SCENE_FRAME_NUMBERS)
+            image = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            image[20:100, 80:150] = 80 * scene_number
+            x = 2 * frame_number
+            image[40:100, x:x + 20] = 255
+            if lit_frame_number is not None and frame_number >= lit_frame_number:
+                image[:, :75] = 255
+            yield image
+
+    def _write_video(self, pathname, lit_frame_number=None):
+        write_video(pathname, self._images(lit_frame_number), VIDEO_FPS)
+
+    def test_detects_scenes_in_screens(self):
+        video = VideoFile(self.pathname, VIDEO_DATETIME)
+        screen_detector = _ScreenRegionSceneDetectorScreenDetector(self.coordinates)
+        scene_detector = ScreenRegionSceneDetector(video, screen_detector)
+        frames = list(scene_detector)
+        self.assertEqual(SCENE_FRAME_NUMBERS, [frame.number for frame in frames])
+        self.assertEqual(len(SCENE_FRAME_NUMBERS), screen_detector.num_detected_frames)
+        for frame in frames:
+            screen, = scene_detector.screen_detector.detect(frame)
+            self.assertEqual(self.coordinates, screen.coordinates)
+        self.assertEqual(len(SCENE_FRAME_NUMBERS), screen_detector.num_detected_frames)
+
+    def test_detects_screens_lit_outside_screens(self):
+        lit_frame_number = 15
+        pathname = os.path.join(self.dirname.name, 'lit-screens.avi')
+        self._write_video(pathname, lit_frame_number)
+        video = VideoFile(pathname, VIDEO_DATETIME)
+        screen_detector = _ScreenRegionSceneDetectorScreenDetector(self.coordinates)
+        scene_detector = ScreenRegionSceneDetector(video, screen_detector)
+        self.assertEqual(
+            sorted(SCENE_FRAME_NUMBERS + [lit_frame_number]),
+            [frame.number for frame in scene_detector],
+        )
+
+    def test_adaptive_threshold_disregards_motion(self):
+        video = VideoFile(self.pathname, VIDEO_DATETIME)
+        scene_detector = AdaptiveThresholdSceneDetector(video)
+        self.assertEqual(SCENE_FRAME_NUMBERS, [frame.number for frame in scene_detector])
+        self.assertLess(0.0, scene_detector.mean_distance)
+
+    def test_detects_scenes_in_frames_without_screens(self):
+        video = VideoFile(self.pathname, VIDEO_DATETIME)
+        screen_detector = _ScreenRegionSceneDetectorScreenDetector(self.coordinates)
+        screen_detector.detect = lambda frame: ()
+        scene_detector = ScreenRegionSceneDetector(video, screen_detector)
+        self.assertEqual(SCENE_FRAME_NUMBERS, [frame.number for frame in scene_detector])
+
+
+if __name__ == '__main__':
+    unittest.main()
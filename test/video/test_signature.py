@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+import os
+from tempfile import TemporaryDirectory
+import unittest
+from unittest.mock import call, patch
+
+from dateutil.parser import parse as datetime_parse
+import numpy as np
+from video699.event.screen import ScreenEventDetectorVideo
+from video699.video.file import CONFIGURATION as FILE_CONFIGURATION, VideoFile
+from video699.video.scene import FrameImageDistanceSceneDetector, SignatureSceneDetector
+from video699.video.signature import FrameSignatures
+from test.event.test_screen import write_video
+
+
+VIDEO_FPS = 25
+VIDEO_WIDTH = 64
+VIDEO_HEIGHT = 48
+VIDEO_DATETIME = datetime_parse('2018-01-01T00:00:00+00:00')
+SCENE_INTENSITIES = [0, 40, 60, 160]
+SCENE_LENGTH = 10
+CACHE_INDEX = FILE_CONFIGURATION['cache_index']
+
+
+def setUpModule():
+    FILE_CONFIGURATION['cache_index'] = 'no'
+
+
+def tearDownModule():
+    FILE_CONFIGURATION['cache_index'] = CACHE_INDEX
+
+
+def _write_video(pathname, intensities):
+    write_video(pathname, (
+        np.full((VIDEO_HEIGHT, VIDEO_WIDTH, 3), intensity, dtype=np.uint8)
+        for intensity in intensities
+        for _ in range(SCENE_LENGTH)
+    ), VIDEO_FPS)
+
+
+class TestFrameSignatures(unittest.TestCase):
+    """Tests the ability of the FrameSignatures class to store, and select frame signatures.
+
+    """
+
+    def setUp(self):
+        self.dirname = TemporaryDirectory()
+        self.cache_dirname_patch = patch(
+            'video699.video.signature.get_cache_dirname',
+            return_value=self.dirname.name,
+        )
+        self.cache_dirname_patch.start()
+        self.pathname = os.path.join(self.dirname.name, 'signatures.avi')
+        _write_video(self.pathname, SCENE_INTENSITIES)
+
+    def tearDown(self):
+        self.cache_dirname_patch.stop()
+        self.dirname.cleanup()
+
+    def test_stores_signatures(self):
+        video = VideoFile(self.pathname, VIDEO_DATETIME)
+        signatures = FrameSignatures(video)
+        self.assertEqual(video.uri, signatures.uri)
+        self.assertEqual(len(SCENE_INTENSITIES) * SCENE_LENGTH, len(signatures))
+        self.assertEqual(1, signatures.frame_numbers[0])
+
+        stored_signatures = FrameSignatures(VideoFile(self.pathname, VIDEO_DATETIME, end=timedelta(0)))
+        self.assertEqual(len(signatures), len(stored_signatures))
+        self.assertTrue((signatures[SCENE_LENGTH + 1] == stored_signatures[SCENE_LENGTH + 1]).all())
+        with self.assertRaises(KeyError):
+            signatures[len(signatures) + 1]
+
+    def test_modified_video_file(self):
+        signatures = FrameSignatures(VideoFile(self.pathname, VIDEO_DATETIME))
+        self.assertEqual(len(SCENE_INTENSITIES) * SCENE_LENGTH, len(signatures))
+
+        _write_video(self.pathname, SCENE_INTENSITIES[:2])
+        os.utime(self.pathname, ns=(0, 0))
+        signatures = FrameSignatures(VideoFile(self.pathname, VIDEO_DATETIME))
+        self.assertEqual(2 * SCENE_LENGTH, len(signatures))
+
+    def test_refuses_video_without_cache_key(self):
+        video = ScreenEventDetectorVideo(
+            VIDEO_FPS, VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_DATETIME, quadrangles=(), pages=(),
+        )
+        with self.assertRaises(ValueError):
+            FrameSignatures(video)
+
+    def test_sampling(self):
+        signatures = FrameSignatures(VideoFile(self.pathname, VIDEO_DATETIME))
+        self.assertEqual(len(SCENE_INTENSITIES) * SCENE_LENGTH, len(signatures))
+        signatures = FrameSignatures(VideoFile(self.pathname, VIDEO_DATETIME, frame_stride=5))
+        self.assertEqual(len(SCENE_INTENSITIES) * SCENE_LENGTH // 5, len(signatures))
+        self.assertEqual([1, 6, 11], list(signatures.frame_numbers[:3]))
+
+    def test_selects_scenes(self):
+        signatures = FrameSignatures(VideoFile(self.pathname, VIDEO_DATETIME))
+        self.assertEqual([1, 11, 21, 31], signatures.select_scenes(0.05))
+        self.assertEqual([1, 11, 31], signatures.select_scenes(0.1))
+        self.assertEqual([1, 31], signatures.select_scenes(0.3))
+        self.assertEqual([12, 22, 32], signatures.select_scenes(0.05, range(12, 41, 5)))
+
+    def test_matches_thumbnail_scene_detector(self):
+        signatures = FrameSignatures(VideoFile(self.pathname, VIDEO_DATETIME))
+        for max_mean_distance in (0.05, 0.1, 0.3):
+            video = VideoFile(self.pathname, VIDEO_DATETIME)
+            scene_detector = SignatureSceneDetector(video, signatures, max_mean_distance)
+            self.assertEqual(
+                signatures.select_scenes(max_mean_distance),
+                [frame.number for frame in scene_detector],
+            )
+
+        video = VideoFile(self.pathname, VIDEO_DATETIME)
+        scene_detector = SignatureSceneDetector(video, signatures)
+        thumbnail_scene_detector = FrameImageDistanceSceneDetector(
+            VideoFile(self.pathname, VIDEO_DATETIME),
+            thumbnails=True,
+        )
+        self.assertEqual(
+            [frame.number for frame in thumbnail_scene_detector],
+            [frame.number for frame in scene_detector],
+        )
+
+    def test_decodes_only_scenes(self):
+        signatures = FrameSignatures(VideoFile(self.pathname, VIDEO_DATETIME))
+        video = VideoFile(self.pathname, VIDEO_DATETIME)
+        with patch.object(video, 'frames', wraps=video.frames) as frames:
+            scene_detector = SignatureSceneDetector(video, signatures, 0.05)
+            self.assertEqual([1, 11, 21, 31], [frame.number for frame in scene_detector])
+        self.assertEqual([call(1, 1), call(11, 11), call(21, 21), call(31, 31)], frames.call_args_list)
+
+    def test_sampled_video(self):
+        signatures = FrameSignatures(VideoFile(self.pathname, VIDEO_DATETIME))
+        start = timedelta(seconds=11 / VIDEO_FPS)
+        for kwargs, expected_frame_numbers in (
+                    ({'frame_stride': 5}, [1, 11, 21, 31]),
+                    ({'frame_stride': 5, 'start': start}, [12, 22, 32]),
+                    ({'sample_fps': 5, 'start': start}, [12, 21, 31]),
+                ):
+            video = VideoFile(self.pathname, VIDEO_DATETIME, **kwargs)
+            self.assertEqual(
+                [frame.number for frame in VideoFile(self.pathname, VIDEO_DATETIME, **kwargs)],
+                video.sampled_frame_numbers(signatures.frame_numbers),
+            )
+            scene_detector = SignatureSceneDetector(video, signatures, 0.05)
+            self.assertEqual(expected_frame_numbers, [frame.number for frame in scene_detector])
+
+
+if __name__ == '__main__':
+    unittest.main()
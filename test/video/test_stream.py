@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+import gc
+import os
+from tempfile import TemporaryDirectory
+from time import sleep
+import unittest
+from unittest.mock import patch
+import weakref
+
+import cv2 as cv
+import numpy as np
+from video699.video.stream import StreamVideo
+from test.event.test_screen import write_video
+
+
+VIDEO_FPS = 25
+VIDEO_WIDTH = 64
+VIDEO_HEIGHT = 48
+NUM_FRAMES = 20
+
+
+class _EndlessVideoCapture(object):
+    """A video capture of an endless video source, such as a pipe, or a device.
+
+    """
+
+    def __init__(self, source):
+        self.is_released = False
+
+    def isOpened(self):
+        return not self.is_released
+
+    def get(self, property_id):
+        return {cv.CAP_PROP_FRAME_WIDTH: VIDEO_WIDTH, cv.CAP_PROP_FRAME_HEIGHT: VIDEO_HEIGHT}.get(
+            property_id,
+            0,
+        )
+
+    def grab(self):
+        sleep(0.001)
+        return True
+
+    def retrieve(self, image=None):
+        return (True, np.zeros((VIDEO_HEIGHT, VIDEO_WIDTH, 3), dtype=np.uint8))
+
+    def release(self):
+        self.is_released = True
+
+
+class TestStreamVideo(unittest.TestCase):
+    """Tests the ability of the StreamVideo class to drop frames when processing falls behind.
+
+    """
+
+    def setUp(self):
+        self.dirname = TemporaryDirectory()
+        self.pathname = os.path.join(self.dirname.name, 'stream.avi')
+        write_video(self.pathname, (
+            np.full((VIDEO_HEIGHT, VIDEO_WIDTH, 3), frame_number, dtype=np.uint8)
+            for frame_number in range(1, NUM_FRAMES + 1)
+        ), VIDEO_FPS)
+
+    def tearDown(self):
+        self.dirname.cleanup()
+
+    def _read_late(self, video):
+        while video.num_captured_frames < NUM_FRAMES:
+            sleep(0.01)
+        return [frame.number for frame in video]
+
+    def test_reads_all_frames(self):
+        video = StreamVideo(self.pathname, queue_size=NUM_FRAMES, latency_budget=timedelta(hours=1))
+        self.assertEqual(VIDEO_WIDTH, video.width)
+        self.assertEqual(VIDEO_HEIGHT, video.height)
+        frame_numbers = self._read_late(video)
+        self.assertEqual(list(range(1, NUM_FRAMES + 1)), frame_numbers)
+        self.assertEqual(0, video.num_dropped_frames)
+
+    def test_drop_oldest(self):
+        video = StreamVideo(
+            self.pathname,
+            queue_size=3,
+            drop_policy='drop-oldest',
+            latency_budget=timedelta(hours=1),
+        )
+        frame_numbers = self._read_late(video)
+        self.assertEqual([NUM_FRAMES - 2, NUM_FRAMES - 1, NUM_FRAMES], frame_numbers)
+        self.assertEqual(NUM_FRAMES - 3, video.num_dropped_frames)
+
+    def test_keep_latest(self):
+        video = StreamVideo(self.pathname, drop_policy='keep-latest', latency_budget=timedelta(hours=1))
+        self.assertEqual([NUM_FRAMES], self._read_late(video))
+        self.assertEqual(NUM_FRAMES - 1, video.num_dropped_frames)
+
+    def test_latency_budget(self):
+        video = StreamVideo(self.pathname, queue_size=NUM_FRAMES, latency_budget=timedelta())
+        self.assertEqual([NUM_FRAMES], self._read_late(video))
+
+    def test_finalization_stops_capture(self):
+        with patch('video699.video.stream.cv.VideoCapture', _EndlessVideoCapture):
+            video = StreamVideo('endless', drop_policy='keep-latest')
+        next(video).release()
+        thread = video._thread
+        video_reference = weakref.ref(video)
+        del video
+        gc.collect()
+        self.assertIsNone(video_reference())
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+
+    def test_invalid_parameters(self):
+        with patch('sys.unraisablehook') as unraisablehook:
+            with self.assertRaises(ValueError):
+                StreamVideo(self.pathname, drop_policy='drop-newest')
+            with self.assertRaises(ValueError):
+                StreamVideo(self.pathname, queue_size=0)
+            gc.collect()
+        unraisablehook.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,8 @@
 """
 
 import argparse
+from datetime import timedelta
+from functools import partial
 from glob import glob
 from itertools import chain  # FIXME
 
@@ -12,14 +14,49 @@ from dateutil.parser import parse
 from lxml.etree import xmlfile
 
 from .interface import DocumentABC, VideoABC, ConvexQuadrangleTrackerABC, ScreenDetectorABC, \
-    PageDetectorABC
+    PageDetectorABC, EventDetectorABC
 from .event.screen import ScreenEventDetectorABC
 
 
 QUADRANGLE_TRACKER_NAMES = ['rtree_deque']
 SCREEN_DETECTOR_NAMES = ['fastai', 'annotated']
-SCENE_DETECTOR_NAMES = ['distance', 'none']
+SCENE_DETECTOR_NAMES = [
+    'distance', 'thumbnail-distance', 'screen-distance', 'adaptive-distance', 'signature-distance',
+    'none',
+]
 PAGE_DETECTOR_NAMES = ['siamese', 'imagehash', 'vgg16', 'annotated']
+VIDEO_BACKEND_NAMES = ['opencv', 'ffmpeg', 'stream']
+DROP_POLICY_NAMES = ['drop-oldest', 'keep-latest']
+
+
+def _duration(string):
+    """Parses an elapsed time since the beginning of a video from a command-line argument.
+
+    Parameters
+    ----------
+    string : str
+        The elapsed time either in seconds, or in the ``[HH:]MM:SS`` format.
+
+    Returns
+    -------
+    duration : timedelta
+        The elapsed time since the beginning of a video.
+
+    Raises
+    ------
+    argparse.ArgumentTypeError
+        If the elapsed time is malformed or negative.
+    """
+
+    try:
+        seconds = 0.0
+        for component in string.split(':'):
+            seconds = seconds * 60 + float(component)
+    except ValueError:
+        raise argparse.ArgumentTypeError('{} is not an elapsed time'.format(string))
+    if seconds < 0:
+        raise argparse.ArgumentTypeError('{} is a negative elapsed time'.format(string))
+    return timedelta(seconds=seconds)
 
 
 def _documents(args):
@@ -52,13 +89,15 @@ def _documents(args):
     return documents
 
 
-def _video(args):
+def _video(args, verbose=True):
     """Reads a video specified by the arguments of the main script.
 
     Parameters
     ----------
     args : argparse.Namespace
         The arguments received by the main script.
+    verbose : bool, optional
+        Whether a progress bar will be shown during the reading of the video. True if unspecified.
 
     Returns
     -------
@@ -67,28 +106,65 @@ def _video(args):
     """
 
     uri = args.video
-    from .video.file import VideoFile
     date = args.date
+    if args.video_backend == 'stream':
+        from .video.stream import StreamVideo
+        video = StreamVideo(
+            source=uri,
+            drop_policy=args.drop_policy,
+            latency_budget=args.latency_budget,
+            buffer_pool=args.buffer_pool,
+        )
+        assert isinstance(video, VideoABC)
+        return video
     if date is None:
         raise ValueError('Video requires capture date')
-    video = VideoFile(
-        pathname=uri,
-        datetime=parse(date),
-        verbose=True,
-    )
+    if args.video_backend == 'ffmpeg':
+        from .video.ffmpeg import FFmpegVideoFile
+        video = FFmpegVideoFile(
+            pathname=uri,
+            datetime=parse(date),
+            verbose=verbose,
+            buffer_pool=args.buffer_pool,
+            frame_stride=args.frame_stride,
+            sample_fps=args.sample_fps,
+            start=args.start,
+            end=args.end,
+        )
+    elif args.video_backend == 'opencv':
+        from .video.file import VideoFile
+        video = VideoFile(
+            pathname=uri,
+            datetime=parse(date),
+            verbose=verbose,
+            prefetch=args.prefetch,
+            buffer_pool=args.buffer_pool,
+            frame_stride=args.frame_stride,
+            sample_fps=args.sample_fps,
+            start=args.start,
+            end=args.end,
+        )
     assert isinstance(video, VideoABC)
     return video
 
 
-def _scene_detector(video, args):
+def _scene_detector(video, screen_detector, args, first_frame_number=None, last_frame_number=None):
     """Produces a scene event detector from the arguments of the main script.
 
     Parameters
     ----------
     video : VideoABC
         A video in which the scene detector will detect important frames.
+    screen_detector : ScreenDetectorABC
+        The screen detector that will be used to detect lit projection screens in video frames.
     args : argparse.Namespace
         The arguments received by the main script.
+    first_frame_number : int or None, optional
+        The number of the first frame of the video. When ``None`` or unspecified, the video is
+        specified by the arguments of the main script.
+    last_frame_number : int or None, optional
+        The number of the last frame of the video. When ``None`` or unspecified, the video ends
+        with the last frame specified by the arguments of the main script.
 
     Returns
     -------
@@ -101,13 +177,73 @@ def _scene_detector(video, args):
     assert name in SCENE_DETECTOR_NAMES
     if name == 'distance':
         from .video.scene import FrameImageDistanceSceneDetector
-        scene_detector = FrameImageDistanceSceneDetector(video)
+        proxy_video = None
+        if args.low_resolution_prepass:
+            if args.video_backend == 'stream':
+                raise ValueError('The low-resolution pre-pass requires a video file')
+            from .configuration import get_configuration
+            from .video.ffmpeg import FFmpegVideoFile
+            configuration = get_configuration()['FrameImageDistanceSceneDetector']
+            proxy_video = FFmpegVideoFile(
+                pathname=args.video,
+                datetime=video.datetime,
+                frame_stride=args.frame_stride,
+                sample_fps=args.sample_fps,
+                width=configuration.getint('proxy_width'),
+                start=args.start,
+                end=args.end,
+            )
+            if first_frame_number is not None:
+                proxy_video = proxy_video.frames(first_frame_number, last_frame_number)
+        scene_detector = FrameImageDistanceSceneDetector(video, proxy_video)
+    elif name == 'thumbnail-distance':
+        from .video.scene import FrameImageDistanceSceneDetector
+        scene_detector = FrameImageDistanceSceneDetector(video, thumbnails=True)
+    elif name == 'screen-distance':
+        from .video.scene import ScreenRegionSceneDetector
+        scene_detector = ScreenRegionSceneDetector(video, screen_detector)
+    elif name == 'adaptive-distance':
+        from .video.scene import AdaptiveThresholdSceneDetector
+        scene_detector = AdaptiveThresholdSceneDetector(video)
+    elif name == 'signature-distance':
+        if args.video_backend == 'stream':
+            raise ValueError('The stored frame signatures require a video file')
+        from .video.scene import SignatureSceneDetector
+        signatures = _frame_signatures(args, video.datetime)
+        scene_detector = SignatureSceneDetector(video, signatures)
     elif name == 'none':
         scene_detector = video
     assert isinstance(scene_detector, VideoABC)
     return scene_detector
 
 
+def _frame_signatures(args, datetime):
+    """Produces the stored signatures of all frames in the video from the arguments of the main script.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The arguments received by the main script.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+
+    Returns
+    -------
+    signatures : FrameSignatures
+        The stored signatures of all frames in the video.
+    """
+
+    from .video.file import VideoFile
+    from .video.signature import FrameSignatures
+    signatures = FrameSignatures(VideoFile(
+        pathname=args.video,
+        datetime=datetime,
+        prefetch=args.prefetch,
+        buffer_pool=args.buffer_pool,
+    ))
+    return signatures
+
+
 def _screen_event_detector(args):
     """Produces a screen event detector from the arguments of the main script.
 
@@ -116,6 +252,50 @@ def _screen_event_detector(args):
     args : argparse.Namespace
         The arguments received by the main script.
 
+    Returns
+    -------
+    screen_event_detector : EventDetectorABC
+        The screen event detector from the arguments of the main script.
+    """
+
+    if args.processes == 1:
+        return _chunk_screen_event_detector(args)
+    if args.video_backend == 'stream':
+        raise ValueError('Live video streams cannot be processed by multiple processes')
+
+    video = _video(args, verbose=False)
+    first_frame_number, last_frame_number = video.frame_range(args.start, args.end)
+
+    from .event.chunked import ChunkedScreenEventDetector
+    screen_event_detector = ChunkedScreenEventDetector(
+        video,
+        partial(_chunk_screen_event_detector, args),
+        last_frame_number,
+        first_frame_number,
+        num_processes=args.processes,
+        frame_stride=args.frame_stride,
+    )
+    video.close()
+    if args.scene_detector == 'signature-distance':
+        _frame_signatures(args, video.datetime)  # store the signatures before the workers start
+    assert isinstance(screen_event_detector, EventDetectorABC)
+    return screen_event_detector
+
+
+def _chunk_screen_event_detector(args, first_frame_number=None, last_frame_number=None):
+    """Produces a screen event detector for a range of frames from the arguments of the main script.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The arguments received by the main script.
+    first_frame_number : int or None, optional
+        The number of the first frame in the range. When ``None`` or unspecified, the range is
+        specified by the arguments of the main script.
+    last_frame_number : int or None, optional
+        The number of the last frame in the range. When ``None`` or unspecified, the range ends
+        with the last frame specified by the arguments of the main script.
+
     Returns
     -------
     screen_event_detector : ScreenEventDetectorABC
@@ -125,7 +305,18 @@ def _screen_event_detector(args):
     convex_quadrangle_tracker = _convex_quadrangle_tracker(args)
     screen_detector = _screen_detector(args)
     page_detector = _page_detector(args)
-    video = _scene_detector(_video(args), args)
+    if first_frame_number is None:
+        video = _video(args)
+    else:
+        video = _video(args, verbose=False).frames(first_frame_number, last_frame_number)
+    latency_budget = getattr(video, 'latency_budget', None)
+    video = _scene_detector(video, screen_detector, args, first_frame_number, last_frame_number)
+    if args.scene_detector == 'screen-distance':
+        screen_detector = video.screen_detector
+    if args.adaptive_sampling:
+        from .video.adaptive import AdaptiveSampledVideo
+        video = AdaptiveSampledVideo(video, screen_detector)
+        screen_detector = video.screen_detector
 
     from .event.screen import ScreenEventDetector
     screen_event_detector = ScreenEventDetector(
@@ -133,6 +324,7 @@ def _screen_event_detector(args):
         convex_quadrangle_tracker,
         screen_detector,
         page_detector,
+        latency_budget=latency_budget,
     )
     assert isinstance(screen_event_detector, ScreenEventDetectorABC)
     return screen_event_detector
@@ -479,6 +671,95 @@ if __name__ == '__main__':
         help='the video in which the screen detector will detect lit projection screens',
         required=True,
     )
+    parser.add_argument(
+        '-b',
+        '--video-backend',
+        default='opencv',
+        help='the backend that will be used to decode the video',
+        choices=VIDEO_BACKEND_NAMES,
+    )
+    parser.add_argument(
+        '--latency-budget',
+        type=_duration,
+        default=None,
+        help=(
+            'the age in seconds or in the [HH:]MM:SS format after which frames of a live video'
+            ' stream are dropped; the default is taken from the configuration'
+        ),
+    )
+    parser.add_argument(
+        '--drop-policy',
+        default=None,
+        help=(
+            'the policy for dropping frames of a live video stream when processing falls behind;'
+            ' the default is taken from the configuration'
+        ),
+        choices=DROP_POLICY_NAMES,
+    )
+    parser.add_argument(
+        '-j',
+        '--processes',
+        type=int,
+        default=1,
+        help=(
+            'the number of worker processes that will detect screen events in consecutive time'
+            ' ranges of the video'
+        ),
+    )
+    parser.add_argument(
+        '--prefetch',
+        action='store_true',
+        help=(
+            'decode the video in a background thread, while the previous frames are processed; the'
+            ' ffmpeg video backend always decodes the video in a separate process'
+        ),
+    )
+    parser.add_argument(
+        '--buffer-pool',
+        action='store_true',
+        help='decode the video into recycled buffers instead of allocating new image data per frame',
+    )
+    parser.add_argument(
+        '--start',
+        type=_duration,
+        default=None,
+        help='the elapsed time in seconds or in the [HH:]MM:SS format at which processing starts',
+    )
+    parser.add_argument(
+        '--end',
+        type=_duration,
+        default=None,
+        help='the elapsed time in seconds or in the [HH:]MM:SS format at which processing ends',
+    )
+    parser.add_argument(
+        '--low-resolution-prepass',
+        action='store_true',
+        help=(
+            'detect scenes in a low-resolution stream decoded by ffmpeg, and read only the frames'
+            ' that start a new scene at full resolution; requires the distance scene detector'
+        ),
+    )
+    parser.add_argument(
+        '--adaptive-sampling',
+        action='store_true',
+        help=(
+            'process the video sparsely while the lit projection screens are stable, and densely'
+            ' around changes of the screens'
+        ),
+    )
+    sampling = parser.add_mutually_exclusive_group()
+    sampling.add_argument(
+        '--frame-stride',
+        type=int,
+        default=None,
+        help='process only every n-th frame of the video',
+    )
+    sampling.add_argument(
+        '--sample-fps',
+        type=float,
+        default=None,
+        help='process only the first frame in every 1 / n seconds of the video',
+    )
     parser.add_argument(
         '-o',
         '--output',
@@ -487,6 +768,15 @@ if __name__ == '__main__':
     )
 
     args = parser.parse_args()
+    if args.low_resolution_prepass and args.scene_detector != 'distance':
+        parser.error('--low-resolution-prepass requires --scene-detector distance')
     event_detector = _screen_event_detector(args)
     with xmlfile(args.output, encoding='utf-8') as xf:
         event_detector.write_xml(xf)
+    latencies = getattr(event_detector, 'latencies', None)
+    if latencies:
+        print('Produced {} events with mean latency {}, and maximum latency {}'.format(
+            len(latencies),
+            sum(latencies, timedelta()) / len(latencies),
+            max(latencies),
+        ))
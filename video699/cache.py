@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements a shared cache of rendered image data with a byte budget.
+
+"""
+
+from collections import OrderedDict
+from functools import wraps
+from inspect import signature
+from logging import getLogger
+from threading import RLock
+import weakref
+
+from .configuration import get_configuration
+
+
+LOGGER = getLogger(__name__)
+CONFIGURATION = get_configuration()['RenderCache']
+RENDER_CACHE = None
+
+
+class RenderCacheNamespace(object):
+    """The counters of a namespace in a render cache.
+
+    Parameters
+    ----------
+    name : str
+        The name of the namespace.
+
+    Attributes
+    ----------
+    name : str
+        The name of the namespace.
+    num_hits : int
+        The number of lookups that found cached image data.
+    num_misses : int
+        The number of lookups that found no cached image data.
+    num_evictions : int
+        The number of cached image data evicted to keep the cache within the byte budget.
+    num_bytes : int
+        The number of bytes of the image data cached in the namespace.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_evictions = 0
+        self.num_bytes = 0
+
+    def __repr__(self):
+        return '<{classname}, {name}, {num_hits} hits, {num_misses} misses, {num_evictions} ' \
+            'evictions, {num_bytes} bytes>'.format(
+                classname=self.__class__.__name__,
+                name=self.name,
+                num_hits=self.num_hits,
+                num_misses=self.num_misses,
+                num_evictions=self.num_evictions,
+                num_bytes=self.num_bytes,
+            )
+
+
+class RenderCache(object):
+    """A least recently used cache of rendered image data with a byte budget.
+
+    The image data are cached for an owner object, such as an image, and a tuple of arguments, such
+    as the dimensions of the rendered image data. The cache only keeps weak references to the
+    owners, and the image data cached for an owner are evicted as soon as the owner is finalized.
+    Owners that are equal share the cached image data. When the cached image data exceed the byte
+    budget, the least recently used image data are evicted. The cache is split to namespaces, so
+    that the same owner can cache image data produced by several methods, and so that the lookups
+    are counted separately for each method.
+
+    Notes
+    -----
+    The cache can be shared between several threads. The cached image data MUST NOT be modified.
+    The image data cached for finalized owners are evicted lazily, i.e. during the next lookup, or
+    when the size of the cache is requested.
+
+    Parameters
+    ----------
+    max_bytes : int or None, optional
+        The maximum number of bytes of the cached image data. When unspecified or ``None``, the
+        ``max_bytes`` configuration option is used.
+
+    Attributes
+    ----------
+    max_bytes : int
+        The maximum number of bytes of the cached image data.
+    num_bytes : int
+        The number of bytes of the cached image data.
+    namespaces : dict of (str, RenderCacheNamespace)
+        The namespaces of the cache, and their counters.
+    """
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = CONFIGURATION.getint('max_bytes')
+        self.max_bytes = max_bytes
+        self._num_bytes = 0
+        self.namespaces = {}
+        self._entries = OrderedDict()
+        self._owner_keys = {}
+        self._finalized_owners = []
+        self._lock = RLock()
+
+    def namespace(self, name):
+        """Returns the counters of a namespace, creating the namespace if it does not exist.
+
+        Parameters
+        ----------
+        name : str
+            The name of the namespace.
+
+        Returns
+        -------
+        namespace : RenderCacheNamespace
+            The counters of the namespace.
+        """
+        with self._lock:
+            if name not in self.namespaces:
+                self.namespaces[name] = RenderCacheNamespace(name)
+            return self.namespaces[name]
+
+    def _remove(self, key):
+        name, owner_reference, _ = key
+        image = self._entries.pop(key)
+        self._num_bytes -= image.nbytes
+        self.namespaces[name].num_bytes -= image.nbytes
+        owner_keys = self._owner_keys.get(owner_reference)
+        if owner_keys is not None:
+            owner_keys.discard(key)
+            if not owner_keys:
+                del self._owner_keys[owner_reference]
+
+    @property
+    def num_bytes(self):
+        with self._lock:
+            self._remove_finalized_owners()
+            return self._num_bytes
+
+    def _remove_finalized_owners(self):
+        while self._finalized_owners:
+            owner_reference = self._finalized_owners.pop()
+            for key in list(self._owner_keys.get(owner_reference, ())):
+                self._remove(key)
+
+    def get(self, name, owner, arguments, render):
+        """Returns cached image data, rendering and caching the image data on a cache miss.
+
+        Parameters
+        ----------
+        name : str
+            The name of the namespace.
+        owner : object
+            The hashable owner of the image data that supports weak references.
+        arguments : tuple
+            The hashable arguments used to render the image data.
+        render : callable
+            A function without arguments that renders the image data.
+
+        Returns
+        -------
+        image : array_like
+            The cached, or the rendered image data.
+        """
+
+        try:
+            owner_reference = weakref.ref(owner, self._finalized_owners.append)
+        except TypeError:
+            LOGGER.debug('{} does not support weak references, rendering without caching'.format(
+                owner,
+            ))
+            return render()
+        key = (name, owner_reference, arguments)
+
+        with self._lock:
+            self._remove_finalized_owners()
+            namespace = self.namespace(name)
+            if key in self._entries:
+                namespace.num_hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            namespace.num_misses += 1
+
+        image = render()
+        if image.nbytes > self.max_bytes:
+            return image
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            while self._entries and self._num_bytes + image.nbytes > self.max_bytes:
+                evicted_key = next(iter(self._entries))
+                self._remove(evicted_key)
+                self.namespaces[evicted_key[0]].num_evictions += 1
+            self._entries[key] = image
+            self._num_bytes += image.nbytes
+            namespace.num_bytes += image.nbytes
+            self._owner_keys.setdefault(owner_reference, set()).add(key)
+        return image
+
+    def clear(self):
+        """Evicts all cached image data, and resets the counters of all namespaces.
+
+        """
+        with self._lock:
+            self._entries.clear()
+            self._owner_keys.clear()
+            self._finalized_owners.clear()
+            self._num_bytes = 0
+            self.namespaces.clear()
+
+    def __len__(self):
+        with self._lock:
+            self._remove_finalized_owners()
+            return len(self._entries)
+
+
+def get_render_cache():
+    """Returns the render cache shared by the whole package.
+
+    Notes
+    -----
+    The cache is created the first time the function is called, so that the configuration can be
+    modified before.
+
+    Returns
+    -------
+    render_cache : RenderCache
+        The shared render cache.
+    """
+    global RENDER_CACHE
+    if RENDER_CACHE is None:
+        RENDER_CACHE = RenderCache()
+    return RENDER_CACHE
+
+
+def render_cached(name):
+    """Decorates a method that renders image data, so that the image data are cached.
+
+    The image data are cached in the shared render cache for the object, whose method is called,
+    and for the values of all parameters of the method including the default values, so that calls
+    that pass the same values positionally, by keyword, or by omission share the cached image data.
+
+    Parameters
+    ----------
+    name : str
+        The name of the namespace in the shared render cache.
+
+    Returns
+    -------
+    decorator : callable
+        The method decorator.
+    """
+
+    def decorator(method):
+        method_signature = signature(method)
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound_arguments = method_signature.bind(self, *args, **kwargs)
+            bound_arguments.apply_defaults()
+            arguments = tuple(bound_arguments.arguments.values())[1:]
+
+            def render():
+                return method(self, *args, **kwargs)
+
+            return get_render_cache().get(name, self, arguments, render)
+        return wrapper
+
+    return decorator
@@ -9,11 +9,17 @@ from itertools import islice
 from math import ceil, floor, sqrt
 import re
 
+import cv2 as cv
 import numpy as np
 from scipy.stats import norm
 
 
 COLOR_RGBA_TRANSPARENT = (0, 0, 0, 0)
+# The ratio between the true mean absolute differences of RGBA image data, whose alpha channel is
+# constant, and of grayscale image data for changes of equal magnitude in all color channels. The
+# RGBA distances in FrameImageDistanceSceneDetector without thumbnails wrap around, and they do not
+# follow the ratio.
+RGBA_DISTANCE_PER_GRAY_DISTANCE = 3.0 / 4.0
 
 
 def get_batches(iterable, batch_size):
@@ -38,6 +44,52 @@ def get_batches(iterable, batch_size):
     return iter(lambda: tuple(islice(iterator, batch_size)), ())
 
 
+def detect_pages_jointly(page_detector, frames_screens):
+    """Detects document pages in projection screens from several video frames in a single call.
+
+    Notes
+    -----
+    The page detector MUST detect a page in a projection screen independently on the other
+    projection screens, and on the video frame that contains the projection screen.
+
+    Parameters
+    ----------
+    page_detector : PageDetectorABC
+        A page detector.
+    frames_screens : iterable of (FrameABC, iterator, iterator, iterator)
+        Current video frames, and the projection screens that appeared, existed, and disappeared in
+        the frames as specified by the ``frames_screens`` parameter of
+        :meth:`PageDetectorABC.detect_many`.
+
+    Returns
+    -------
+    detected_pages : list of dict of (ScreenABC, PageABC or None)
+        Maps between projection screens that exist in the current video frames and the document
+        pages detected in the projection screens, in the order of the video frames.
+    """
+
+    frames_screens = [
+        (frame, tuple(appeared_screens), tuple(existing_screens))
+        for frame, appeared_screens, existing_screens, _ in frames_screens
+    ]
+    if not frames_screens:
+        return []
+    first_frame, _, _ = frames_screens[0]
+    all_detected_pages = page_detector.detect(
+        first_frame,
+        (screen for _, appeared_screens, _ in frames_screens for screen in appeared_screens),
+        (screen for _, _, existing_screens in frames_screens for screen in existing_screens),
+        (),
+    )
+    return [
+        {
+            screen: all_detected_pages[screen]
+            for screen, _ in appeared_screens + existing_screens
+        }
+        for _, appeared_screens, existing_screens in frames_screens
+    ]
+
+
 def change_aspect_ratio_by_upscaling(original_width, original_height, new_aspect_ratio):
     """Returns new dimensions that upscale an image to a new aspect ratio.
 
@@ -171,6 +223,36 @@ def rescale_and_keep_aspect_ratio(original_width, original_height, new_width=Non
     )
 
 
+def downscale_to_width(image, width, interpolation):
+    """Downscales image data to a width and keeps the aspect ratio of the image data.
+
+    Parameters
+    ----------
+    image : array_like
+        Image data as an OpenCV matrix.
+    width : int
+        The width of the downscaled image data. If the image data are narrower, they are kept at
+        their original dimensions.
+    interpolation : int
+        The OpenCV interpolation flag used when downscaling the image data.
+
+    Returns
+    -------
+    downscaled_image : array_like
+        The downscaled image data as an OpenCV matrix.
+    """
+
+    original_height, original_width = image.shape[:2]
+    if original_width <= width:
+        return image
+    rescaled_width, rescaled_height, *_ = rescale_and_keep_aspect_ratio(
+        original_width,
+        original_height,
+        width,
+    )
+    return cv.resize(image, (rescaled_width, max(1, rescaled_height)), interpolation=interpolation)
+
+
 def timedelta_as_xsd_duration(timedelta):
     """Serializes a timedelta object as a string that satisfies the XML Schema duration datatype.
 
@@ -9,7 +9,7 @@ from itertools import chain
 from logging import getLogger
 import os
 
-from xdg.BaseDirectory import load_config_paths
+from xdg.BaseDirectory import load_config_paths, save_cache_path
 
 
 CONFIGURATION = ConfigParser()
@@ -42,6 +42,72 @@ def get_configuration():
     return CONFIGURATION
 
 
+def get_cache_dirname(name):
+    """Returns a directory for cached data inside the standard XDG cache directory.
+
+    Notes
+    -----
+    The directory is created if it does not exist.
+
+    Parameters
+    ----------
+    name : str
+        The name of the directory.
+
+    Returns
+    -------
+    dirname : str
+        The pathname of the directory.
+    """
+    return save_cache_path(os.path.join(RESOURCE_NAME, name))
+
+
+def evict_cache_files(dirname, max_bytes, suffixes):
+    """Removes the least recently used files from a directory for cached data.
+
+    Notes
+    -----
+    Files are ordered by the time of their last modification, so that cached data need to be marked
+    as recently used by updating the time of the last modification when they are loaded.
+
+    Parameters
+    ----------
+    dirname : str
+        The pathname of a directory for cached data.
+    max_bytes : int
+        The maximum number of bytes of the files that are kept in the directory.
+    suffixes : tuple of str
+        The suffixes of the files with cached data. Other files in the directory are disregarded.
+
+    Returns
+    -------
+    num_bytes : int
+        The number of bytes of the files with cached data kept in the directory.
+    """
+
+    entries = []
+    with os.scandir(dirname) as directory:
+        for entry in directory:
+            if entry.name.endswith(suffixes):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    num_bytes = sum(size for _, size, _ in entries)
+    entries.sort()
+    for _, size, pathname in entries:
+        if num_bytes <= max_bytes:
+            break
+        try:
+            os.remove(pathname)
+        except OSError:
+            continue
+        num_bytes -= size
+        LOGGER.debug('Evicted cached data from {}'.format(pathname))
+    return num_bytes
+
+
 for pathname in CONFIGURATION_FILE_PATHNAMES:
     LOGGER.debug("Reading configuration file {}".format(pathname))
     try:
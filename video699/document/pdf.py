@@ -4,22 +4,257 @@
 
 """
 
-from functools import lru_cache
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+from itertools import islice
 from logging import getLogger
+import os
 from pathlib import Path
+from threading import Lock
 
 import cv2 as cv
 import fitz
 import numpy as np
 
+from ..cache import get_render_cache, render_cached
 from ..common import COLOR_RGBA_TRANSPARENT, rescale_and_keep_aspect_ratio
-from ..configuration import get_configuration
+from ..configuration import evict_cache_files, get_cache_dirname, get_configuration
 from ..interface import DocumentABC, PageABC
 
 
 LOGGER = getLogger(__name__)
 CONFIGURATION = get_configuration()['PDFDocumentPage']
-LRU_CACHE_MAXSIZE = CONFIGURATION.getint('lru_cache_maxsize')
+DOCUMENT_CONFIGURATION = get_configuration()['PDFDocument']
+WORKER_DOCUMENT = None
+IMAGE_CACHE_LOCK = Lock()
+IMAGE_CACHE_NUM_BYTES = {}
+IMAGE_CACHE_SUFFIXES = ('.png', '.npy')
+
+
+def _image_cache_pathname(content_hash, page_number, width, height, rgb):
+    """Returns the pathname of the stored image data of a PDF document page.
+
+    Parameters
+    ----------
+    content_hash : str
+        The hash of the content of the PDF document file.
+    page_number : int
+        The one-based page number.
+    width : int or None
+        The width of the image data as specified by the ``width`` parameter of
+        :meth:`PDFDocumentPage.render`.
+    height : int or None
+        The height of the image data as specified by the ``height`` parameter of
+        :meth:`PDFDocumentPage.render`.
+    rgb : bool
+        Whether the image data are produced by :meth:`PDFDocumentPage.render_rgb` rather than
+        :meth:`PDFDocumentPage.render`.
+
+    Returns
+    -------
+    pathname : str
+        The pathname of a PNG image file, or of a NumPy array file, depending on the
+        ``image_cache_compression`` configuration option.
+    """
+
+    key = sha256('{}\0{}\0{}\0{}\0{}'.format(
+        content_hash,
+        page_number,
+        width,
+        height,
+        'RGB' if rgb else 'RGBA {}'.format(CONFIGURATION['downscale_interpolation']),
+    ).encode('utf8'))
+    suffix = '.png' if CONFIGURATION.getboolean('image_cache_compression') else '.npy'
+    return os.path.join(get_cache_dirname('rendered-pages'), key.hexdigest() + suffix)
+
+
+def _load_cached_image(pathname):
+    """Loads the stored image data of a PDF document page, and marks them as recently used.
+
+    Parameters
+    ----------
+    pathname : str
+        The pathname produced by :func:`_image_cache_pathname`.
+
+    Returns
+    -------
+    image : array_like or None
+        The image data of the page as specified by the return value of
+        :meth:`PDFDocumentPage.render`, or :meth:`PDFDocumentPage.render_rgb`, or ``None`` if the
+        image data are not stored.
+    """
+
+    try:
+        if pathname.endswith('.png'):
+            with open(pathname, 'rb') as f:
+                image = cv.imdecode(np.frombuffer(f.read(), dtype=np.uint8), cv.IMREAD_UNCHANGED)
+            if image is None:
+                return None
+        else:
+            image = np.load(pathname)
+        os.utime(pathname)
+    except (OSError, ValueError):
+        return None
+    return image
+
+
+def _store_cached_image(pathname, image):
+    """Stores the image data of a PDF document page, and evicts the least recently used image data.
+
+    When the stored image data exceed the ``image_cache_max_bytes`` configuration option, the least
+    recently used stored image data are removed.
+
+    Parameters
+    ----------
+    pathname : str
+        The pathname produced by :func:`_image_cache_pathname`.
+    image : array_like
+        The image data of the page as specified by the return value of
+        :meth:`PDFDocumentPage.render`, or :meth:`PDFDocumentPage.render_rgb`.
+    """
+
+    temporary_pathname = '{}.{}.tmp'.format(pathname, os.getpid())
+    try:
+        with open(temporary_pathname, 'wb') as f:
+            if pathname.endswith('.png'):
+                f.write(cv.imencode('.png', image)[1].tobytes())
+            else:
+                np.save(f, image)
+        os.replace(temporary_pathname, pathname)
+        num_bytes = os.path.getsize(pathname)
+    except OSError as err:
+        LOGGER.warning('Failed to store rendered image data in {}: {}'.format(pathname, err))
+        return
+
+    max_bytes = CONFIGURATION.getint('image_cache_max_bytes')
+    dirname = os.path.dirname(pathname)
+    with IMAGE_CACHE_LOCK:
+        if dirname in IMAGE_CACHE_NUM_BYTES:
+            IMAGE_CACHE_NUM_BYTES[dirname] += num_bytes
+            if IMAGE_CACHE_NUM_BYTES[dirname] <= max_bytes:
+                return
+        IMAGE_CACHE_NUM_BYTES[dirname] = evict_cache_files(dirname, max_bytes, IMAGE_CACHE_SUFFIXES)
+
+
+def _render_page(page, default_width, default_height, width, height, rgb):
+    """Renders the image data of a PDF document page.
+
+    Parameters
+    ----------
+    page : fitz.Page
+        The internal representation of the page by the PyMuPDF library.
+    default_width : int
+        The width of the page rendered at the default resolution.
+    default_height : int
+        The height of the page rendered at the default resolution.
+    width : int or None
+        The width of the image data as specified by the ``width`` parameter of
+        :meth:`PDFDocumentPage.render`.
+    height : int or None
+        The height of the image data as specified by the ``height`` parameter of
+        :meth:`PDFDocumentPage.render`.
+    rgb : bool
+        Whether the image data are rendered as specified by the return value of
+        :meth:`PDFDocumentPage.render_rgb` rather than :meth:`PDFDocumentPage.render`.
+
+    Returns
+    -------
+    image : array_like
+        The image data of the page as specified by the return value of
+        :meth:`PDFDocumentPage.render`, or :meth:`PDFDocumentPage.render_rgb`.
+    """
+    rescaled_width, rescaled_height, top_margin, bottom_margin, left_margin, right_margin = \
+        rescale_and_keep_aspect_ratio(default_width, default_height, width, height)
+
+    if rgb:
+        # Render the page directly at the rescaled dimensions, and copy the image data into the
+        # black margins, clipping the subpixel overhang that MuPDF adds when rounding outwards.
+        zoom_matrix = fitz.Matrix(rescaled_width / default_width, rescaled_height / default_height)
+        pixmap = page.getPixmap(matrix=zoom_matrix, alpha=False)
+        rgb_image = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape((pixmap.h, pixmap.w, 3))
+        if pixmap.w < rescaled_width or pixmap.h < rescaled_height:
+            rgb_image = cv.resize(rgb_image, (rescaled_width, rescaled_height))
+        rgb_image_with_margins = np.zeros(
+            (
+                top_margin + rescaled_height + bottom_margin,
+                left_margin + rescaled_width + right_margin,
+                3,
+            ),
+            dtype=np.uint8,
+        )
+        rgb_image_with_margins[
+            top_margin:top_margin + rescaled_height,
+            left_margin:left_margin + rescaled_width,
+        ] = rgb_image[:rescaled_height, :rescaled_width]
+        return rgb_image_with_margins
+
+    # Subtract 1, so that the dimensions of getPixmap(matrix=zoom_matrix) are never less than
+    # rescaled_width x rescaled_height due to subpixel errors.
+    zoom_x = rescaled_width / max(1, default_width - 1)
+    zoom_y = rescaled_height / max(1, default_height - 1)
+    zoom_matrix = fitz.Matrix(zoom_x, zoom_y)
+    pixmap = page.getPixmap(matrix=zoom_matrix, alpha=False)
+    rgb_image = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape((pixmap.h, pixmap.w, 3))
+    rgba_image = cv.cvtColor(rgb_image, cv.COLOR_RGB2RGBA)
+    downscale_interpolation = cv.__dict__[CONFIGURATION['downscale_interpolation']]
+    rgba_image_downscaled = cv.resize(
+        rgba_image,
+        (rescaled_width, rescaled_height),
+        downscale_interpolation,
+    )
+    rgba_image_downscaled_with_margins = cv.copyMakeBorder(
+        rgba_image_downscaled,
+        top_margin,
+        bottom_margin,
+        left_margin,
+        right_margin,
+        borderType=cv.BORDER_CONSTANT,
+        value=COLOR_RGBA_TRANSPARENT,
+    )
+    return rgba_image_downscaled_with_margins
+
+
+def _open_worker_document(pathname):
+    """Opens a PDF document file in a worker process, so that the worker process can render pages.
+
+    Parameters
+    ----------
+    pathname : str
+        The pathname of a PDF document file.
+    """
+    global WORKER_DOCUMENT
+    WORKER_DOCUMENT = fitz.open(pathname)
+
+
+def _render_worker_page(page_index, default_width, default_height, sizes, rgb):
+    """Renders the image data of a page of the PDF document opened in a worker process.
+
+    Parameters
+    ----------
+    page_index : int
+        The zero-based index of the page in the PDF document.
+    default_width : int
+        The width of the page rendered at the default resolution.
+    default_height : int
+        The height of the page rendered at the default resolution.
+    sizes : tuple of (int or None, int or None)
+        The widths, and heights of the image data as specified by the ``width``, and ``height``
+        parameters of :meth:`PDFDocumentPage.render`.
+    rgb : bool
+        Whether the image data are rendered as specified by the return value of
+        :meth:`PDFDocumentPage.render_rgb` rather than :meth:`PDFDocumentPage.render`.
+
+    Returns
+    -------
+    images : list of array_like
+        The image data of the page in the order of the dimensions.
+    """
+    page = WORKER_DOCUMENT[page_index]
+    return [
+        _render_page(page, default_width, default_height, width, height, rgb)
+        for width, height in sizes
+    ]
 
 
 class PDFDocumentPage(PageABC):
@@ -27,10 +262,11 @@ class PDFDocumentPage(PageABC):
 
     Parameters
     ----------
-    document : DocumentABC
+    document : PDFDocument
         The document containing the page.
-    page : fitz.Page
-        The internal representation of the page by the PyMuPDF library.
+    number : int
+        The page number, i.e. the position of the page in the document. Page indexing is one-based,
+        i.e. the first page has number 1.
 
     Attributes
     ----------
@@ -44,15 +280,51 @@ class PDFDocumentPage(PageABC):
     number : int
         The page number, i.e. the position of the page in the document. Page indexing is one-based,
         i.e. the first page has number 1.
+
+    Notes
+    -----
+    When the ``image_cache`` configuration option is enabled, the rendered image data are stored
+    in the XDG cache directory keyed by the hash of the content of the PDF document file, by the
+    page number, by the dimensions of the image data, and by the interpolation used to downscale
+    them, so that a page is not rendered again on a subsequent run.
+
+    The :meth:`render_rgb` method renders the page in the RGB color space directly at the
+    requested dimensions, and places the image data in the black margins in a single step, so
+    that the page is neither rendered at a higher resolution, nor downscaled, nor converted from
+    the RGBA color space.
+
+    The page is loaded by the PyMuPDF library only when its dimensions are first requested, and
+    whenever it is rendered, so that the pages of a large document take no memory until they are
+    used. The dimensions of the page are read from the page rectangle without rendering the page.
     """
 
-    def __init__(self, document, page):
+    def __init__(self, document, number):
         self._document = document
-        self._page = page
+        self._number = number
         self._hash = hash((self.number, self.document))
-        pixmap = page.getPixmap()
-        self._default_width = pixmap.width
-        self._default_height = pixmap.height
+        self._default_size = None
+
+    @property
+    def _page(self):
+        return self._document._document[self._number - 1]
+
+    @property
+    def _default_width(self):
+        if self._default_size is None:
+            self._read_default_size()
+        return self._default_size[0]
+
+    @property
+    def _default_height(self):
+        if self._default_size is None:
+            self._read_default_size()
+        return self._default_size[1]
+
+    def _read_default_size(self):
+        # The dimensions of the page rectangle rounded outwards are the dimensions of the page
+        # rendered at the default resolution of 72 DPI.
+        page_rectangle = self._page.rect.irect
+        self._default_size = (page_rectangle.width, page_rectangle.height)
 
     @property
     def document(self):
@@ -60,41 +332,51 @@ class PDFDocumentPage(PageABC):
 
     @property
     def number(self):
-        return self._page.number + 1
+        return self._number
 
     @property
     def image(self):
         rgba_image = self.render()
         return rgba_image
 
-    @lru_cache(maxsize=LRU_CACHE_MAXSIZE, typed=False)
+    def _image_cache_pathname(self, width, height, rgb):
+        if not CONFIGURATION.getboolean('image_cache'):
+            return None
+        return _image_cache_pathname(self.document.content_hash, self.number, width, height, rgb)
+
+    def _load_cached_image(self, width, height, rgb):
+        pathname = self._image_cache_pathname(width, height, rgb)
+        return _load_cached_image(pathname) if pathname is not None else None
+
+    def _store_cached_image(self, width, height, rgb, image):
+        pathname = self._image_cache_pathname(width, height, rgb)
+        if pathname is not None:
+            _store_cached_image(pathname, image)
+
+    def _render(self, width, height, rgb):
+        image = self._load_cached_image(width, height, rgb)
+        if image is None:
+            image = _render_page(
+                self._page,
+                self._default_width,
+                self._default_height,
+                width,
+                height,
+                rgb,
+            )
+            self._store_cached_image(width, height, rgb, image)
+        return image
+
+    @render_cached('PDFDocumentPage.render')
     def render(self, width=None, height=None):
-        rescaled_width, rescaled_height, top_margin, bottom_margin, left_margin, right_margin = \
-            rescale_and_keep_aspect_ratio(self._default_width, self._default_height, width, height)
-        # Subtract 1, so that the dimensions of getPixmap(zoom_matrix) are never less than
-        # rescaled_width x rescaled_height due to subpixel errors.
-        zoom_x = rescaled_width / max(1, self._default_width - 1)
-        zoom_y = rescaled_height / max(1, self._default_height - 1)
-        zoom_matrix = fitz.Matrix(zoom_x, zoom_y)
-        pixmap = self._page.getPixmap(zoom_matrix, alpha=False)
-        rgb_image = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape((pixmap.h, pixmap.w, 3))
-        rgba_image = cv.cvtColor(rgb_image, cv.COLOR_RGB2RGBA)
-        downscale_interpolation = cv.__dict__[CONFIGURATION['downscale_interpolation']]
-        rgba_image_downscaled = cv.resize(
-            rgba_image,
-            (rescaled_width, rescaled_height),
-            downscale_interpolation,
-        )
-        rgba_image_downscaled_with_margins = cv.copyMakeBorder(
-            rgba_image_downscaled,
-            top_margin,
-            bottom_margin,
-            left_margin,
-            right_margin,
-            borderType=cv.BORDER_CONSTANT,
-            value=COLOR_RGBA_TRANSPARENT,
-        )
-        return rgba_image_downscaled_with_margins
+        return self._render(width, height, False)
+
+    @render_cached('PDFDocumentPage.render_rgb')
+    def render_rgb(self, width=None, height=None):
+        return self._render(width, height, True)
+
+    def render_many(self, sizes):
+        return [self.render(width, height) for width, height in sizes]
 
     def __hash__(self):
         return self._hash
@@ -108,7 +390,9 @@ class PDFDocument(DocumentABC):
     Note
     ----
     A document file is opened as soon as the class is instantiated, and closed only after the
-    finalization of the object.
+    finalization of the object. When the pages of a large document are rendered in advance using
+    :meth:`prerender`, they are rendered in parallel by a pool of worker processes, each of which
+    opens the document file separately.
 
     Parameters
     ----------
@@ -123,6 +407,8 @@ class PDFDocument(DocumentABC):
         The author of a document.
     pathname : str
         The pathname of a PDF document file.
+    content_hash : str
+        The SHA-256 hash of the content of the PDF document file.
     uri : string
         An IRI, as defined in RFC3987_, that uniquely indentifies the document over the entire
         lifetime of a program.
@@ -138,6 +424,7 @@ class PDFDocument(DocumentABC):
         self.pathname = pathname
         self._uri = Path(pathname).resolve().as_uri()
         self._hash = hash(self._uri)
+        self._content_hash = None
 
         self._document = fitz.open(pathname)
         if not self._document.isPDF:
@@ -147,7 +434,10 @@ class PDFDocument(DocumentABC):
         self._author = self._document.metadata['author']
 
         LOGGER.debug('Loading PDF document {}'.format(pathname))
-        self._pages = [PDFDocumentPage(self, page) for page in self._document]
+        self._pages = [
+            PDFDocumentPage(self, page_index + 1)
+            for page_index in range(len(self._document))
+        ]
         if not self._pages:
             raise ValueError('PDF document at "{}" contains no pages'.format(pathname))
 
@@ -163,8 +453,80 @@ class PDFDocument(DocumentABC):
     def uri(self):
         return self._uri
 
+    @property
+    def content_hash(self):
+        if self._content_hash is None:
+            content_hash = sha256()
+            with open(self.pathname, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    content_hash.update(chunk)
+            self._content_hash = content_hash.hexdigest()
+        return self._content_hash
+
     def __iter__(self):
         return iter(self._pages)
 
+    def prerender(self, sizes, rgb=False):
+        sizes = tuple(tuple(size) for size in sizes)
+        num_workers = DOCUMENT_CONFIGURATION.getint('num_workers') or os.cpu_count() or 1
+        min_num_parallel_pages = DOCUMENT_CONFIGURATION.getint('min_num_parallel_pages')
+        if not sizes or num_workers < 2 or len(self._pages) < min_num_parallel_pages:
+            for page in self:
+                for width, height in sizes:
+                    if rgb:
+                        page.render_rgb(width, height)
+                    else:
+                        page.render(width, height)
+                yield page
+            return
+
+        LOGGER.debug('Rendering {} pages of PDF document {} using {} worker processes'.format(
+            len(self._pages),
+            self.pathname,
+            num_workers,
+        ))
+        render_cache = get_render_cache()
+        namespace = 'PDFDocumentPage.render_rgb' if rgb else 'PDFDocumentPage.render'
+        pages = iter(self._pages)
+        with ProcessPoolExecutor(
+                    num_workers,
+                    initializer=_open_worker_document,
+                    initargs=(self.pathname, ),
+                ) as executor:
+
+            def submit(page):
+                images = {}
+                for size in sizes:
+                    image = page._load_cached_image(*size, rgb)
+                    if image is not None:
+                        images[size] = image
+                missing_sizes = tuple(size for size in sizes if size not in images)
+                future = None
+                if missing_sizes:
+                    future = executor.submit(
+                        _render_worker_page,
+                        page.number - 1,
+                        page._default_width,
+                        page._default_height,
+                        missing_sizes,
+                        rgb,
+                    )
+                return (page, images, missing_sizes, future)
+
+            # Keep a bounded number of pages in flight, so that the rendered image data waiting
+            # for a slow consumer do not accumulate in memory.
+            pending_pages = deque(submit(page) for page in islice(pages, 2 * num_workers))
+            while pending_pages:
+                page, images, missing_sizes, future = pending_pages.popleft()
+                if future is not None:
+                    for size, image in zip(missing_sizes, future.result()):
+                        page._store_cached_image(*size, rgb, image)
+                        images[size] = image
+                for next_page in islice(pages, 1):
+                    pending_pages.append(submit(next_page))
+                for size, image in images.items():
+                    render_cache.get(namespace, page, size, lambda: image)
+                yield page
+
     def __hash__(self):
         return self._hash
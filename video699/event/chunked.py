@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements the detection of screen events in time ranges of a single video that are
+processed in parallel by a pool of worker processes. The screen events detected in the individual
+time ranges are stitched into a single stream of screen events.
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from logging import getLogger
+from math import ceil
+import os
+
+from lxml.etree import Element, fromstring, xmlfile
+
+from ..common import timedelta_as_xsd_duration
+from ..configuration import get_configuration
+from ..interface import EventABC, EventDetectorABC
+from ..quadrangle.geos import GEOSConvexQuadrangle
+
+
+LOGGER = getLogger(__name__)
+CONFIGURATION = get_configuration()['ChunkedScreenEventDetector']
+COORDINATE_NAMES = ('x0', 'y0', 'x1', 'y1', 'x2', 'y2', 'x3', 'y3')
+
+
+def _detect_chunk_events(event_detector_factory, first_frame_number, last_frame_number):
+    """Detects screen events in a range of video frames and serializes them to XML.
+
+    Parameters
+    ----------
+    event_detector_factory : callable
+        A function that receives the numbers of the first and the last frame in the range, and
+        produces a screen event detector whose video contains only frames in the range.
+    first_frame_number : int
+        The number of the first frame in the range.
+    last_frame_number : int
+        The number of the last frame in the range.
+
+    Returns
+    -------
+    serialized_events : list of bytes
+        The XML fragments that represent the detected screen events.
+    """
+
+    event_detector = event_detector_factory(first_frame_number, last_frame_number)
+    serialized_events = []
+    for event in event_detector:
+        f = BytesIO()
+        with xmlfile(f, encoding='utf-8') as xf:
+            event.write_xml(xf)
+        serialized_events.append(f.getvalue())
+    return serialized_events
+
+
+def _frame_duration(video, frame_number):
+    """Reads the elapsed time since the beginning of a video from a video frame.
+
+    Parameters
+    ----------
+    video : VideoABC
+        A video that supports the repositioning to a range of frames using the ``frames`` method,
+        such as :class:`video699.video.file.VideoFile`.
+    frame_number : int
+        The number of the video frame.
+
+    Returns
+    -------
+    duration : timedelta or None
+        The elapsed time since the beginning of the video at the video frame, or ``None`` if the
+        video does not contain the frame.
+    """
+
+    for frame in video.frames(frame_number, frame_number):
+        duration = frame.duration
+        frame.release()
+        return duration
+    return None
+
+
+class _ScreenState(object):
+    """The state of a projection screen showing a document page.
+
+    Parameters
+    ----------
+    document_uri : str
+        The URI of the document containing the shown page.
+    page_number : str
+        The number of the shown page.
+    coordinates : tuple of str
+        The coordinates of the screen corners in a video frame coordinate system.
+
+    Attributes
+    ----------
+    document_uri : str
+        The URI of the document containing the shown page.
+    page_number : str
+        The number of the shown page.
+    coordinates : tuple of str
+        The coordinates of the screen corners in a video frame coordinate system.
+    """
+
+    def __init__(self, document_uri, page_number, coordinates):
+        self.document_uri = document_uri
+        self.page_number = page_number
+        self.coordinates = coordinates
+
+    @property
+    def quadrangle(self):
+        x0, y0, x1, y1, x2, y2, x3, y3 = map(float, self.coordinates)
+        return GEOSConvexQuadrangle((x0, y0), (x1, y1), (x2, y2), (x3, y3))
+
+    def jaccard_index(self, other):
+        quadrangle = self.quadrangle
+        other_quadrangle = other.quadrangle
+        union_area = quadrangle.union_area(other_quadrangle)
+        if union_area == 0:
+            return 1.0 if self.coordinates == other.coordinates else 0.0
+        return quadrangle.intersection_area(other_quadrangle) / union_area
+
+
+def _update_screen_states(screen_states, xml_element):
+    """Updates the states of projection screens with a serialized screen event.
+
+    Parameters
+    ----------
+    screen_states : dict of (str, _ScreenState)
+        A map between screen identifiers, and the states of the screens.
+    xml_element : lxml.etree.Element
+        An XML element that represents a screen event.
+    """
+
+    screen_id = xml_element.attrib['screen-id']
+    if xml_element.tag == 'screen-appeared-event':
+        screen_states[screen_id] = _ScreenState(
+            xml_element.attrib['document-uri'],
+            xml_element.attrib['page-number'],
+            tuple(xml_element.attrib[name] for name in COORDINATE_NAMES),
+        )
+    elif xml_element.tag == 'screen-changed-content-event':
+        screen_state = screen_states[screen_id]
+        screen_state.document_uri = xml_element.attrib['document-uri']
+        screen_state.page_number = xml_element.attrib['page-number']
+    elif xml_element.tag == 'screen-moved-event':
+        screen_state = screen_states[screen_id]
+        screen_state.coordinates = tuple(xml_element.attrib[name] for name in COORDINATE_NAMES)
+    elif xml_element.tag == 'screen-disappeared-event':
+        del screen_states[screen_id]
+
+
+class SerializedScreenEvent(EventABC):
+    """A screen event that was detected in a worker process, and serialized to XML.
+
+    Parameters
+    ----------
+    xml_element : lxml.etree.Element
+        An XML element that represents the screen event.
+
+    Attributes
+    ----------
+    xml_element : lxml.etree.Element
+        An XML element that represents the screen event.
+    screen_id : str
+        A screen identifier.
+    frame_number : int
+        The number of a frame in which the event takes place.
+    """
+
+    def __init__(self, xml_element):
+        self.xml_element = xml_element
+
+    @property
+    def screen_id(self):
+        return self.xml_element.attrib['screen-id']
+
+    @property
+    def frame_number(self):
+        return int(self.xml_element.attrib['frame-number'])
+
+    def write_xml(self, xf):
+        xf.write(self.xml_element)
+
+    def __repr__(self):
+        return '<{classname}, {tag}, {screen_id}, frame #{frame_number}>'.format(
+            classname=self.__class__.__name__,
+            tag=self.xml_element.tag,
+            screen_id=self.screen_id,
+            frame_number=self.frame_number,
+        )
+
+
+class ChunkedScreenEventDetector(EventDetectorABC):
+    r"""A detector that detects screen events in time ranges of a video using worker processes.
+
+    The frames of a video are split into consecutive ranges (*chunks*). Screen events are detected
+    in the chunks by screen event detectors running in a pool of worker processes. Each chunk
+    except the first one is extended by overlapping frames that precede the chunk. Screen events
+    detected in the overlapping frames, and the appearances of screens in the first frame of a chunk
+    are not produced, but they are used to determine which screens are shown at the beginning of
+    the chunk. These screens are matched with the screens
+    shown at the end of the previous chunk using the Jaccard index of their coordinates. The screen
+    identifiers of matching screens are unified, and :class:`ScreenAppearedEvent`,
+    :class:`ScreenChangedContentEvent`, :class:`ScreenMovedEvent`, and
+    :class:`ScreenDisappearedEvent` events are produced at the beginning of a chunk to reconcile
+    the differences between the two chunks. The elapsed time of these events is read from the
+    first frame of the chunk, which is read from the video using the ``frames`` method.
+
+    Notes
+    -----
+    Screen events are produced as soon as all preceding chunks have been processed.
+    Screen events are produced as :class:`SerializedScreenEvent` objects, since the video frames,
+    the projection screens, and the document pages live in the worker processes.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The video in which the events are detected. The video needs to support the repositioning
+        to a range of frames using the ``frames`` method, such as
+        :class:`video699.video.file.VideoFile`.
+    event_detector_factory : callable
+        A picklable function that receives the numbers of the first and the last frame in a chunk,
+        and produces a :class:`ScreenEventDetectorABC` screen event detector whose video contains
+        only the frames in the chunk. The number of the last frame is ``None`` for the last chunk
+        of a video that is processed until the end. The function is called in the worker processes.
+    last_frame_number : int or None
+        The number of the last frame of the video that will be processed. When ``None``, the video
+        is processed until the end, the video is split to chunks using the estimated number of
+        frames in the ``num_frames`` attribute of the video, and the last chunk ends with the last
+        frame of the video.
+    first_frame_number : int, optional
+        The number of the first frame of the video that will be processed. One if unspecified.
+    num_processes : int or None, optional
+        The number of worker processes. When ``None`` or unspecified, the number of processors is
+        used.
+    num_chunks : int or None, optional
+        The number of chunks. When ``None`` or unspecified, the number of worker processes is used.
+    frame_stride : int, optional
+        The number of frames between two consecutive frames produced by the screen event detectors,
+        counted from the first frame of their videos. The chunks and the overlapping frames start
+        with frames whose distance from the first frame of the video is a multiple of the stride,
+        so that the chunks contain the same frames as the video processed sequentially. One if
+        unspecified.
+
+    Attributes
+    ----------
+    video : VideoABC
+        The video in which the events are detected.
+    """
+
+    def __init__(self, video, event_detector_factory, last_frame_number, first_frame_number=1,
+                 num_processes=None, num_chunks=None, frame_stride=1):
+        if num_processes is None:
+            num_processes = os.cpu_count() or 1
+        if num_chunks is None:
+            num_chunks = num_processes
+        self._video = video
+        self._event_detector_factory = event_detector_factory
+        self._num_processes = num_processes
+        self._frame_stride = frame_stride
+
+        open_ended = last_frame_number is None
+        if open_ended:
+            last_frame_number = max(first_frame_number, video.num_frames)
+        num_frames = max(0, last_frame_number - first_frame_number + 1)
+        chunk_size = max(1, ceil(num_frames / max(1, num_chunks)))
+        chunk_size = ceil(chunk_size / frame_stride) * frame_stride
+        chunks = [
+            (
+                first_chunk_frame_number,
+                min(last_frame_number, first_chunk_frame_number + chunk_size - 1),
+            )
+            for first_chunk_frame_number
+            in range(first_frame_number, last_frame_number + 1, chunk_size)
+        ]
+        if open_ended:
+            first_chunk_frame_number, _ = chunks[-1]
+            chunks[-1] = (first_chunk_frame_number, None)
+        self._chunks = chunks
+
+    @property
+    def video(self):
+        return self._video
+
+    def __iter__(self):
+        frame_stride = self._frame_stride
+        num_overlap_frames = CONFIGURATION.getint('num_overlap_frames')
+        num_overlap_frames = ceil(num_overlap_frames / frame_stride) * frame_stride
+        min_jaccard_index = CONFIGURATION.getfloat('min_jaccard_index')
+        chunks = self._chunks
+        if not chunks:
+            return
+
+        num_screens = 0
+        screen_states = {}
+
+        def create_xml_element(tag, screen_id, frame_number, frame_duration, screen_state=None,
+                               page=False, coordinates=False):
+            xml_element = Element(tag)
+            xml_element.attrib['screen-id'] = screen_id
+            xml_element.attrib['frame-number'] = str(frame_number)
+            xml_element.attrib['frame-duration'] = timedelta_as_xsd_duration(frame_duration)
+            if page:
+                xml_element.attrib['document-uri'] = screen_state.document_uri
+                xml_element.attrib['page-number'] = screen_state.page_number
+            if coordinates:
+                for name, value in zip(COORDINATE_NAMES, screen_state.coordinates):
+                    xml_element.attrib[name] = value
+            return xml_element
+
+        with ProcessPoolExecutor(max_workers=self._num_processes) as executor:
+            futures = [
+                executor.submit(
+                    _detect_chunk_events,
+                    self._event_detector_factory,
+                    max(first_chunk_frame_number - num_overlap_frames, chunks[0][0]),
+                    last_chunk_frame_number,
+                )
+                for first_chunk_frame_number, last_chunk_frame_number in chunks
+            ]
+            for (first_chunk_frame_number, last_chunk_frame_number), future in zip(chunks, futures):
+                LOGGER.debug(
+                    'Stitching screen events from frames {}-{}'.format(
+                        first_chunk_frame_number,
+                        last_chunk_frame_number,
+                    )
+                )
+                xml_elements = [
+                    fromstring(serialized_event)
+                    for serialized_event in future.result()
+                ]
+
+                overlap_screen_states = {}
+                chunk_xml_elements = []
+                for xml_element in xml_elements:
+                    frame_number = int(xml_element.attrib['frame-number'])
+                    if frame_number < first_chunk_frame_number or (
+                                frame_number == first_chunk_frame_number and
+                                xml_element.tag == 'screen-appeared-event'
+                            ):
+                        _update_screen_states(overlap_screen_states, xml_element)
+                    else:
+                        chunk_xml_elements.append(xml_element)
+
+                if overlap_screen_states or screen_states:
+                    frame_duration = _frame_duration(self.video, first_chunk_frame_number)
+                    if frame_duration is None:
+                        LOGGER.debug('Frame #{} is past the end of the video'.format(
+                            first_chunk_frame_number,
+                        ))
+                        continue
+
+                screen_ids = {}
+                unmatched_screen_ids = set(screen_states.keys())
+                for chunk_screen_id, chunk_screen_state in sorted(overlap_screen_states.items()):
+                    jaccard_indexes = sorted(
+                        (
+                            (chunk_screen_state.jaccard_index(screen_states[screen_id]), screen_id)
+                            for screen_id in unmatched_screen_ids
+                        ),
+                        reverse=True,
+                    )
+                    if jaccard_indexes and jaccard_indexes[0][0] >= min_jaccard_index:
+                        _, screen_id = jaccard_indexes[0]
+                        unmatched_screen_ids.remove(screen_id)
+                        screen_ids[chunk_screen_id] = screen_id
+                    else:
+                        screen_ids[chunk_screen_id] = None
+
+                for screen_id in sorted(unmatched_screen_ids):
+                    LOGGER.debug('{} disappeared at a chunk boundary'.format(screen_id))
+                    xml_element = create_xml_element(
+                        'screen-disappeared-event',
+                        screen_id,
+                        first_chunk_frame_number,
+                        frame_duration,
+                    )
+                    _update_screen_states(screen_states, xml_element)
+                    yield SerializedScreenEvent(xml_element)
+
+                for chunk_screen_id, screen_id in sorted(screen_ids.items()):
+                    chunk_screen_state = overlap_screen_states[chunk_screen_id]
+                    if screen_id is None:
+                        LOGGER.debug('{} appeared at a chunk boundary'.format(chunk_screen_id))
+                        screen_id = 'screen-{}'.format(num_screens + 1)
+                        num_screens += 1
+                        screen_ids[chunk_screen_id] = screen_id
+                        xml_element = create_xml_element(
+                            'screen-appeared-event',
+                            screen_id,
+                            first_chunk_frame_number,
+                            frame_duration,
+                            chunk_screen_state,
+                            page=True,
+                            coordinates=True,
+                        )
+                        _update_screen_states(screen_states, xml_element)
+                        yield SerializedScreenEvent(xml_element)
+                        continue
+                    screen_state = screen_states[screen_id]
+                    if (screen_state.document_uri, screen_state.page_number) != \
+                            (chunk_screen_state.document_uri, chunk_screen_state.page_number):
+                        xml_element = create_xml_element(
+                            'screen-changed-content-event',
+                            screen_id,
+                            first_chunk_frame_number,
+                            frame_duration,
+                            chunk_screen_state,
+                            page=True,
+                        )
+                        _update_screen_states(screen_states, xml_element)
+                        yield SerializedScreenEvent(xml_element)
+                    if screen_state.coordinates != chunk_screen_state.coordinates:
+                        xml_element = create_xml_element(
+                            'screen-moved-event',
+                            screen_id,
+                            first_chunk_frame_number,
+                            frame_duration,
+                            chunk_screen_state,
+                            coordinates=True,
+                        )
+                        _update_screen_states(screen_states, xml_element)
+                        yield SerializedScreenEvent(xml_element)
+
+                for xml_element in chunk_xml_elements:
+                    chunk_screen_id = xml_element.attrib['screen-id']
+                    if xml_element.tag == 'screen-appeared-event':
+                        screen_id = 'screen-{}'.format(num_screens + 1)
+                        num_screens += 1
+                        screen_ids[chunk_screen_id] = screen_id
+                    else:
+                        screen_id = screen_ids[chunk_screen_id]
+                    xml_element.attrib['screen-id'] = screen_id
+                    if xml_element.tag == 'screen-disappeared-event':
+                        del screen_ids[chunk_screen_id]
+                    _update_screen_states(screen_states, xml_element)
+                    yield SerializedScreenEvent(xml_element)
@@ -21,6 +21,8 @@ class FrameEventABC(EventABC):
         A frame in which the event takes place.
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def frame(self):
@@ -39,8 +39,10 @@ def _hash_image(image):
         A hash of the image.
     """
 
-    image_cv = cv.cvtColor(image.image, cv.COLOR_BGRA2RGBA)
-    image_pil = Image.fromarray(image_cv, 'RGBA')
+    rgb_image = image.render_rgb()
+    # The red and blue channels are swapped for compatibility with the hashes of the image data in
+    # the ``image`` attribute, which were converted from BGRA to RGBA.
+    image_pil = Image.fromarray(cv.cvtColor(rgb_image, cv.COLOR_RGB2BGR), 'RGB')
     hash_function = imagehash.__dict__[CONFIGURATION['hash_function']]
     return hash_function(image_pil).hash.flatten()
 
@@ -72,7 +74,12 @@ class ImageHashPageDetector(PageDetectorABC):
         LOGGER.debug('Building an ANNOY index with {} trees'.format(annoy_n_trees))
         annoy_index = AnnoyIndex(64, metric=annoy_distance_metric)
         pages = dict()
-        for page_index, page in enumerate(chain(*documents)):
+        for page_index, page in enumerate(
+                    chain.from_iterable(
+                        document.prerender(((None, None), ), rgb=True)
+                        for document in documents
+                    )
+                ):
             page_hash = _hash_image(page)
             annoy_index.add_item(page_index, page_hash)
             pages[page_index] = page
@@ -7,7 +7,8 @@ and content. Related classes are also defined.
 """
 
 from abc import abstractmethod
-from itertools import chain
+from datetime import datetime, timezone
+from itertools import chain, count
 from logging import getLogger
 from lxml.etree import Element
 
@@ -40,6 +41,8 @@ class ScreenEventABC(FrameEventABC):
         A screen identifier.
     """
 
+    __slots__ = ()
+
     @property
     def frame(self):
         return self.screen.frame
@@ -88,6 +91,8 @@ class ScreenAppearedEvent(ScreenEventABC):
         The document page.
     """
 
+    __slots__ = ('_screen', '_screen_id', 'page')
+
     def __init__(self, screen, screen_id, page):
         self._screen = screen
         self._screen_id = screen_id
@@ -157,6 +162,8 @@ class ScreenChangedContentEvent(ScreenEventABC):
         The different document page.
     """
 
+    __slots__ = ('_screen', '_screen_id', 'page')
+
     def __init__(self, screen, screen_id, page):
         self._screen = screen
         self._screen_id = screen_id
@@ -208,6 +215,8 @@ class ScreenMovedEvent(ScreenEventABC):
         produced by an event detector.
     """
 
+    __slots__ = ('_screen', '_screen_id')
+
     def __init__(self, screen, screen_id):
         self._screen = screen
         self._screen_id = screen_id
@@ -278,6 +287,8 @@ class ScreenDisappearedEvent(ScreenEventABC):
         produced by an event detector.
     """
 
+    __slots__ = ('_frame', '_screen', '_screen_id')
+
     def __init__(self, frame, screen, screen_id):
         self._frame = frame
         self._screen = screen
@@ -337,6 +348,8 @@ class ScreenEventDetectorScreen(ScreenABC):
         The height of the image data.
     """
 
+    __slots__ = ('_frame', '_coordinates', '__weakref__')
+
     def __init__(self, frame, coordinates):
         self._frame = frame
         self._coordinates = coordinates
@@ -487,6 +500,203 @@ class ScreenEventDetectorPageDetector(PageDetectorABC):
         return detected_pages
 
 
+class _ScreenEventTracker(object):
+    """Tracks projection screens in the consecutive frames of a video, and produces screen events.
+
+    Parameters
+    ----------
+    quadrangle_tracker : ConvexQuadrangleTrackerABC
+        The provided convex quadrangle tracker.
+    screen_id_counter : iterator of int
+        A counter that produces the numbers of new screen identifiers. The counter MAY be shared by
+        several trackers to make the screen identifiers unique across several videos.
+    """
+
+    def __init__(self, quadrangle_tracker, screen_id_counter):
+        self._quadrangle_tracker = quadrangle_tracker
+        self._screen_id_counter = screen_id_counter
+        self._screen_ids = {}
+        self._matched_pages = {}
+        self._detected_screens = None
+        self._previous_frame = None
+        self._frame = None
+        self._appeared_quadrangles = None
+        self._existing_quadrangles = None
+        self._moving_quadrangles = None
+
+    def _next_screen_id(self):
+        return 'screen-{}'.format(next(self._screen_id_counter))
+
+    def update(self, frame, screens):
+        """Tracks the projection screens detected in the next frame of a video.
+
+        Parameters
+        ----------
+        frame : FrameABC
+            The next frame of the video.
+        screens : iterable of ScreenABC
+            The projection screens detected in the frame.
+
+        Returns
+        -------
+        disappeared_events : list of ScreenDisappearedEvent
+            The disappearances of the projection screens that matched a document page.
+        screens : (list, list, list)
+            The projection screens that appeared, existed, and disappeared in the frame, and their
+            movements as specified by the parameters of :meth:`PageDetectorABC.detect`.
+        """
+
+        screen_ids = self._screen_ids
+        matched_pages = self._matched_pages
+        matched_quadrangles = matched_pages.keys()
+
+        previous_detected_screens = self._detected_screens
+        detected_screens = {screen.coordinates: screen for screen in screens}
+        detected_quadrangles = detected_screens.keys()
+        appeared_quadrangles, existing_quadrangles, disappeared_quadrangles = \
+            self._quadrangle_tracker.update(detected_quadrangles)
+
+        disappeared_events = []
+        for moving_quadrangle in disappeared_quadrangles:
+            quadrangle = moving_quadrangle.current_quadrangle
+            screen = previous_detected_screens[quadrangle]
+            if moving_quadrangle in matched_quadrangles:
+                screen_id = screen_ids[moving_quadrangle]
+                previous_page = matched_pages[moving_quadrangle]
+                del screen_ids[moving_quadrangle]
+                del matched_pages[moving_quadrangle]
+                LOGGER.debug('{} disappeared matching {}'.format(screen, previous_page))
+                disappeared_events.append(ScreenDisappearedEvent(frame, screen, screen_id))
+            else:
+                LOGGER.debug('{} disappeared with no matching page'.format(screen))
+
+        self._detected_screens = detected_screens
+        self._frame = frame
+        self._appeared_quadrangles = appeared_quadrangles
+        self._existing_quadrangles = existing_quadrangles
+        self._moving_quadrangles = {
+            moving_quadrangle.current_quadrangle: moving_quadrangle
+            for moving_quadrangle in chain(
+                appeared_quadrangles,
+                existing_quadrangles,
+            )
+        }
+
+        def moving_quadrangle_to_screen(moving_quadrangle):
+            return (detected_screens[moving_quadrangle.current_quadrangle], moving_quadrangle)
+
+        def moving_quadrangle_to_previous_screen(moving_quadrangle):
+            return (
+                previous_detected_screens[moving_quadrangle.current_quadrangle],
+                moving_quadrangle,
+            )
+
+        screens = (
+            list(map(moving_quadrangle_to_screen, appeared_quadrangles)),
+            list(map(moving_quadrangle_to_screen, existing_quadrangles)),
+            list(map(moving_quadrangle_to_previous_screen, disappeared_quadrangles)),
+        )
+        return (disappeared_events, screens)
+
+    def match(self, pages):
+        """Produces screen events from the document pages detected in the last updated frame.
+
+        Notes
+        -----
+        The previous frame of the video is released, when all the events have been produced.
+
+        Parameters
+        ----------
+        pages : dict of (ScreenABC, PageABC or None)
+            A map between the projection screens that exist in the frame, and the document pages
+            detected in the projection screens as specified by the return value of
+            :meth:`PageDetectorABC.detect`.
+
+        Yields
+        ------
+        event : ScreenEventABC
+            A screen event that takes place in the frame.
+        """
+
+        screen_ids = self._screen_ids
+        matched_pages = self._matched_pages
+        matched_quadrangles = matched_pages.keys()
+        frame = self._frame
+        appeared_quadrangles = self._appeared_quadrangles
+        existing_quadrangles = self._existing_quadrangles
+        moving_quadrangles = self._moving_quadrangles
+
+        for screen, page in pages.items():
+            moving_quadrangle = moving_quadrangles[screen.coordinates]
+            quadrangle_iter = reversed(moving_quadrangle)
+            current_quadrangle = next(quadrangle_iter)
+            if moving_quadrangle in existing_quadrangles:
+                previous_quadrangle = next(quadrangle_iter)
+
+            if page:
+                if moving_quadrangle in appeared_quadrangles:
+                    LOGGER.debug('{} appeared and matches {}'.format(screen, page))
+                    screen_id = self._next_screen_id()
+                    screen_ids[moving_quadrangle] = screen_id
+                    yield ScreenAppearedEvent(screen, screen_id, page)
+                elif moving_quadrangle in existing_quadrangles:
+                    if moving_quadrangle in matched_quadrangles:
+                        screen_id = screen_ids[moving_quadrangle]
+                        previous_page = matched_pages[moving_quadrangle]
+                        if previous_page != page:
+                            LOGGER.debug(
+                                '{} changed content from {} to {}'.format(
+                                    screen,
+                                    previous_page,
+                                    page,
+                                )
+                            )
+                            yield ScreenChangedContentEvent(screen, screen_id, page)
+                        if current_quadrangle != previous_quadrangle:
+                            LOGGER.debug(
+                                '{} moved from {} to {}'.format(
+                                    screen,
+                                    previous_quadrangle,
+                                    current_quadrangle,
+                                )
+                            )
+                            yield ScreenMovedEvent(screen, screen_id)
+                    else:
+                        LOGGER.debug(
+                            '{} started matching {}'.format(
+                                screen,
+                                page,
+                            )
+                        )
+                        screen_id = self._next_screen_id()
+                        screen_ids[moving_quadrangle] = screen_id
+                        yield ScreenAppearedEvent(screen, screen_id, page)
+                matched_pages[moving_quadrangle] = page
+            else:
+                if moving_quadrangle in appeared_quadrangles:
+                    LOGGER.debug('{} appeared with no matching page'.format(screen))
+                elif moving_quadrangle in existing_quadrangles:
+                    if moving_quadrangle in matched_quadrangles:
+                        screen_id = screen_ids[moving_quadrangle]
+                        previous_page = matched_pages[moving_quadrangle]
+                        LOGGER.debug('{} no longer matches {}'.format(screen, previous_page))
+                        del screen_ids[moving_quadrangle]
+                        del matched_pages[moving_quadrangle]
+                        yield ScreenDisappearedEvent(frame, screen, screen_id)
+
+        if self._previous_frame is not None:
+            self._previous_frame.release()
+        self._previous_frame = frame
+
+    def release(self):
+        """Releases the last frame of the video.
+
+        """
+        if self._previous_frame is not None:
+            self._previous_frame.release()
+            self._previous_frame = None
+
+
 class ScreenEventDetectorABC(EventDetectorABC):
     """An abstract detector that detects screen events in a video.
 
@@ -526,6 +736,17 @@ class ScreenEventDetector(ScreenEventDetectorABC):
     Iterating over frames in the video prevents iterating over all events detected in the video.
     For screens that do not disappear by the last frame of the video, a
     :class:`ScreenDisappearedEvent` event will not be produced.
+    A video frame is released using :meth:`FrameABC.release` as soon as the events in the next
+    frame have been produced. The image data of the frames and the screens referenced by the
+    produced events MUST NOT be accessed afterwards.
+    In the streaming mode, which is enabled by specifying a latency budget, the video is expected
+    to be a live video, such as :class:`video699.video.stream.StreamVideo`, where the date, and
+    time of a frame is the wall-clock time at which the frame was captured. The latency between the
+    capture of a frame and the production of an event in the frame is measured for every event, and
+    events produced over the latency budget are logged. No frames are skipped, since a frame that
+    reaches the detector may be the only frame of a scene, and skipping it would lose events rather
+    than delay them. Frames are dropped before they are processed by the live video, such as
+    :class:`video699.video.stream.StreamVideo`, according to its drop policy.
 
     Parameters
     ----------
@@ -539,15 +760,24 @@ class ScreenEventDetector(ScreenEventDetectorABC):
     page_detector : PageDetectorABC
         The provided page detector that will be used to determine whether a screen shows a document
         page.
+    latency_budget : timedelta or None, optional
+        When not ``None``, the detector runs in the streaming mode, and events produced later than
+        the latency budget after the capture of their frame are logged. ``None`` if unspecified.
 
     Attributes
     ----------
     video : VideoABC
         The video in which the events are detected.
+    latencies : list of timedelta
+        In the streaming mode, the latencies between the capture of a frame and the production of an
+        event in the frame for all events produced in the last iteration.
     """
 
-    def __init__(self, video, quadrangle_tracker, screen_detector, page_detector):
+    def __init__(self, video, quadrangle_tracker, screen_detector, page_detector,
+                 latency_budget=None):
         self._video = video
+        self._latency_budget = latency_budget
+        self.latencies = []
         if quadrangle_tracker:
             quadrangle_tracker.clear()
         self._quadrangle_tracker = quadrangle_tracker
@@ -559,120 +789,136 @@ class ScreenEventDetector(ScreenEventDetectorABC):
         return self._video
 
     def __iter__(self):
-        quadrangle_tracker = self._quadrangle_tracker
+        latency_budget = self._latency_budget
+        if latency_budget is None:
+            yield from self._detect_events()
+            return
+
+        self.latencies = []
+        for event in self._detect_events():
+            latency = datetime.now(timezone.utc) - event.frame.datetime
+            self.latencies.append(latency)
+            if latency > latency_budget:
+                LOGGER.warning('{} produced with latency {} over budget {}'.format(
+                    event,
+                    latency,
+                    latency_budget,
+                ))
+            else:
+                LOGGER.debug('{} produced with latency {}'.format(event, latency))
+            yield event
+
+    def _detect_events(self):
         screen_detector = self._screen_detector
         page_detector = self._page_detector
-
-        num_screens = 0
-        screen_ids = {}
-        matched_pages = {}
-        matched_quadrangles = matched_pages.keys()
-        detected_screens = None
-        previous_detected_screens = None
+        tracker = _ScreenEventTracker(self._quadrangle_tracker, count(1))
 
         for frame in self.video:
-            previous_detected_screens = detected_screens
-            detected_screens = {
-                screen.coordinates: screen
-                for screen in screen_detector.detect(frame)
-            }
-            detected_quadrangles = detected_screens.keys()
-            appeared_quadrangles, existing_quadrangles, disappeared_quadrangles = \
-                quadrangle_tracker.update(detected_quadrangles)
-
-            for moving_quadrangle in disappeared_quadrangles:
-                quadrangle = moving_quadrangle.current_quadrangle
-                screen = previous_detected_screens[quadrangle]
-                if moving_quadrangle in matched_quadrangles:
-                    screen_id = screen_ids[moving_quadrangle]
-                    previous_page = matched_pages[moving_quadrangle]
-                    del screen_ids[moving_quadrangle]
-                    del matched_pages[moving_quadrangle]
-                    LOGGER.debug('{} disappeared matching {}'.format(screen, previous_page))
-                    yield ScreenDisappearedEvent(frame, screen, screen_id)
-                else:
-                    LOGGER.debug('{} disappeared with no matching page'.format(screen))
-
-            moving_quadrangles = {
-                moving_quadrangle.current_quadrangle: moving_quadrangle
-                for moving_quadrangle in chain(
-                    appeared_quadrangles,
-                    existing_quadrangles,
-                )
-            }
-
-            def moving_quadrangle_to_screen(moving_quadrangle):
-                return (detected_screens[moving_quadrangle.current_quadrangle], moving_quadrangle)
-
-            def moving_quadrangle_to_previous_screen(moving_quadrangle):
-                return (
-                    previous_detected_screens[moving_quadrangle.current_quadrangle],
-                    moving_quadrangle,
-                )
-
-            pages = page_detector.detect(
-                frame,
-                map(moving_quadrangle_to_screen, appeared_quadrangles),
-                map(moving_quadrangle_to_screen, existing_quadrangles),
-                map(moving_quadrangle_to_previous_screen, disappeared_quadrangles),
-            )
+            disappeared_events, screens = tracker.update(frame, screen_detector.detect(frame))
+            yield from disappeared_events
+            pages = page_detector.detect(frame, *screens)
+            yield from tracker.match(pages)
 
-            for screen, page in pages.items():
-                moving_quadrangle = moving_quadrangles[screen.coordinates]
-                quadrangle_iter = reversed(moving_quadrangle)
-                current_quadrangle = next(quadrangle_iter)
-                if moving_quadrangle in existing_quadrangles:
-                    previous_quadrangle = next(quadrangle_iter)
-
-                if page:
-                    if moving_quadrangle in appeared_quadrangles:
-                        LOGGER.debug('{} appeared and matches {}'.format(screen, page))
-                        screen_id = 'screen-{}'.format(num_screens + 1)
-                        num_screens += 1
-                        screen_ids[moving_quadrangle] = screen_id
-                        yield ScreenAppearedEvent(screen, screen_id, page)
-                    elif moving_quadrangle in existing_quadrangles:
-                        if moving_quadrangle in matched_quadrangles:
-                            screen_id = screen_ids[moving_quadrangle]
-                            previous_page = matched_pages[moving_quadrangle]
-                            if previous_page != page:
-                                LOGGER.debug(
-                                    '{} changed content from {} to {}'.format(
-                                        screen,
-                                        previous_page,
-                                        page,
-                                    )
-                                )
-                                yield ScreenChangedContentEvent(screen, screen_id, page)
-                            if current_quadrangle != previous_quadrangle:
-                                LOGGER.debug(
-                                    '{} moved from {} to {}'.format(
-                                        screen,
-                                        previous_quadrangle,
-                                        current_quadrangle,
-                                    )
-                                )
-                                yield ScreenMovedEvent(screen, screen_id)
-                        else:
-                            LOGGER.debug(
-                                '{} started matching {}'.format(
-                                    screen,
-                                    page,
-                                )
-                            )
-                            screen_id = 'screen-{}'.format(num_screens + 1)
-                            num_screens += 1
-                            screen_ids[moving_quadrangle] = screen_id
-                            yield ScreenAppearedEvent(screen, screen_id, page)
-                    matched_pages[moving_quadrangle] = page
+        tracker.release()
+
+
+class MultiCameraScreenEventDetector(ScreenEventDetectorABC):
+    r"""A detector that jointly detects screen events in several videos of a single lecture.
+
+    The videos are captured by several cameras in a room, and they are synchronized, i.e. the
+    frames at the same position in the videos are captured at the same time. The videos are read in
+    lockstep. Screens are tracked in each video separately as in :class:`ScreenEventDetector`, but
+    a single screen detector, and a single page detector are shared by all videos, and the screens
+    from the current frames of all videos are passed to the page detector in a single call of
+    :meth:`PageDetectorABC.detect_many`, so that the page detector can batch its inference.
+
+    Notes
+    -----
+    It is not possible to repeatedly iterate over all events detected in the videos.
+    The events detected in all videos are produced in a single stream, where the events from frames
+    at the same position are ordered by the order of the videos. Screen identifiers are unique across
+    all videos. The video, in which an event takes place, is available through the ``frame``
+    attribute of the event.
+    A video frame is released using :meth:`FrameABC.release` as soon as the events in the next
+    frame of the same video have been produced.
+
+    Parameters
+    ----------
+    videos : sequence of VideoABC
+        The synchronized videos in which the events are detected.
+    quadrangle_trackers : sequence of ConvexQuadrangleTrackerABC
+        The provided convex quadrangle trackers, one for every video. If non-empty, the trackers
+        will be cleared.
+    screen_detector : ScreenDetectorABC
+        The provided screen detector that will be used to detect lit projection screens in video
+        frames.
+    page_detector : PageDetectorABC
+        The provided page detector that will be used to determine whether a screen shows a document
+        page.
+
+    Attributes
+    ----------
+    video : VideoABC
+        The first video in which the events are detected.
+    videos : tuple of VideoABC
+        The synchronized videos in which the events are detected.
+
+    Raises
+    ------
+    ValueError
+        If no videos are specified, or if the number of quadrangle trackers differs from the number
+        of videos.
+    """
+
+    def __init__(self, videos, quadrangle_trackers, screen_detector, page_detector):
+        videos = tuple(videos)
+        quadrangle_trackers = tuple(quadrangle_trackers)
+        if not videos:
+            raise ValueError('At least one video must be specified')
+        if len(quadrangle_trackers) != len(videos):
+            raise ValueError('A convex quadrangle tracker must be specified for every video')
+        for quadrangle_tracker in quadrangle_trackers:
+            if quadrangle_tracker:
+                quadrangle_tracker.clear()
+        self.videos = videos
+        self._quadrangle_trackers = quadrangle_trackers
+        self._screen_detector = screen_detector
+        self._page_detector = page_detector
+
+    @property
+    def video(self):
+        return self.videos[0]
+
+    def __iter__(self):
+        screen_detector = self._screen_detector
+        page_detector = self._page_detector
+        screen_id_counter = count(1)
+        cameras = [
+            (_ScreenEventTracker(quadrangle_tracker, screen_id_counter), iter(video))
+            for quadrangle_tracker, video in zip(self._quadrangle_trackers, self.videos)
+        ]
+
+        while cameras:
+            current_cameras = []
+            for tracker, frame_iterator in cameras:
+                frame = next(frame_iterator, None)
+                if frame is None:
+                    tracker.release()
                 else:
-                    if moving_quadrangle in appeared_quadrangles:
-                        LOGGER.debug('{} appeared with no matching page'.format(screen))
-                    elif moving_quadrangle in existing_quadrangles:
-                        if moving_quadrangle in matched_quadrangles:
-                            screen_id = screen_ids[moving_quadrangle]
-                            previous_page = matched_pages[moving_quadrangle]
-                            LOGGER.debug('{} no longer matches {}'.format(screen, previous_page))
-                            del screen_ids[moving_quadrangle]
-                            del matched_pages[moving_quadrangle]
-                            yield ScreenDisappearedEvent(frame, screen, screen_id)
+                    current_cameras.append((tracker, frame_iterator, frame))
+            cameras = [(tracker, frame_iterator) for tracker, frame_iterator, _ in current_cameras]
+
+            all_disappeared_events = []
+            frames_screens = []
+            for tracker, _, frame in current_cameras:
+                disappeared_events, screens = tracker.update(frame, screen_detector.detect(frame))
+                all_disappeared_events.append(disappeared_events)
+                frames_screens.append((frame, *screens))
+            all_pages = page_detector.detect_many(frames_screens) if frames_screens else []
+            for (tracker, _, _), disappeared_events, pages in zip(
+                        current_cameras,
+                        all_disappeared_events,
+                        all_pages,
+                    ):
+                yield from disappeared_events
+                yield from tracker.match(pages)
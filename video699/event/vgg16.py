@@ -55,8 +55,8 @@ def _last_hidden_vgg16_layer(images):
     for image_batch in get_batches(images, batch_size):
         image_batch_rgb = np.array([
             cv.cvtColor(
-                image.render(VGG16_INPUT_SIZE, VGG16_INPUT_SIZE),
-                cv.COLOR_BGRA2RGB,
+                image.render_rgb(VGG16_INPUT_SIZE, VGG16_INPUT_SIZE),
+                cv.COLOR_RGB2BGR,
             ).astype(np.float32)
             for image in image_batch
         ]) - VGG16_RGB_MEAN
@@ -88,7 +88,12 @@ class VGG16PageDetector(PageDetectorABC):
         for page_index, (page, page_activations) in enumerate(
                     zip(
                         chain(*documents),
-                        _last_hidden_vgg16_layer(chain(*documents)),
+                        _last_hidden_vgg16_layer(
+                            chain.from_iterable(
+                                document.prerender(((VGG16_INPUT_SIZE, VGG16_INPUT_SIZE), ), rgb=True)
+                                for document in documents
+                            )
+                        ),
                     )
                 ):
             annoy_index.add_item(page_index, page_activations)
@@ -4,12 +4,26 @@
 
 """
 
-from ..interface import FrameABC
+import cv2 as cv
+
+from ..interface import FrameABC, frame_thumbnail
 
 
 class ImageFrame(FrameABC):
     """A frame of a video represented by a NumPy matrix containing image data.
 
+    Notes
+    -----
+    The image data are stored in the color space in which they were provided. The image data in
+    other color spaces, and the downscaled image data are computed when they are first accessed, and
+    they are memoized.
+
+    When a frame buffer pool is provided, the frame takes ownership of the provided image data, and
+    the image data in other color spaces are computed into buffers acquired from the pool. After the
+    frame has been released, all these buffers are released to the pool. Without a frame buffer
+    pool, releasing the frame does nothing. The downscaled image data are never stored in a buffer
+    acquired from the pool, so that they can be used after the frame has been released.
+
     Parameters
     ----------
     video : VideoABC
@@ -17,10 +31,16 @@ class ImageFrame(FrameABC):
     number : int
         The frame number, i.e. the position of the frame in the video. Frame indexing is one-based,
         i.e. the first frame has number 1.
-    image : array_like
+    image : array_like or None, optional
         The image data of the frame as an OpenCV CV_8UC3 RGBA matrix, where the alpha channel (A)
         is currently unused and all pixels are fully opaque, i.e. they have the maximum alpha of
-        255.
+        255. ``None`` if unspecified.
+    bgr_image : array_like or None, optional
+        The image data of the frame as an OpenCV CV_8UC3 BGR matrix, i.e. in the color space
+        produced by OpenCV video decoders. ``None`` if unspecified.
+    buffer_pool : FrameBufferPool or None, optional
+        The frame buffer pool from which the buffers for the image data are acquired, and to which
+        they are released when the frame is released. ``None`` if unspecified.
 
     Attributes
     ----------
@@ -33,18 +53,64 @@ class ImageFrame(FrameABC):
         The image data of the frame as an OpenCV CV_8UC3 RGBA matrix, where the alpha channel (A)
         is currently unused and all pixels are fully opaque, i.e. they have the maximum alpha of
         255.
+    rgb_image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 RGB matrix.
+    bgr_image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 BGR matrix.
+    gray_image : array_like
+        The image data of the frame as an OpenCV CV_8UC1 grayscale matrix.
+    thumbnail_image : array_like
+        The image data of the frame downscaled to the width specified by the ``thumbnail_width``
+        configuration option as an OpenCV CV_8UC1 grayscale matrix.
     width : int
         The width of the image data.
     height : int
         The height of the image data.
     datetime : aware datetime
         The date, and time at which the frame was captured.
+
+    Raises
+    ------
+    ValueError
+        If neither or both of the RGBA and BGR image data are specified, or if the image data are
+        accessed after the frame has been released.
     """
 
-    def __init__(self, video, number, image):
+    __slots__ = (
+        '_video',
+        '_number',
+        '_image',
+        '_bgr_image',
+        '_rgb_image',
+        '_gray_image',
+        '_thumbnail_image',
+        '_buffer_pool',
+        '_released',
+        '__weakref__',
+    )
+
+    def __init__(self, video, number, image=None, bgr_image=None, buffer_pool=None):
+        if (image is None) == (bgr_image is None):
+            raise ValueError('Exactly one of the RGBA and BGR image data must be specified')
         self._video = video
         self._number = number
         self._image = image
+        self._bgr_image = bgr_image
+        self._rgb_image = None
+        self._gray_image = None
+        self._thumbnail_image = None
+        self._buffer_pool = buffer_pool
+        self._released = False
+
+    def _convert(self, image, code, num_channels):
+        if self._released:
+            raise ValueError('The image data of {} have been released'.format(self))
+        if self._buffer_pool is None:
+            return cv.cvtColor(image, code)
+        height, width = image.shape[:2]
+        shape = (height, width, num_channels) if num_channels > 1 else (height, width)
+        buffer = self._buffer_pool.acquire(shape, image.dtype)
+        return cv.cvtColor(image, code, dst=buffer)
 
     @property
     def video(self):
@@ -56,4 +122,67 @@ class ImageFrame(FrameABC):
 
     @property
     def image(self):
+        if self._image is None:
+            self._image = self._convert(self._bgr_image, cv.COLOR_BGR2RGBA, 4)
         return self._image
+
+    @property
+    def rgb_image(self):
+        if self._rgb_image is None:
+            if self._bgr_image is not None:
+                self._rgb_image = self._convert(self._bgr_image, cv.COLOR_BGR2RGB, 3)
+            else:
+                self._rgb_image = self._convert(self._image, cv.COLOR_RGBA2RGB, 3)
+        return self._rgb_image
+
+    @property
+    def bgr_image(self):
+        if self._bgr_image is None:
+            self._bgr_image = self._convert(self._image, cv.COLOR_RGBA2BGR, 3)
+        return self._bgr_image
+
+    @property
+    def gray_image(self):
+        if self._gray_image is None:
+            if self._bgr_image is not None:
+                self._gray_image = self._convert(self._bgr_image, cv.COLOR_BGR2GRAY, 1)
+            else:
+                self._gray_image = self._convert(self._image, cv.COLOR_RGBA2GRAY, 1)
+        return self._gray_image
+
+    @property
+    def thumbnail_image(self):
+        if self._thumbnail_image is None:
+            if self._released:
+                raise ValueError('The image data of {} have been released'.format(self))
+            if self._gray_image is not None:
+                thumbnail_image = frame_thumbnail(self._gray_image)
+                if thumbnail_image is self._gray_image and self._buffer_pool is not None:
+                    thumbnail_image = thumbnail_image.copy()  # the pooled buffer will be recycled
+                self._thumbnail_image = thumbnail_image
+            elif self._bgr_image is not None:
+                self._thumbnail_image = cv.cvtColor(
+                    frame_thumbnail(self._bgr_image),
+                    cv.COLOR_BGR2GRAY,
+                )
+            else:
+                self._thumbnail_image = cv.cvtColor(
+                    frame_thumbnail(self._image),
+                    cv.COLOR_RGBA2GRAY,
+                )
+        return self._thumbnail_image
+
+    def release(self):
+        buffer_pool = self._buffer_pool
+        if buffer_pool is None or self._released:
+            return
+        self._released = True
+        images = (self._bgr_image, self._image, self._rgb_image, self._gray_image)
+        for image in images:
+            if image is not None:
+                buffer_pool.release(image)
+        self._bgr_image = None
+        self._image = None
+        self._rgb_image = None
+        self._gray_image = None
+        self._thumbnail_image = None
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements a pool of preallocated buffers for the image data of video frames.
+
+"""
+
+from threading import Lock
+
+import numpy as np
+
+from ..configuration import get_configuration
+
+
+CONFIGURATION = get_configuration()['FrameBufferPool']
+
+
+class FrameBufferPool(object):
+    """A pool of preallocated buffers for the image data of video frames.
+
+    Buffers that are released to the pool are reused for the image data of subsequent frames, so
+    that decoding a video does not allocate new image data for every frame. A buffer that has been
+    released MUST NOT be used by the code that has released it.
+
+    Notes
+    -----
+    The pool can be shared between a thread that acquires buffers and a thread that releases them.
+
+    Parameters
+    ----------
+    max_num_buffers : int or None, optional
+        The maximum number of released buffers of a single shape that are kept in the pool. When
+        unspecified or ``None``, the ``max_num_buffers`` configuration option is used.
+
+    Attributes
+    ----------
+    max_num_buffers : int
+        The maximum number of released buffers of a single shape that are kept in the pool.
+    """
+
+    def __init__(self, max_num_buffers=None):
+        if max_num_buffers is None:
+            max_num_buffers = CONFIGURATION.getint('max_num_buffers')
+        self.max_num_buffers = max_num_buffers
+        self._buffers = {}
+        self._lock = Lock()
+
+    def acquire(self, shape, dtype=np.uint8):
+        """Acquires a buffer from the pool, allocating a new buffer if the pool is empty.
+
+        Parameters
+        ----------
+        shape : tuple of int
+            The shape of the buffer.
+        dtype : data-type, optional
+            The data type of the buffer. Unsigned 8-bit integers by default.
+
+        Returns
+        -------
+        buffer : ndarray
+            A buffer with unspecified content.
+        """
+        key = (tuple(shape), np.dtype(dtype))
+        with self._lock:
+            buffers = self._buffers.get(key)
+            if buffers:
+                return buffers.pop()
+        return np.empty(shape, dtype)
+
+    def release(self, buffer):
+        """Releases a buffer to the pool, so that it can be acquired again.
+
+        Parameters
+        ----------
+        buffer : ndarray
+            A buffer that is no longer used.
+        """
+        key = (buffer.shape, buffer.dtype)
+        with self._lock:
+            buffers = self._buffers.setdefault(key, [])
+            if len(buffers) < self.max_num_buffers:
+                buffers.append(buffer)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(buffers) for buffers in self._buffers.values())
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements a frame of a video, whose image data are stored in shared memory, so that
+the frame can be passed to worker processes without copying the image data.
+
+"""
+
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+from weakref import finalize, WeakValueDictionary
+
+import cv2 as cv
+import numpy as np
+
+from ..interface import FrameABC, VideoABC
+
+
+REFERENCE_LOCK = Lock()
+VIDEO_HANDLES = WeakValueDictionary()
+
+
+class SharedMemoryFrameVideo(VideoABC):
+    """A handle of a video, whose frames have been passed to a worker process.
+
+    The handle contains only the attributes of the original video, so that it can be cheaply passed
+    to worker processes. In a worker process, all frames of a video share a single handle, so that
+    the frames can be compared and hashed.
+
+    .. _RFC3987: https://tools.ietf.org/html/rfc3987
+
+    Notes
+    -----
+    It is not possible to iterate over the frames of the video using the handle.
+
+    Parameters
+    ----------
+    fps : scalar
+        The framerate of the video in frames per second.
+    width : int
+        The width of the video.
+    height : int
+        The height of the video.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program.
+
+    Attributes
+    ----------
+    fps : scalar
+        The framerate of the video in frames per second.
+    width : int
+        The width of the video.
+    height : int
+        The height of the video.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program.
+
+    Raises
+    ------
+    ValueError
+        If the frames of the video are iterated over.
+    """
+
+    def __init__(self, fps, width, height, datetime, uri):
+        self._fps = fps
+        self._width = width
+        self._height = height
+        self._datetime = datetime
+        self._uri = uri
+
+    @property
+    def fps(self):
+        return self._fps
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def datetime(self):
+        return self._datetime
+
+    @property
+    def uri(self):
+        return self._uri
+
+    def __iter__(self):
+        raise ValueError('The frames of {} can only be read by the original video'.format(self))
+
+    def __hash__(self):
+        return hash(self.uri)
+
+    def __eq__(self, other):
+        if isinstance(other, SharedMemoryFrameVideo):
+            return self.uri == other.uri
+        return NotImplemented
+
+    def __reduce__(self):
+        return (_video_handle, (self.fps, self.width, self.height, self.datetime, self.uri))
+
+
+def _video_handle(fps, width, height, datetime, uri):
+    """Produces a handle of a video shared by all frames of the video in the current process.
+
+    Parameters
+    ----------
+    fps : scalar
+        The framerate of the video in frames per second.
+    width : int
+        The width of the video.
+    height : int
+        The height of the video.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        The IRI of the video.
+
+    Returns
+    -------
+    video : SharedMemoryFrameVideo
+        The handle of the video.
+    """
+    with REFERENCE_LOCK:
+        video = VIDEO_HANDLES.get(uri)
+        if video is None:
+            video = SharedMemoryFrameVideo(fps, width, height, datetime, uri)
+            VIDEO_HANDLES[uri] = video
+        return video
+
+
+def _free(shared_memory, is_owner):
+    """Unmaps a block of shared memory, and frees it if it is owned by the current process.
+
+    Parameters
+    ----------
+    shared_memory : SharedMemory
+        The block of shared memory.
+    is_owner : bool
+        Whether the block of shared memory is owned by the current process.
+    """
+    try:
+        shared_memory.close()
+    except BufferError:
+        pass  # The image data are still referenced, the block is unmapped when they are freed.
+    if is_owner:
+        try:
+            shared_memory.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _attach(video, number, duration, name, shape):
+    """Produces a frame from a block of shared memory created by another frame.
+
+    Parameters
+    ----------
+    video : SharedMemoryFrameVideo
+        The handle of the video containing the frame.
+    number : int
+        The frame number.
+    duration : timedelta
+        The elapsed time since the beginning of the video.
+    name : str
+        The name of the block of shared memory.
+    shape : tuple of int
+        The shape of the image data in the block of shared memory.
+
+    Returns
+    -------
+    frame : SharedMemoryFrame
+        The frame attached to the block of shared memory.
+    """
+    frame = SharedMemoryFrame.__new__(SharedMemoryFrame)
+    frame._video = video
+    frame._number = number
+    frame._duration = duration
+    frame._shared_memory = SharedMemory(name)
+    frame._image = np.ndarray(shape, dtype=np.uint8, buffer=frame._shared_memory.buf)
+    frame._image.flags.writeable = False
+    frame._is_owner = False
+    frame._num_references = 1
+    frame._finalizer = finalize(frame, _free, frame._shared_memory, False)
+    return frame
+
+
+class SharedMemoryFrame(FrameABC):
+    """A frame of a video, whose image data are stored in a block of shared memory.
+
+    When the frame is pickled, e.g. when it is passed to a worker process of a process pool, only a
+    small handle that contains the name of the block of shared memory, the frame number, and the
+    attributes of the video is serialized. The unpickled frame maps the block of shared memory, and
+    reads the image data without copying them.
+
+    The process that has created the frame owns the block of shared memory. The frame is reference
+    counted in the owning process: a new frame holds a single reference, further references are
+    acquired using :meth:`retain`, and they are released using :meth:`release`. When the last
+    reference has been released, the block of shared memory is freed. A frame unpickled in another
+    process never frees the block of shared memory, and releasing the frame only unmaps the block.
+    A frame that is finalized by the garbage collector without having been released is released.
+
+    Notes
+    -----
+    The owning process MUST hold a reference to the frame until all worker processes that have
+    received the frame have finished reading the image data. The worker processes MUST be started
+    by the :mod:`multiprocessing` module from the owning process, so that they share the resource
+    tracker of the owning process. In a worker process, the image data are read-only, and the
+    frame belongs to a :class:`SharedMemoryFrameVideo` handle rather than the original video.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The video containing the frame.
+    number : int
+        The frame number, i.e. the position of the frame in the video. Frame indexing is one-based,
+        i.e. the first frame has number 1.
+    duration : timedelta
+        The elapsed time since the beginning of the video.
+    image : array_like or None, optional
+        The image data of the frame as an OpenCV CV_8UC3 RGBA matrix that will be copied to the
+        block of shared memory. ``None`` if unspecified.
+    bgr_image : array_like or None, optional
+        The image data of the frame as an OpenCV CV_8UC3 BGR matrix that will be converted to the
+        RGBA color space directly in the block of shared memory. ``None`` if unspecified.
+
+    Attributes
+    ----------
+    video : VideoABC
+        The video containing the frame.
+    number : int
+        The frame number, i.e. the position of the frame in the video. Frame indexing is one-based,
+        i.e. the first frame has number 1.
+    image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 RGBA matrix backed by the block of shared
+        memory, where the alpha channel (A) is currently unused and all pixels are fully opaque,
+        i.e. they have the maximum alpha of 255.
+    width : int
+        The width of the image data.
+    height : int
+        The height of the image data.
+    duration : timedelta
+        The elapsed time since the beginning of the video.
+    datetime : aware datetime
+        The date, and time at which the frame was captured.
+    name : str
+        The name of the block of shared memory.
+
+    Raises
+    ------
+    ValueError
+        If neither or both of the RGBA and BGR image data are specified, or if the image data are
+        accessed after the frame has been released.
+    """
+
+    __slots__ = (
+        '_video',
+        '_number',
+        '_duration',
+        '_shared_memory',
+        '_image',
+        '_is_owner',
+        '_num_references',
+        '_finalizer',
+        '__weakref__',
+    )
+
+    def __init__(self, video, number, duration, image=None, bgr_image=None):
+        if (image is None) == (bgr_image is None):
+            raise ValueError('Exactly one of the RGBA and BGR image data must be specified')
+        height, width = (image if image is not None else bgr_image).shape[:2]
+        shape = (height, width, 4)
+        self._video = video
+        self._number = number
+        self._duration = duration
+        self._shared_memory = SharedMemory(create=True, size=int(np.prod(shape)))
+        self._image = np.ndarray(shape, dtype=np.uint8, buffer=self._shared_memory.buf)
+        if image is not None:
+            np.copyto(self._image, image)
+        else:
+            cv.cvtColor(bgr_image, cv.COLOR_BGR2RGBA, dst=self._image)
+        self._is_owner = True
+        self._num_references = 1
+        self._finalizer = finalize(self, _free, self._shared_memory, True)
+
+    @property
+    def video(self):
+        return self._video
+
+    @property
+    def number(self):
+        return self._number
+
+    @property
+    def duration(self):
+        return self._duration
+
+    @property
+    def image(self):
+        if self._image is None:
+            raise ValueError('The image data of {} have been released'.format(self))
+        return self._image
+
+    @property
+    def name(self):
+        return self._shared_memory.name
+
+    def retain(self):
+        """Acquires a reference to the frame, so that the image data are not freed.
+
+        Raises
+        ------
+        ValueError
+            If the frame has already been released.
+        """
+        with REFERENCE_LOCK:
+            if not self._num_references:
+                raise ValueError('{} has already been released'.format(self))
+            self._num_references += 1
+
+    def release(self):
+        with REFERENCE_LOCK:
+            if not self._num_references:
+                return
+            self._num_references -= 1
+            if self._num_references:
+                return
+        self._image = None
+        self._finalizer()
+
+    def __reduce__(self):
+        if self._image is None:
+            raise ValueError('{} has already been released'.format(self))
+        video = self.video
+        if not isinstance(video, SharedMemoryFrameVideo):
+            video = SharedMemoryFrameVideo(
+                video.fps,
+                video.width,
+                video.height,
+                video.datetime,
+                video.uri,
+            )
+        return (_attach, (video, self.number, self.duration, self.name, self.image.shape))
+
+    def __repr__(self):
+        return '<{classname}, frame #{frame_number}, {name}, {datetime}>'.format(
+            classname=self.__class__.__name__,
+            frame_number=self.number,
+            name=self.name,
+            datetime=self.datetime,
+        )
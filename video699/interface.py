@@ -12,18 +12,37 @@ described in RFC2119_.
 from abc import ABC, abstractmethod
 from collections.abc import Iterable, MutableSet, Sized
 from datetime import timedelta
-from functools import lru_cache, total_ordering
+from functools import total_ordering
 
 import cv2 as cv
 
-from .common import rescale_and_keep_aspect_ratio, COLOR_RGBA_TRANSPARENT
+from .cache import get_render_cache, render_cached
+from .common import downscale_to_width, rescale_and_keep_aspect_ratio, COLOR_RGBA_TRANSPARENT
 from .configuration import get_configuration
 
 
-SCREENABC_CONFIGURATION = get_configuration()['ScreenABC']
-SCREENABC_LRU_CACHE_MAXSIZE = SCREENABC_CONFIGURATION.getint('lru_cache_maxsize')
 IMAGEABC_CONFIGURATION = get_configuration()['ImageABC']
-IMAGEABC_LRU_CACHE_MAXSIZE = IMAGEABC_CONFIGURATION.getint('lru_cache_maxsize')
+FRAMEABC_CONFIGURATION = get_configuration()['FrameABC']
+
+
+def frame_thumbnail(image):
+    """Downscales the image data of a frame to the width of a thumbnail.
+
+    Parameters
+    ----------
+    image : array_like
+        The image data of a frame as an OpenCV matrix.
+
+    Returns
+    -------
+    thumbnail : array_like
+        The image data downscaled to the width specified by the ``thumbnail_width`` configuration
+        option as an OpenCV matrix.
+    """
+
+    thumbnail_width = FRAMEABC_CONFIGURATION.getint('thumbnail_width')
+    thumbnail_interpolation = cv.__dict__[FRAMEABC_CONFIGURATION['thumbnail_interpolation']]
+    return downscale_to_width(image, thumbnail_width, thumbnail_interpolation)
 
 
 class EventABC(ABC):
@@ -31,6 +50,8 @@ class EventABC(ABC):
 
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def write_xml(self, xf):
         """Writes an XML fragment that represents the event to an XML file.
@@ -193,12 +214,14 @@ class ImageABC(ABC):
         completely disregarded in subsequent computation.
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def image(self):
         pass
 
-    @lru_cache(maxsize=IMAGEABC_LRU_CACHE_MAXSIZE, typed=False)
+    @render_cached('ImageABC.render')
     def render(self, width=None, height=None):
         """Renders the image at the specified dimensions.
 
@@ -246,6 +269,110 @@ class ImageABC(ABC):
         )
         return rgba_image_rescaled_with_margins
 
+    def render_rgb(self, width=None, height=None):
+        """Renders the image at the specified dimensions without the alpha channel.
+
+        Notes
+        -----
+        Subclasses that can render the image data in the RGB color space directly, such as vector
+        images, SHOULD override this method, so that the RGBA image data are not produced.
+
+        Parameters
+        ----------
+        width : int or None, optional
+            The width of the image data as specified by the ``width`` parameter of :meth:`render`.
+        height : int or None, optional
+            The height of the image data as specified by the ``height`` parameter of
+            :meth:`render`.
+
+        Returns
+        -------
+        image : array_like
+            The image data as an OpenCV CV_8UC3 RGB matrix. Any margins added to the image data,
+            e.g. by keeping the aspect ratio of the image, MUST be black.
+
+        Raises
+        ------
+        ValueError
+            When either the width or the height is zero.
+        """
+
+        return cv.cvtColor(self.render(width, height), cv.COLOR_RGBA2RGB)
+
+    def render_many(self, sizes):
+        """Renders the image at several dimensions in a single pass.
+
+        The image data are first rescaled to the largest requested dimensions, and every smaller
+        image data are then successively downscaled from the nearest larger image data rather than
+        from the image data in the ``image`` attribute. The rendered image data are placed in the
+        cache of :meth:`render`, so that subsequent calls of :meth:`render` with the same ``width``,
+        and ``height`` reuse them.
+
+        Notes
+        -----
+        Subclasses that render image data at arbitrary dimensions without rescaling, such as
+        vector images, SHOULD override this method.
+
+        Parameters
+        ----------
+        sizes : iterable of (int or None, int or None)
+            The widths, and heights of the image data as specified by the ``width``, and ``height``
+            parameters of :meth:`render`.
+
+        Returns
+        -------
+        images : list of array_like
+            The image data of the page as specified by the return value of :meth:`render`, in the
+            order of the dimensions.
+
+        Raises
+        ------
+        ValueError
+            When either the width or the height is zero.
+        """
+
+        sizes = [tuple(size) for size in sizes]
+        original_height, original_width, _ = self.image.shape
+        levels = {
+            size: rescale_and_keep_aspect_ratio(original_width, original_height, *size)
+            for size in set(sizes)
+        }
+        pyramid_interpolation = cv.__dict__[IMAGEABC_CONFIGURATION['pyramid_interpolation']]
+        render_cache = get_render_cache()
+
+        source_image = None
+        rendered_images = {}
+        for size, level in sorted(
+                    levels.items(),
+                    key=lambda item: item[1][0] * item[1][1],
+                    reverse=True,
+                ):
+            rescaled_width, rescaled_height, top_margin, bottom_margin, left_margin, right_margin = \
+                level
+            if source_image is None or source_image.shape[1] < rescaled_width or \
+                    source_image.shape[0] < rescaled_height:
+                source_image = self.image
+            source_image = cv.resize(
+                source_image,
+                (rescaled_width, rescaled_height),
+                interpolation=pyramid_interpolation,
+            )
+            rendered_images[size] = render_cache.get(
+                'ImageABC.render',
+                self,
+                size,
+                lambda: cv.copyMakeBorder(
+                    source_image,
+                    top_margin,
+                    bottom_margin,
+                    left_margin,
+                    right_margin,
+                    borderType=cv.BORDER_CONSTANT,
+                    value=COLOR_RGBA_TRANSPARENT,
+                ),
+            )
+        return [rendered_images[size] for size in sizes]
+
 
 @total_ordering
 class FrameABC(ImageABC):
@@ -262,6 +389,15 @@ class FrameABC(ImageABC):
         The image data of the frame as an OpenCV CV_8UC3 RGBA matrix, where the alpha channel (A)
         denotes the weight of a pixel. Fully transparent pixels, i.e. pixels with zero alpha, SHOULD
         be completely disregarded in subsequent computation.
+    rgb_image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 RGB matrix.
+    bgr_image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 BGR matrix.
+    gray_image : array_like
+        The image data of the frame as an OpenCV CV_8UC1 grayscale matrix.
+    thumbnail_image : array_like
+        The image data of the frame downscaled to the width specified by the ``thumbnail_width``
+        configuration option as an OpenCV CV_8UC1 grayscale matrix.
     width : int
         The width of the image data.
     height : int
@@ -270,8 +406,19 @@ class FrameABC(ImageABC):
         The elapsed time since the beginning of the video.
     datetime : aware datetime
         The date, and time at which the frame was captured.
+
+    Notes
+    -----
+    The ``rgb_image``, ``bgr_image``, ``gray_image``, and ``thumbnail_image`` attributes are
+    computed from the ``image`` attribute by default. Subclasses MAY compute them from the image data in the color
+    space produced by a video decoder, and they MAY memoize them.
+
+    A consumer that no longer needs the image data of a frame SHOULD call the :meth:`release`
+    method, so that the memory occupied by the image data can be reused for other frames.
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def video(self):
@@ -282,6 +429,33 @@ class FrameABC(ImageABC):
     def number(self):
         pass
 
+    @property
+    def rgb_image(self):
+        return cv.cvtColor(self.image, cv.COLOR_RGBA2RGB)
+
+    @property
+    def bgr_image(self):
+        return cv.cvtColor(self.image, cv.COLOR_RGBA2BGR)
+
+    @property
+    def gray_image(self):
+        return cv.cvtColor(self.image, cv.COLOR_RGBA2GRAY)
+
+    @property
+    def thumbnail_image(self):
+        return cv.cvtColor(frame_thumbnail(self.image), cv.COLOR_RGBA2GRAY)
+
+    def release(self):
+        """Releases the image data of the frame.
+
+        After a frame has been released, the image data of the frame MUST NOT be accessed, and the
+        image data that were previously obtained from the frame MUST NOT be used, since the memory
+        occupied by the image data MAY be reused for other frames. Releasing a frame does nothing
+        by default.
+
+        """
+        pass
+
     @property
     def width(self):
         return self.video.width
@@ -349,6 +523,8 @@ class ConvexQuadrangleABC(ABC):
         The area of the screen in the video frame coordinate system.
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def top_left(self):
@@ -427,7 +603,7 @@ class ConvexQuadrangleABC(ABC):
         pass
 
     @abstractmethod
-    def transform(self, frame_image):
+    def transform(self, frame_image, width=None, height=None):
         """Transforms image data in the frame coordinate system to the screen coordinate system.
 
         Parameters
@@ -436,6 +612,16 @@ class ConvexQuadrangleABC(ABC):
             Image data in the video frame coordinate system as an OpenCV CV_8UC3 RGBA matrix, where
             the alpha channel (A) denotes the weight of a pixel. Fully transparent pixels, i.e.
             pixels with zero alpha, SHOULD be completely disregarded in subsequent computation.
+        width : int or None, optional
+            The width of the image data in the projection screen coordinate system. When specified,
+            the screen coordinate system MUST be rescaled horizontally to the width in the same
+            transformation without producing image data at the width of the quadrangle. When
+            unspecified or ``None``, the width of the quadrangle is used.
+        height : int or None, optional
+            The height of the image data in the projection screen coordinate system. When
+            specified, the screen coordinate system MUST be rescaled vertically to the height in
+            the same transformation without producing image data at the height of the quadrangle.
+            When unspecified or ``None``, the height of the quadrangle is used.
 
         Returns
         -------
@@ -553,6 +739,8 @@ class MovingConvexQuadrangleABC(ABC, Iterable):
         The latest coordinates of the moving convex quadrangle.
     """
 
+    __slots__ = ()
+
     @property
     def current_quadrangle(self):
         return next(reversed(self))
@@ -692,6 +880,8 @@ class ScreenABC(ImageABC):
         Whether the projection screen extends beyond the bounds of the video frame.
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def frame(self):
@@ -703,10 +893,61 @@ class ScreenABC(ImageABC):
         pass
 
     @property
-    @lru_cache(maxsize=SCREENABC_LRU_CACHE_MAXSIZE, typed=False)
+    @render_cached('ScreenABC.image')
     def image(self):
         return self.coordinates.transform(self.frame.image)
 
+    @render_cached('ScreenABC.render')
+    def render(self, width=None, height=None):
+        """Renders the image at the specified dimensions.
+
+        The image data are transformed from the frame coordinate system directly to the specified
+        dimensions, so that the image data in the ``image`` attribute are not produced.
+
+        Parameters
+        ----------
+        width : int or None, optional
+            The width of the image data. When unspecified or ``None``, the width of the image data
+            in the ``image`` attribute is used, unless the height is specified.
+        height : int or None, optional
+            The height of the image data. When unspecified or ``None``, the height of the image
+            data in the ``image`` attribute is used, unless the width is specified.
+
+        Returns
+        -------
+        image : array_like
+            The image data of the screen as an OpenCV CV_8UC3 RGBA matrix, where the alpha channel
+            (A) denotes the weight of a pixel. Fully transparent pixels, i.e. pixels with zero
+            alpha, SHOULD be completely disregarded in subsequent computation. The margins added to
+            the image data by keeping the aspect ratio of the screen are fully transparent.
+
+        Raises
+        ------
+        ValueError
+            When either the width or the height is zero.
+        """
+
+        rescaled_width, rescaled_height, top_margin, bottom_margin, left_margin, right_margin = \
+            rescale_and_keep_aspect_ratio(self.width, self.height, width, height)
+        rgba_image_rescaled = self.coordinates.transform(
+            self.frame.image,
+            rescaled_width,
+            rescaled_height,
+        )
+        rgba_image_rescaled_with_margins = cv.copyMakeBorder(
+            rgba_image_rescaled,
+            top_margin,
+            bottom_margin,
+            left_margin,
+            right_margin,
+            borderType=cv.BORDER_CONSTANT,
+            value=COLOR_RGBA_TRANSPARENT,
+        )
+        return rgba_image_rescaled_with_margins
+
+    def render_many(self, sizes):
+        return [self.render(width, height) for width, height in sizes]
+
     @property
     def width(self):
         return self.coordinates.width
@@ -822,6 +1063,41 @@ class DocumentABC(ABC, Iterable):
         """
         pass
 
+    def prerender(self, sizes, rgb=False):
+        """Renders the image data of all document pages at several dimensions in advance.
+
+        The rendered image data are placed in the caches of :meth:`PageABC.render`, or
+        :meth:`PageABC.render_rgb`, so that subsequent calls with the same dimensions reuse them. The
+        pages are produced in the order of :meth:`__iter__` as soon as their image data have been
+        rendered, so that a consumer can process a page while the following pages are rendered.
+
+        Notes
+        -----
+        Subclasses that can render several pages in parallel SHOULD override this method.
+
+        Parameters
+        ----------
+        sizes : iterable of (int or None, int or None)
+            The widths, and heights of the image data as specified by the ``width``, and ``height``
+            parameters of :meth:`PageABC.render`.
+        rgb : bool, optional
+            Whether the image data will be requested using :meth:`PageABC.render_rgb` rather than
+            :meth:`PageABC.render`. False if unspecified.
+
+        Returns
+        -------
+        pages : iterator of PageABC
+            An iterator of the pages of the document.
+        """
+        sizes = tuple(tuple(size) for size in sizes)
+        for page in self:
+            if rgb:
+                for width, height in sizes:
+                    page.render_rgb(width, height)
+            else:
+                page.render_many(sizes)
+            yield page
+
     def __hash__(self):
         return hash(self.uri)
 
@@ -897,8 +1173,19 @@ class PageABC(ImageABC):
 class PageDetectorABC(ABC):
     """An abstract detector of document pages in projection screens.
 
+    Attributes
+    ----------
+    render_sizes : tuple of (int or None, int or None)
+        The widths, and heights at which the page detector renders the image data of projection
+        screens using :meth:`ImageABC.render`. Page detectors that combine other page detectors MAY
+        render the image data at all these dimensions in advance using
+        :meth:`ImageABC.render_many`. An empty tuple by default.
     """
 
+    @property
+    def render_sizes(self):
+        return ()
+
     @abstractmethod
     def detect(self, frame, appeared_screens, existing_screens, disappeared_screens):
         """Detects document pages in projection screens from a current video frame.
@@ -926,6 +1213,34 @@ class PageDetectorABC(ABC):
         """
         pass
 
+    def detect_many(self, frames_screens):
+        """Detects document pages in projection screens from several current video frames.
+
+        Notes
+        -----
+        The video frames MAY come from different videos, such as the videos of several cameras that
+        capture the same lecture. Page detectors that use batched inference SHOULD override this
+        method, so that the screens from all the frames are processed jointly.
+
+        Parameters
+        ----------
+        frames_screens : iterable of (FrameABC, iterator, iterator, iterator)
+            Current video frames, and the projection screens that appeared, existed, and disappeared
+            in the frames and their movements as specified by the ``frame``, ``appeared_screens``,
+            ``existing_screens``, and ``disappeared_screens`` parameters of :meth:`detect`.
+
+        Returns
+        -------
+        detected_pages : list of dict of (ScreenABC, PageABC or None)
+            Maps between projection screens that exist in the current video frames and the document
+            pages detected in the projection screens as specified by the return value of
+            :meth:`detect`, in the order of the video frames.
+        """
+        return [
+            self.detect(frame, appeared_screens, existing_screens, disappeared_screens)
+            for frame, appeared_screens, existing_screens, disappeared_screens in frames_screens
+        ]
+
     def __repr__(self):
         return '<{classname}>'.format(
             classname=self.__class__.__name__,
@@ -2,6 +2,7 @@ r"""This module implements an ensemble page detector that lets other page detect
 
 """
 
+from itertools import chain
 
 from ..interface import PageDetectorABC
 from ..configuration import get_configuration
@@ -13,6 +14,10 @@ CONFIGURATION = get_configuration()['EnsemblePageDetector']
 class EnsemblePageDetector(PageDetectorABC):
     r"""A page detector that uses a voting ensemble of page detectors.
 
+    Before the page detectors in the ensemble vote, the image data of the projection screens are
+    rendered at the dimensions used by all the page detectors in a single pass, so that the page
+    detectors do not rescale the image data of a screen from scratch.
+
     Parameters
     ----------
     ensemble : dict of (PageDetectorABC, float)
@@ -30,23 +35,54 @@ class EnsemblePageDetector(PageDetectorABC):
         }
         self._quorum = quorum
 
+    @property
+    def render_sizes(self):
+        render_sizes = []
+        for page_detector in self._ensemble:
+            for render_size in page_detector.render_sizes:
+                if render_size not in render_sizes:
+                    render_sizes.append(render_size)
+        return tuple(render_sizes)
+
     def detect(self, frame, appeared_screens, existing_screens, disappeared_screens):
-        screens = (tuple(appeared_screens), tuple(existing_screens), tuple(disappeared_screens))
+        detected_pages, = self.detect_many([
+            (frame, appeared_screens, existing_screens, disappeared_screens),
+        ])
+        return detected_pages
+
+    def detect_many(self, frames_screens):
+        frames_screens = [
+            (frame, tuple(appeared_screens), tuple(existing_screens), tuple(disappeared_screens))
+            for frame, appeared_screens, existing_screens, disappeared_screens in frames_screens
+        ]
         ensemble = self._ensemble
         quorum = self._quorum
 
-        votes = {}
+        render_sizes = self.render_sizes
+        if render_sizes:
+            for _, appeared_screens, existing_screens, _ in frames_screens:
+                for screen, _ in chain(appeared_screens, existing_screens):
+                    screen.render_many(render_sizes)
+
+        votes = [{} for _ in frames_screens]
         for page_detector, page_detector_weight in ensemble.items():
-            for screen, detected_page in page_detector.detect(frame, *screens).items():
-                if screen not in votes:
-                    votes[screen] = {}
-                if detected_page not in votes[screen]:
-                    votes[screen][detected_page] = 0.0
-                votes[screen][detected_page] += page_detector_weight
-
-        detected_pages = {}
-        for screen, pages in votes.items():
-            detected_page, vote = max(pages.items(), key=lambda x: x[1])
-            detected_pages[screen] = detected_page if vote >= quorum else None
+            for frame_votes, frame_detected_pages in zip(
+                        votes,
+                        page_detector.detect_many(frames_screens),
+                    ):
+                for screen, detected_page in frame_detected_pages.items():
+                    if screen not in frame_votes:
+                        frame_votes[screen] = {}
+                    if detected_page not in frame_votes[screen]:
+                        frame_votes[screen][detected_page] = 0.0
+                    frame_votes[screen][detected_page] += page_detector_weight
 
-        return detected_pages
+        all_detected_pages = []
+        for frame_votes in votes:
+            detected_pages = {}
+            for screen, pages in frame_votes.items():
+                detected_page, vote = max(pages.items(), key=lambda x: x[1])
+                detected_pages[screen] = detected_page if vote >= quorum else None
+            all_detected_pages.append(detected_pages)
+
+        return all_detected_pages
@@ -15,6 +15,7 @@ import cv2 as cv
 import imagehash
 from PIL import Image
 
+from ..common import detect_pages_jointly
 from ..configuration import get_configuration
 from ..interface import PageDetectorABC
 
@@ -37,8 +38,10 @@ def _hash_image(image):
         A hash of the image.
     """
 
-    image_cv = cv.cvtColor(image.image, cv.COLOR_BGRA2RGBA)
-    image_pil = Image.fromarray(image_cv, 'RGBA')
+    rgb_image = image.render_rgb()
+    # The red and blue channels are swapped for compatibility with the hashes of the image data in
+    # the ``image`` attribute, which were converted from BGRA to RGBA.
+    image_pil = Image.fromarray(cv.cvtColor(rgb_image, cv.COLOR_RGB2BGR), 'RGB')
     hash_function = imagehash.__dict__[CONFIGURATION['hash_function']]
     return hash_function(image_pil).hash.flatten()
 
@@ -70,7 +73,12 @@ class ImageHashPageDetector(PageDetectorABC):
         LOGGER.debug('Building an ANNOY index with {} trees'.format(annoy_n_trees))
         annoy_index = AnnoyIndex(64, metric=annoy_distance_metric)
         pages = dict()
-        for page_index, page in enumerate(chain(*documents)):
+        for page_index, page in enumerate(
+                    chain.from_iterable(
+                        document.prerender(((None, None), ), rgb=True)
+                        for document in documents
+                    )
+                ):
             page_hash = _hash_image(page)
             annoy_index.add_item(page_index, page_hash)
             pages[page_index] = page
@@ -105,3 +113,6 @@ class ImageHashPageDetector(PageDetectorABC):
             detected_pages[screen] = closest_matching_page
 
         return detected_pages
+
+    def detect_many(self, frames_screens):
+        return detect_pages_jointly(self, frames_screens)
@@ -26,7 +26,7 @@ import numpy as np
 from npstreams.iter_utils import last
 from npstreams.stats import _ivar
 
-from ..common import get_batches
+from ..common import detect_pages_jointly, get_batches
 from ..configuration import get_configuration
 from ..interface import PageDetectorABC
 from ..video.annotated import get_videos, AnnotatedSampledVideoScreenDetector
@@ -588,8 +588,10 @@ def _preprocess_image(image):
     image_width = CONFIGURATION.getint('image_width')
     image_height = CONFIGURATION.getint('image_height')
 
-    rgba_image = image.render(image_width, image_height)
-    gray_image = cv.cvtColor(rgba_image, cv.COLOR_BGRA2GRAY)
+    rgb_image = image.render_rgb(image_width, image_height)
+    # The red and blue weights are swapped, since the network was trained on RGBA image data that
+    # were converted to grayscale as BGRA.
+    gray_image = cv.cvtColor(rgb_image, cv.COLOR_BGR2GRAY)
 
     return gray_image.astype(image_dtype)
 
@@ -640,7 +642,12 @@ class KerasSiamesePageDetector(PageDetectorABC):
         annoy_index = AnnoyIndex(num_dense_units, metric='euclidean')
         pages = dict()
         for page_index, (page, page_features) in enumerate(
-                    model.get_page_features(chain(*documents))
+                    model.get_page_features(
+                        chain.from_iterable(
+                            document.prerender(self.render_sizes, rgb=True)
+                            for document in documents
+                        )
+                    )
                 ):
             annoy_index.add_item(page_index, page_features)
             pages[page_index] = page
@@ -650,6 +657,10 @@ class KerasSiamesePageDetector(PageDetectorABC):
         self._model = model
         self._pages = pages
 
+    @property
+    def render_sizes(self):
+        return ((CONFIGURATION.getint('image_width'), CONFIGURATION.getint('image_height')), )
+
     def detect(self, frame, appeared_screens, existing_screens, disappeared_screens):
         annoy_search_k = CONFIGURATION.getint('annoy_search_k')
         num_nearest_pages = CONFIGURATION.getint('num_nearest_pages')
@@ -675,3 +686,6 @@ class KerasSiamesePageDetector(PageDetectorABC):
             detected_pages[screen] = closest_matching_page
 
         return detected_pages
+
+    def detect_many(self, frames_screens):
+        return detect_pages_jointly(self, frames_screens)
@@ -15,7 +15,7 @@ import cv2 as cv
 from keras.applications.vgg16 import VGG16, preprocess_input
 import numpy as np
 
-from ..common import get_batches
+from ..common import detect_pages_jointly, get_batches
 from ..configuration import get_configuration
 from ..interface import PageDetectorABC
 
@@ -53,8 +53,8 @@ def _last_hidden_vgg16_layer(images):
         image_batch_rgb = preprocess_input(
             np.array([
                 cv.cvtColor(
-                    image.render(VGG16_INPUT_SIZE, VGG16_INPUT_SIZE),
-                    cv.COLOR_BGRA2RGB,
+                    image.render_rgb(VGG16_INPUT_SIZE, VGG16_INPUT_SIZE),
+                    cv.COLOR_RGB2BGR,
                 )
                 for image in image_batch
             ], dtype=np.float32)
@@ -87,7 +87,12 @@ class KerasVGG16PageDetector(PageDetectorABC):
         for page_index, (page, page_activations) in enumerate(
                     zip(
                         chain(*documents),
-                        _last_hidden_vgg16_layer(chain(*documents)),
+                        _last_hidden_vgg16_layer(
+                            chain.from_iterable(
+                                document.prerender(((VGG16_INPUT_SIZE, VGG16_INPUT_SIZE), ), rgb=True)
+                                for document in documents
+                            )
+                        ),
                     )
                 ):
             annoy_index.add_item(page_index, page_activations)
@@ -97,6 +102,10 @@ class KerasVGG16PageDetector(PageDetectorABC):
         self._annoy_index = annoy_index
         self._pages = pages
 
+    @property
+    def render_sizes(self):
+        return ((VGG16_INPUT_SIZE, VGG16_INPUT_SIZE), )
+
     def detect(self, frame, appeared_screens, existing_screens, disappeared_screens):
         annoy_search_k = CONFIGURATION.getint('annoy_search_k')
         num_nearest_pages = CONFIGURATION.getint('num_nearest_pages')
@@ -122,3 +131,6 @@ class KerasVGG16PageDetector(PageDetectorABC):
             detected_pages[screen] = closest_matching_page
 
         return detected_pages
+
+    def detect_many(self, frames_screens):
+        return detect_pages_jointly(self, frames_screens)
@@ -31,6 +31,8 @@ class DequeMovingConvexQuadrangle(MovingConvexQuadrangleABC):
         If the window size is less than two.
     """
 
+    __slots__ = ('_quadrangles', )
+
     def __init__(self, current_quadrangle, window_size=None):
         if window_size is not None and window_size < 2:
             raise ValueError(
@@ -6,9 +6,11 @@ The implementation uses the GEOS library exposed through the Shapely Python pack
 
 """
 
+from math import hypot
+
 import cv2 as cv
 import numpy as np
-from shapely.geometry import Point, Polygon
+from shapely.geometry import Polygon
 
 from ..common import change_aspect_ratio_by_upscaling, COLOR_RGBA_TRANSPARENT
 from ..configuration import get_configuration
@@ -17,11 +19,51 @@ from ..interface import ConvexQuadrangleABC
 CONFIGURATION = get_configuration()['GEOSConvexQuadrangle']
 
 
+def _point(coordinates):
+    """Converts the coordinates of a point to a pair of floats.
+
+    Parameters
+    ----------
+    coordinates : (scalar, scalar)
+        The coordinates of a point.
+
+    Returns
+    -------
+    point : (float, float)
+        The coordinates of the point.
+    """
+    x, y = coordinates
+    return (float(x), float(y))
+
+
+def _distance(first_point, second_point):
+    """Computes the Euclidean distance between two points.
+
+    Parameters
+    ----------
+    first_point : (float, float)
+        The coordinates of the first point.
+    second_point : (float, float)
+        The coordinates of the second point.
+
+    Returns
+    -------
+    distance : float
+        The Euclidean distance between the points.
+    """
+    return hypot(first_point[0] - second_point[0], first_point[1] - second_point[1])
+
+
 class GEOSConvexQuadrangle(ConvexQuadrangleABC):
     """A convex quadrangle specifying a map between video frame and projection screen coordinates.
 
     The quadrangle specifies the screen corners in a video frame coordinate system.
 
+    Notes
+    -----
+    The corners are stored as pairs of floats. The GEOS polygon, and the homography are only
+    constructed when they are first needed, since most quadrangles are only compared, and hashed.
+
     Parameters
     ----------
     top_left : (scalar, scalar)
@@ -63,79 +105,123 @@ class GEOSConvexQuadrangle(ConvexQuadrangleABC):
         The homography from the frame coordinate system to the screen coordinate system.
     """
 
+    __slots__ = (
+        '_top_left',
+        '_top_right',
+        '_bottom_left',
+        '_bottom_right',
+        '_hash',
+        '_width',
+        '_height',
+        '_stretch',
+        '_cached_polygon',
+        '_cached_transform_matrix',
+        '__weakref__',
+    )
+
     def __init__(self, top_left, top_right, bottom_left, bottom_right, aspect_ratio=None):
-        self._top_left = Point(top_left)
-        self._top_right = Point(top_right)
-        self._bottom_left = Point(bottom_left)
-        self._bottom_right = Point(bottom_right)
-        self._hash = hash((self.top_left, self.top_right, self.bottom_left, self.bottom_right))
-        self._polygon = Polygon([top_left, top_right, bottom_right, bottom_left])
-
-        top_width = self._top_left.distance(self._top_right)
-        bottom_width = self._bottom_left.distance(self._bottom_right)
-        left_height = self._top_left.distance(self._bottom_left)
-        right_height = self._top_right.distance(self._bottom_right)
+        self._top_left = top_left = _point(top_left)
+        self._top_right = top_right = _point(top_right)
+        self._bottom_left = bottom_left = _point(bottom_left)
+        self._bottom_right = bottom_right = _point(bottom_right)
+        self._hash = hash((top_left, top_right, bottom_left, bottom_right))
+        self._cached_polygon = None
+        self._cached_transform_matrix = None
+
+        top_width = _distance(top_left, top_right)
+        bottom_width = _distance(bottom_left, bottom_right)
+        left_height = _distance(top_left, bottom_left)
+        right_height = _distance(top_right, bottom_right)
         max_width = max(int(top_width), int(bottom_width))
         max_height = max(int(left_height), int(right_height))
 
-        frame_coordinates = np.float32(
-            [
-                top_left,
-                top_right,
-                bottom_left,
-                bottom_right,
-            ],
-        )
-        screen_coordinates = np.float32(
-            [
-                (0, 0),
-                (max_width - 1, 0),
-                (0, max_height - 1),
-                (max_width - 1, max_height - 1),
-            ],
-        )
-        self.transform_matrix = cv.getPerspectiveTransform(frame_coordinates, screen_coordinates)
-
         if aspect_ratio is None:
             self._width = max_width
             self._height = max_height
+            self._stretch = None
         else:
             self._width, self._height = change_aspect_ratio_by_upscaling(
                 max_width,
                 max_height,
                 aspect_ratio,
             )
-            stretch_x = self.width / max_width
-            stretch_y = self.height / max_height
-            self.transform_matrix = np.array([
-                (stretch_x, 0, 0),
-                (0, stretch_y, 0),
-                (0, 0, 1),
-            ], dtype=float).dot(self.transform_matrix)
+            self._stretch = (max_width, max_height)
+
+    @property
+    def _polygon(self):
+        if self._cached_polygon is None:
+            self._cached_polygon = Polygon([
+                self._top_left,
+                self._top_right,
+                self._bottom_right,
+                self._bottom_left,
+            ])
+        return self._cached_polygon
+
+    @property
+    def transform_matrix(self):
+        if self._cached_transform_matrix is None:
+            if self._stretch is None:
+                max_width, max_height = self.width, self.height
+            else:
+                max_width, max_height = self._stretch
+            frame_coordinates = np.float32(
+                [
+                    self._top_left,
+                    self._top_right,
+                    self._bottom_left,
+                    self._bottom_right,
+                ],
+            )
+            screen_coordinates = np.float32(
+                [
+                    (0, 0),
+                    (max_width - 1, 0),
+                    (0, max_height - 1),
+                    (max_width - 1, max_height - 1),
+                ],
+            )
+            transform_matrix = cv.getPerspectiveTransform(frame_coordinates, screen_coordinates)
+            if self._stretch is not None:
+                stretch_x = self.width / max_width
+                stretch_y = self.height / max_height
+                transform_matrix = np.array([
+                    (stretch_x, 0, 0),
+                    (0, stretch_y, 0),
+                    (0, 0, 1),
+                ], dtype=float).dot(transform_matrix)
+            self._cached_transform_matrix = transform_matrix
+        return self._cached_transform_matrix
 
     @property
     def top_left(self):
-        return self._top_left.coords[0]
+        return self._top_left
 
     @property
     def top_right(self):
-        return self._top_right.coords[0]
+        return self._top_right
 
     @property
     def top_left_bound(self):
-        return self._polygon.bounds[0:2]
+        return (
+            min(self._top_left[0], self._top_right[0], self._bottom_left[0], self._bottom_right[0]),
+            min(self._top_left[1], self._top_right[1], self._bottom_left[1], self._bottom_right[1]),
+        )
 
     @property
     def bottom_left(self):
-        return self._bottom_left.coords[0]
+        return self._bottom_left
 
     @property
     def bottom_right(self):
-        return self._bottom_right.coords[0]
+        return self._bottom_right
 
     @property
     def bottom_right_bound(self):
-        return self._polygon.bounds[2:4]
+        return (
+            max(self._top_left[0], self._top_right[0], self._bottom_left[0], self._bottom_right[0]),
+            max(self._top_left[1], self._top_right[1], self._bottom_left[1], self._bottom_right[1]),
+        )
 
     @property
     def width(self):
@@ -179,12 +265,23 @@ class GEOSConvexQuadrangle(ConvexQuadrangleABC):
             return union.area
         return NotImplemented
 
-    def transform(self, frame_image):
+    def transform(self, frame_image, width=None, height=None):
         rescale_interpolation = cv.__dict__[CONFIGURATION['rescale_interpolation']]
+        if width is None:
+            width = self.width
+        if height is None:
+            height = self.height
+        transform_matrix = self.transform_matrix
+        if (width, height) != (self.width, self.height):
+            transform_matrix = np.array([
+                (width / self.width, 0, 0),
+                (0, height / self.height, 0),
+                (0, 0, 1),
+            ], dtype=float).dot(transform_matrix)
         return cv.warpPerspective(
             frame_image,
-            self.transform_matrix,
-            (self.width, self.height),
+            transform_matrix,
+            (width, height),
             borderMode=cv.BORDER_CONSTANT,
             borderValue=COLOR_RGBA_TRANSPARENT,
             flags=rescale_interpolation,
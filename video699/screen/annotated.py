@@ -378,6 +378,8 @@ class AnnotatedScreen(ScreenABC):
         The height of the image data.
     """
 
+    __slots__ = ('screen_id', 'name', 'datetime', '_frame', '_coordinates', '__weakref__')
+
     def __init__(self, screen_id, name, datetime, frame, coordinates):
         self.screen_id = screen_id
         self.name = name
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements a screen detector that reuses screens detected in advance.
+
+"""
+
+from ..interface import ScreenDetectorABC
+
+
+class CachedScreenDetector(ScreenDetectorABC):
+    """A screen detector that reuses the screens detected in advance by a video.
+
+    Videos that detect screens in frames to decide which frames they produce, such as
+    :class:`video699.video.adaptive.AdaptiveSampledVideo`, and
+    :class:`video699.video.scene.ScreenRegionSceneDetector`, cache the detected screens using
+    :meth:`detect_and_cache`, so that the screens are detected only once in every produced frame.
+
+    Parameters
+    ----------
+    screen_detector : ScreenDetectorABC
+        The screen detector used for frames whose screens have not been detected yet.
+
+    Attributes
+    ----------
+    num_detected_frames : int
+        The number of frames, in which screens have been detected and cached.
+    """
+
+    def __init__(self, screen_detector):
+        self._screen_detector = screen_detector
+        self._screens = {}
+        self.num_detected_frames = 0
+
+    def detect_and_cache(self, frame):
+        """Detects screens in a frame, and caches them until they are requested by :meth:`detect`.
+
+        Parameters
+        ----------
+        frame : FrameABC
+            A frame of a video.
+
+        Returns
+        -------
+        screens : tuple of ScreenABC
+            The detected lit projection screens.
+        """
+        if frame not in self._screens:
+            self._screens[frame] = tuple(self._screen_detector.detect(frame))
+            self.num_detected_frames += 1
+        return self._screens[frame]
+
+    def forget(self, frame):
+        """Removes the cached screens detected in a frame.
+
+        Parameters
+        ----------
+        frame : FrameABC
+            A frame of a video.
+        """
+        self._screens.pop(frame, None)
+
+    def detect(self, frame):
+        if frame in self._screens:
+            return self._screens.pop(frame)
+        return self._screen_detector.detect(frame)
@@ -23,7 +23,8 @@ image_area = CONFIGURATION.getint('image_width') * CONFIGURATION.getint('image_h
 
 
 def cv_image_to_tensor(image):
-    image = cv2.cvtColor(image, cv2.COLOR_RGBA2RGB)
+    if image.shape[2] == 4:
+        image = cv2.cvtColor(image, cv2.COLOR_RGBA2RGB)
     tensor = torch.from_numpy(np.transpose(image, (2, 0, 1)))
     tensor = Image(tensor.to(torch.float32) / 255)
     return tensor
@@ -85,6 +85,8 @@ class FastAIScreenDetectorVideoScreen(ScreenABC):
         An index of screen in the frame.
     """
 
+    __slots__ = ('_frame', '_screen_index', '_coordinates', '__weakref__')
+
     def __init__(self, frame, screen_index, coordinates):
         self._frame = frame
         self._screen_index = screen_index
@@ -274,7 +276,7 @@ class FastAIScreenDetector(ScreenDetectorABC):
         if not self.is_fitted:
             raise NotFittedException
 
-        tensor = cv_image_to_tensor(frame.image)
+        tensor = cv_image_to_tensor(frame.rgb_image)
         tensor = self.learner.predict(tensor)
         pred = tensor_to_cv_binary_image(tensor)
         height, width = tuple(self.src_shape)
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements sampling a video adaptively based on the observed screen activity.
+
+"""
+
+from collections.abc import Iterator
+from logging import getLogger
+
+import cv2 as cv
+import numpy as np
+
+from ..configuration import get_configuration
+from ..interface import VideoABC
+from ..screen.cached import CachedScreenDetector
+
+
+LOGGER = getLogger(__name__)
+CONFIGURATION = get_configuration()['AdaptiveSampledVideo']
+
+
+def _jaccard_index(coordinates, other_coordinates):
+    """Computes the Jaccard index of the coordinates of two projection screens.
+
+    Parameters
+    ----------
+    coordinates : ConvexQuadrangleABC
+        The coordinates of a projection screen.
+    other_coordinates : ConvexQuadrangleABC
+        The coordinates of another projection screen.
+
+    Returns
+    -------
+    jaccard_index : float
+        The area of the intersection divided by the area of the union of the coordinates, or zero
+        if the area of the union is zero, so that degenerate screens are never stable.
+    """
+
+    union_area = coordinates.union_area(other_coordinates)
+    if union_area == 0:
+        return 0.0
+    return coordinates.intersection_area(other_coordinates) / union_area
+
+
+class AdaptiveSampledVideo(VideoABC, Iterator):
+    """A video sampled sparsely while the projection screens are stable, and densely around changes.
+
+    Frames are sampled at the framerate specified by the ``sparse_fps`` configuration option as long
+    as the projection screens detected in the sampled frames are stable, i.e. the screens have not
+    moved, and the content of the screens has not changed. When a sampled frame differs from the
+    previously produced frame, the frames between the two are searched using bisection for the
+    first frame that differs, and all frames from the first differing frame onwards are produced for
+    the duration specified by the ``dense_duration`` configuration option.
+
+    The screens detected by the sampler are reused by the screen detector in the
+    :attr:`screen_detector` attribute, which should be passed to a screen event detector, so that
+    screens are detected only once in every produced frame.
+
+    .. _RFC3987: https://tools.ietf.org/html/rfc3987
+
+    Notes
+    -----
+    It is not possible to repeatedly iterate over all video frames.
+    The video produces non-consecutive frames. The frames that have been read since the last
+    produced frame are kept in memory, so that the first differing frame can be found without
+    repositioning the original video. If the screens change, and then return to their original
+    state between two sampled frames, the change is not detected.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The original video.
+    screen_detector : ScreenDetectorABC
+        The screen detector that will be used to detect lit projection screens in video frames.
+
+    Attributes
+    ----------
+    fps : int
+        The framerate of the original video in frames per second.
+    width : int
+        The width of the video.
+    height : int
+        The height of the video.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program.
+    screen_detector : ScreenDetectorABC
+        A screen detector that reuses the screens detected by the sampler in the produced frames.
+    num_read_frames : int
+        The number of frames read from the original video.
+    num_detected_frames : int
+        The number of frames, in which the sampler has detected screens.
+    """
+
+    def __init__(self, video, screen_detector):
+        self._video = video
+        self.screen_detector = CachedScreenDetector(screen_detector)
+        self.num_read_frames = 0
+        self._iterable = self._read_video()
+
+    @property
+    def fps(self):
+        return self._video.fps
+
+    @property
+    def width(self):
+        return self._video.width
+
+    @property
+    def height(self):
+        return self._video.height
+
+    @property
+    def datetime(self):
+        return self._video.datetime
+
+    @property
+    def uri(self):
+        return self._video.uri
+
+    def __iter__(self):
+        return self
+
+    @property
+    def num_detected_frames(self):
+        return self.screen_detector.num_detected_frames
+
+    def _is_stable(self, previous_screens, screens):
+        """Decides whether projection screens in two frames are stable.
+
+        Parameters
+        ----------
+        previous_screens : tuple of ScreenABC
+            The screens detected in the earlier frame.
+        screens : tuple of ScreenABC
+            The screens detected in the later frame.
+
+        Returns
+        -------
+        is_stable : bool
+            Whether the screens have neither appeared, nor disappeared, nor moved, nor changed
+            content.
+        """
+
+        if len(previous_screens) != len(screens):
+            return False
+        min_jaccard_index = CONFIGURATION.getfloat('min_jaccard_index')
+        max_content_distance = CONFIGURATION.getfloat('max_content_distance')
+        content_size = (
+            CONFIGURATION.getint('content_width'),
+            CONFIGURATION.getint('content_height'),
+        )
+        unmatched_screens = list(screens)
+        for previous_screen in previous_screens:
+            previous_coordinates = previous_screen.coordinates
+            best_jaccard_index, best_screen = max(
+                (
+                    (_jaccard_index(previous_coordinates, screen.coordinates), screen)
+                    for screen in unmatched_screens
+                ),
+                key=lambda item: item[0],
+            )
+            if best_jaccard_index < min_jaccard_index:
+                return False
+            unmatched_screens.remove(best_screen)
+            previous_content, content = (
+                cv.cvtColor(
+                    cv.resize(screen.image, content_size, interpolation=cv.INTER_AREA),
+                    cv.COLOR_RGBA2GRAY,
+                ) for screen in (previous_screen, best_screen)
+            )
+            content_distance = np.mean(cv.absdiff(previous_content, content)) / 255.0
+            if content_distance > max_content_distance:
+                return False
+        return True
+
+    def _read_video(self):
+        sparse_stride = max(1, int(round(self.fps / CONFIGURATION.getfloat('sparse_fps'))))
+        num_dense_frames = int(round(self.fps * CONFIGURATION.getfloat('dense_duration')))
+        screen_detector = self.screen_detector
+
+        previous_screens = None
+        previous_frame_number = None
+        dense_frame_number = None
+        read_frames = []
+        frame_iterator = iter(self._video)
+        is_finished = False
+        while not is_finished:
+            frame = next(frame_iterator, None)
+            if frame is None:
+                if not read_frames:
+                    break
+                is_finished = True
+                frame = read_frames.pop()
+            else:
+                self.num_read_frames += 1
+            if previous_screens is None:
+                previous_screens = screen_detector.detect_and_cache(frame)
+                previous_frame_number = frame.number
+                yield frame
+                continue
+
+            is_dense = dense_frame_number is not None and frame.number <= dense_frame_number
+            read_frames.append(frame)
+            is_sampled = is_dense or frame.number - previous_frame_number >= sparse_stride
+            if not is_sampled and not is_finished:
+                continue
+
+            screens = screen_detector.detect_and_cache(frame)
+            if self._is_stable(previous_screens, screens):
+                produced_frames = [frame]
+            elif is_dense:
+                produced_frames = [frame]
+                dense_frame_number = frame.number + num_dense_frames
+            else:
+                lower, upper = 0, len(read_frames) - 1
+                while lower < upper:
+                    middle = (lower + upper) // 2
+                    middle_screens = screen_detector.detect_and_cache(read_frames[middle])
+                    if self._is_stable(previous_screens, middle_screens):
+                        lower = middle + 1
+                    else:
+                        upper = middle
+                produced_frames = read_frames[lower:]
+                dense_frame_number = produced_frames[0].number + num_dense_frames
+                LOGGER.debug('Screens changed in {}, sampling densely until frame #{}'.format(
+                    produced_frames[0],
+                    dense_frame_number,
+                ))
+
+            for read_frame in read_frames:
+                if read_frame not in produced_frames:
+                    screen_detector.forget(read_frame)
+                    read_frame.release()
+            read_frames = []
+
+            for produced_frame in produced_frames:
+                previous_screens = screen_detector.detect_and_cache(produced_frame)
+                previous_frame_number = produced_frame.number
+                yield produced_frame
+
+    def __next__(self):
+        return next(self._iterable)
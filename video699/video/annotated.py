@@ -29,7 +29,6 @@ from ..event.screen import (
 from ..frame.image import ImageFrame
 from ..interface import (
     DocumentABC,
-    FrameABC,
     PageABC,
     PageDetectorABC,
     ScreenABC,
@@ -443,7 +442,7 @@ class _FrameAnnotations(object):
         self.vgg256 = vgg256
 
 
-class AnnotatedSampledVideoFrame(FrameABC):
+class AnnotatedSampledVideoFrame(ImageFrame):
     """A frame of a video extracted from a dataset with XML human annotations.
 
     Parameters
@@ -470,6 +469,12 @@ class AnnotatedSampledVideoFrame(FrameABC):
         The image data of the frame as an OpenCV CV_8UC3 RGBA matrix, where the alpha channel (A)
         is currently unused and all pixels are fully opaque, i.e. they have the maximum alpha of
         255.
+    rgb_image : ndarray
+        The image data of the frame as an OpenCV CV_8UC3 RGB matrix.
+    gray_image : ndarray
+        The image data of the frame as an OpenCV CV_8UC1 grayscale matrix.
+    thumbnail_image : ndarray
+        The downscaled image data of the frame as an OpenCV CV_8UC1 grayscale matrix.
     width : int
         The width of the image data.
     height : int
@@ -480,24 +485,15 @@ class AnnotatedSampledVideoFrame(FrameABC):
         256-dimensional feature vectors obtained by feeding the frame image data into VGG ConvNets.
     """
 
-    def __init__(self, video, number):
-        self._video = video
+    __slots__ = ('filename', 'vgg256')
 
+    def __init__(self, video, number):
         frame_annotations = FRAME_ANNOTATIONS[video.uri][number]
         self.filename = frame_annotations.filename
         self.vgg256 = frame_annotations.vgg256
 
-        bgr_frame_image = cv.imread(self.pathname)
-        rgba_frame_image = cv.cvtColor(bgr_frame_image, cv.COLOR_BGR2RGBA)
-        self._frame = ImageFrame(video, number, rgba_frame_image)
-
-    @property
-    def video(self):
-        return self._video
-
-    @property
-    def number(self):
-        return self._frame.number
+        bgr_frame_image = cv.imread(os.path.join(video.pathname, self.filename))
+        super().__init__(video, number, bgr_image=bgr_frame_image)
 
     @property
     def pathname(self):
@@ -507,10 +503,6 @@ class AnnotatedSampledVideoFrame(FrameABC):
         )
         return pathname
 
-    @property
-    def image(self):
-        return self._frame.image
-
 
 class _VideoAnnotations(object):
     """Human annotations associated with a single video.
@@ -790,6 +782,8 @@ class AnnotatedSampledVideoScreen(ScreenABC):
         256-dimensional feature vectors obtained by feeding the screen image data into VGG ConvNets.
     """
 
+    __slots__ = ('_frame', '_screen_index', '_coordinates', 'condition', 'vgg256', '__weakref__')
+
     def __init__(self, frame, screen_index):
         self._frame = frame
         self._screen_index = screen_index
@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements a video, whose decoded frames are cached in a memory-mapped file.
+
+"""
+
+from collections.abc import Sized
+from datetime import timedelta
+from hashlib import sha256
+from logging import getLogger
+import os
+
+import cv2 as cv
+import numpy as np
+
+from ..configuration import evict_cache_files, get_cache_dirname, get_configuration
+from ..interface import VideoABC
+from ..frame.image import ImageFrame
+
+
+LOGGER = getLogger(__name__)
+CONFIGURATION = get_configuration()['CachedVideo']
+
+
+def _cache_key(video):
+    """Returns a key that identifies the frames produced by a video.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The video.
+
+    Returns
+    -------
+    key : str
+        The key produced by the ``cache_key`` method of the video, such as
+        :meth:`video699.video.file.VideoFile.cache_key`.
+
+    Raises
+    ------
+    ValueError
+        If the video does not produce a key, since the URI of a video does not identify the range,
+        and the sampling of the produced frames, or the modifications of the video.
+    """
+
+    cache_key = getattr(video, 'cache_key', None)
+    if cache_key is None:
+        raise ValueError('The frames of {} cannot be identified in the cache'.format(video))
+    return cache_key()
+
+
+def _cache_pathnames(key, width, height, frame_stride):
+    """Returns the pathnames of the cached frames of a video, and of their index.
+
+    Parameters
+    ----------
+    key : str
+        The key that identifies the frames produced by the video.
+    width : int
+        The width of the cached frames.
+    height : int
+        The height of the cached frames.
+    frame_stride : int
+        Only every ``frame_stride``-th frame of the video is cached.
+
+    Returns
+    -------
+    frames_pathname : str
+        The pathname of a raw array file that contains the image data of the cached frames.
+    index_pathname : str
+        The pathname of a NumPy array file that contains the frame numbers, and the elapsed times
+        since the beginning of the video in milliseconds for all cached frames.
+    """
+
+    key = sha256('{}\0{}\0{}\0{}'.format(key, width, height, frame_stride).encode('utf8'))
+    pathname = os.path.join(get_cache_dirname('decoded-frames'), key.hexdigest())
+    return ('{}.frames'.format(pathname), '{}.npy'.format(pathname))
+
+
+class CachedVideoFrame(ImageFrame):
+    """A frame of a video, whose image data are stored in a memory-mapped file.
+
+    Parameters
+    ----------
+    video : CachedVideo
+        The video containing the frame.
+    number : int
+        The frame number, i.e. the position of the frame in the original video. Frame indexing is
+        one-based, i.e. the first frame has number 1.
+    duration : timedelta
+        The elapsed time since the beginning of the video.
+    bgr_image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 BGR matrix backed by a memory-mapped file.
+
+    Attributes
+    ----------
+    video : CachedVideo
+        The video containing the frame.
+    number : int
+        The frame number, i.e. the position of the frame in the original video. Frame indexing is
+        one-based, i.e. the first frame has number 1.
+    image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 RGBA matrix, where the alpha channel (A)
+        is currently unused and all pixels are fully opaque, i.e. they have the maximum alpha of
+        255.
+    rgb_image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 RGB matrix.
+    bgr_image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 BGR matrix.
+    gray_image : array_like
+        The image data of the frame as an OpenCV CV_8UC1 grayscale matrix.
+    thumbnail_image : array_like
+        The downscaled image data of the frame as an OpenCV CV_8UC1 grayscale matrix.
+    width : int
+        The width of the image data.
+    height : int
+        The height of the image data.
+    duration : timedelta
+        The elapsed time since the beginning of the video.
+    datetime : aware datetime
+        The date, and time at which the frame was captured.
+    """
+
+    __slots__ = ('_duration', )
+
+    def __init__(self, video, number, duration, bgr_image):
+        super().__init__(video, number, bgr_image=bgr_image)
+        self._duration = duration
+
+    @property
+    def duration(self):
+        return self._duration
+
+
+class CachedVideo(VideoABC, Sized):
+    """A video, whose decoded, and optionally downscaled frames are cached in a memory-mapped file.
+
+    The frames of a video are decoded only once, and stored in a raw array file in the XDG cache
+    directory. The file is keyed by the dimensions of the cached frames, by the frame stride, and by
+    the key produced by the ``cache_key`` method of the video, such as
+    :meth:`video699.video.file.VideoFile.cache_key`, which consists of the identity of the video
+    file, i.e. its pathname, size, and time of the last modification, and of the range, and the
+    sampling of the frames produced by the video file. Subsequent instances for the same key read
+    the frames from the memory-mapped file without decoding the video. When the stored frames exceed
+    the ``cache_max_bytes`` configuration option, the least recently used frames are removed.
+
+    .. _RFC3987: https://tools.ietf.org/html/rfc3987
+
+    Notes
+    -----
+    It is possible to repeatedly iterate over all video frames, and to randomly access the video
+    frames by their position in the cache.
+    If the frames are not cached, all frames of the original video are read, when the class is
+    instantiated. The cache is only stored after the original video has been read completely.
+    The frame numbers and the elapsed times of the cached frames are those of the original video.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The original video.
+    width : int or None, optional
+        The width of the cached frames. When only the height is specified, the width is computed
+        from the aspect ratio of the original video. When unspecified or ``None``, the width of the
+        original video is used.
+    height : int or None, optional
+        The height of the cached frames. When only the width is specified, the height is computed
+        from the aspect ratio of the original video. When unspecified or ``None``, the height of the
+        original video is used.
+    frame_stride : int, optional
+        Only every ``frame_stride``-th frame produced by the original video is cached. One if
+        unspecified.
+
+    Attributes
+    ----------
+    fps : int
+        The framerate of the original video in frames per second.
+    width : int
+        The width of the cached frames.
+    height : int
+        The height of the cached frames.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program. The IRI is the same as the IRI of the original video.
+
+    Raises
+    ------
+    ValueError
+        If the frame stride is not positive, or if the original video has no ``cache_key`` method.
+    """
+
+    def __init__(self, video, width=None, height=None, frame_stride=1):
+        if frame_stride < 1:
+            raise ValueError('The frame stride must be positive')
+        if width is None and height is None:
+            width, height = video.width, video.height
+        elif width is None:
+            width = max(1, int(round(video.width * height / video.height)))
+        elif height is None:
+            height = max(1, int(round(video.height * width / video.width)))
+        self._fps = video.fps
+        self._width = width
+        self._height = height
+        self._datetime = video.datetime
+        self._uri = video.uri
+
+        frames_pathname, index_pathname = _cache_pathnames(
+            _cache_key(video),
+            width,
+            height,
+            frame_stride,
+        )
+        try:
+            index = np.load(index_pathname)
+            self._images = self._load(frames_pathname, len(index))
+            for pathname in (frames_pathname, index_pathname):
+                os.utime(pathname)  # mark the cached frames as recently used
+            LOGGER.debug('Loaded cached frames of {} from {}'.format(video, frames_pathname))
+        except (OSError, ValueError):
+            index = self._store(video, frame_stride, frames_pathname, index_pathname)
+            self._images = self._load(frames_pathname, len(index))
+            evict_cache_files(
+                os.path.dirname(frames_pathname),
+                CONFIGURATION.getint('cache_max_bytes'),
+                ('.frames', '.npy'),
+            )
+        self._numbers = [int(number) for number in index[:, 0]]
+        self._durations = [timedelta(milliseconds=duration) for duration in index[:, 1]]
+
+    def _load(self, frames_pathname, num_frames):
+        """Maps the image data of the cached frames to memory.
+
+        Notes
+        -----
+        The memory-mapped image data remain readable after the file has been evicted from the cache.
+
+        Parameters
+        ----------
+        frames_pathname : str
+            The pathname of a raw array file that contains the image data of the cached frames.
+        num_frames : int
+            The number of the cached frames.
+
+        Returns
+        -------
+        images : array_like
+            The image data of the cached frames.
+
+        Raises
+        ------
+        OSError
+            If the raw array file does not exist.
+        ValueError
+            If the raw array file is too small.
+        """
+
+        shape = (num_frames, self._height, self._width, 3)
+        if not num_frames:
+            return np.empty(shape, dtype=np.uint8)
+        return np.memmap(frames_pathname, dtype=np.uint8, mode='r', shape=shape)
+
+    def _store(self, video, frame_stride, frames_pathname, index_pathname):
+        """Decodes all frames of the original video, and stores them in the cache.
+
+        Parameters
+        ----------
+        video : VideoABC
+            The original video.
+        frame_stride : int
+            Only every ``frame_stride``-th frame produced by the original video is cached.
+        frames_pathname : str
+            The pathname of a raw array file that will contain the image data of the cached frames.
+        index_pathname : str
+            The pathname of a NumPy array file that will contain the frame numbers, and the elapsed
+            times since the beginning of the video in milliseconds for all cached frames.
+
+        Returns
+        -------
+        index : array_like
+            The frame numbers, and the elapsed times since the beginning of the video in
+            milliseconds for all cached frames.
+        """
+
+        interpolation = cv.__dict__[CONFIGURATION['interpolation']]
+        temporary_pathname = '{}.{}.tmp'.format(frames_pathname, os.getpid())
+        index = []
+        with open(temporary_pathname, 'wb') as f:
+            for frame_index, frame in enumerate(video):
+                if frame_index % frame_stride:
+                    frame.release()
+                    continue
+                bgr_image = frame.bgr_image
+                if (frame.width, frame.height) != (self._width, self._height):
+                    bgr_image = cv.resize(
+                        bgr_image,
+                        (self._width, self._height),
+                        interpolation=interpolation,
+                    )
+                f.write(np.ascontiguousarray(bgr_image).tobytes())
+                index.append((frame.number, frame.duration.total_seconds() * 1000))
+                frame.release()
+        index = np.array(index, dtype=np.float64).reshape(-1, 2)
+        os.replace(temporary_pathname, frames_pathname)
+        np.save(index_pathname, index)
+        LOGGER.debug('Stored cached frames of {} in {}'.format(video, frames_pathname))
+        return index
+
+    @property
+    def fps(self):
+        return self._fps
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def datetime(self):
+        return self._datetime
+
+    @property
+    def uri(self):
+        return self._uri
+
+    def __getitem__(self, index):
+        """Produces a video frame at a position in the cache.
+
+        Parameters
+        ----------
+        index : int
+            The zero-based position of the frame in the cache.
+
+        Returns
+        -------
+        frame : CachedVideoFrame
+            The video frame.
+
+        Raises
+        ------
+        IndexError
+            If the position is out of range.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Frame position out of range')
+        return CachedVideoFrame(
+            self,
+            self._numbers[index],
+            self._durations[index],
+            self._images[index],
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __len__(self):
+        """Produces the number of cached video frames.
+
+        Returns
+        -------
+        length : int
+            The number of cached video frames.
+        """
+        return len(self._numbers)
@@ -0,0 +1,498 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements reading a video from a video file using an FFmpeg subprocess.
+
+"""
+
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from logging import getLogger
+from math import ceil, floor
+from pathlib import Path
+import subprocess
+
+import cv2 as cv
+import numpy as np
+
+from ..configuration import get_configuration
+from ..interface import VideoABC
+from ..frame.pool import FrameBufferPool
+from .file import _file_key, VideoFileFrame
+
+
+LOGGER = getLogger(__name__)
+CONFIGURATION = get_configuration()['FFmpegVideoFile']
+
+
+def _read_exactly(stream, buffer):
+    """Reads bytes from a stream until a buffer is full.
+
+    Parameters
+    ----------
+    stream : io.BufferedIOBase
+        A stream.
+    buffer : ndarray
+        A contiguous buffer.
+
+    Returns
+    -------
+    is_full : bool
+        Whether the buffer was filled before the end of the stream.
+    """
+
+    view = memoryview(buffer).cast('B')
+    num_bytes_read = 0
+    while num_bytes_read < len(view):
+        num_bytes = stream.readinto(view[num_bytes_read:])
+        if not num_bytes:
+            return False
+        num_bytes_read += num_bytes
+    return True
+
+
+class FFmpegVideoFile(VideoABC, Iterator):
+    """A video read from a video file by a local FFmpeg process.
+
+    The video file is decoded by an ``ffmpeg`` process, which writes raw BGR frames to a pipe. The
+    decoder uses the number of threads specified by the ``threads`` configuration option. The
+    selection of frames, scaling, and the conversion to the BGR color space take place inside
+    FFmpeg, so that Python only receives the produced frames.
+
+    .. _RFC3987: https://tools.ietf.org/html/rfc3987
+
+    Notes
+    -----
+    It is not possible to repeatedly iterate over all video frames, unless the video is
+    repositioned using :meth:`seek`, or :meth:`frames`.
+    The metadata of the video file are read by OpenCV. The frame numbers, and the elapsed times of
+    the produced frames are computed from the framerate of the video, which is inaccurate for videos
+    with a variable framerate.
+    Since decoding takes place in a separate process, video frames are decoded while the previously
+    decoded frames are being processed.
+
+    Parameters
+    ----------
+    pathname : str
+        The pathname of a video file.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    verbose : bool, optional
+        Whether a progress bar will be shown during the reading of the video. False if unspecified.
+    frame_stride : int or None, optional
+        When not ``None``, only every ``frame_stride``-th frame of the video will be produced.
+        ``None`` if unspecified.
+    sample_fps : scalar or None, optional
+        When not ``None``, only the first frame in every ``1 / sample_fps`` seconds of the video
+        will be produced. ``None`` if unspecified.
+    buffer_pool : bool or FrameBufferPool, optional
+        Whether video frames will be read into buffers acquired from a frame buffer pool. When a
+        :class:`FrameBufferPool` is specified, it will be used instead of a new pool. False if
+        unspecified.
+    width : int or None, optional
+        When not ``None``, FFmpeg will scale the video frames to the width. When only the height is
+        specified, the width is computed from the aspect ratio of the video. ``None`` if unspecified.
+    height : int or None, optional
+        When not ``None``, FFmpeg will scale the video frames to the height. When only the width is
+        specified, the height is computed from the aspect ratio of the video. ``None`` if
+        unspecified.
+    start : timedelta or None, optional
+        When not ``None``, the video will start with the first frame that was captured at or after
+        the elapsed time since the beginning of the video. ``None`` if unspecified.
+    end : timedelta or None, optional
+        When not ``None``, the video will end with the last frame that was captured at or before the
+        elapsed time since the beginning of the video. ``None`` if unspecified.
+
+    Attributes
+    ----------
+    fps : int
+        The framerate of the video in frames per second.
+    width : int
+        The width of the produced video frames.
+    height : int
+        The height of the produced video frames.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program.
+    num_frames : int
+        The number of frames in the video file including the frames that are not produced. The
+        number is estimated from the video file metadata.
+
+    Raises
+    ------
+    OSError
+        If the video file cannot be opened by OpenCV.
+    ValueError
+        If both the frame stride and the sampling framerate are specified, or if either is not
+        positive.
+    """
+
+    def __init__(self, pathname, datetime, verbose=False, frame_stride=None, sample_fps=None,
+                 buffer_pool=False, width=None, height=None, start=None, end=None):
+        if frame_stride is not None and sample_fps is not None:
+            raise ValueError('The frame stride and the sampling framerate are mutually exclusive')
+        if frame_stride is not None and frame_stride < 1:
+            raise ValueError('The frame stride must be positive')
+        if sample_fps is not None and sample_fps <= 0:
+            raise ValueError('The sampling framerate must be positive')
+        cap = cv.VideoCapture(pathname)
+        if not cap.isOpened():
+            raise OSError('Unable to open video file "{}"'.format(pathname))
+        self._fps = cap.get(cv.CAP_PROP_FPS)
+        original_width = int(cap.get(cv.CAP_PROP_FRAME_WIDTH))
+        original_height = int(cap.get(cv.CAP_PROP_FRAME_HEIGHT))
+        self._num_frames = int(cap.get(cv.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        if width is None and height is None:
+            width, height = original_width, original_height
+        elif width is None:
+            width = max(1, int(round(original_width * height / original_height)))
+        elif height is None:
+            height = max(1, int(round(original_height * width / original_width)))
+        self._scale = (width, height) != (original_width, original_height)
+        self._width = width
+        self._height = height
+        self._pathname = pathname
+        self._verbose = verbose
+        self._frame_stride = frame_stride if frame_stride is not None else 1
+        self._sample_fps = sample_fps
+        if buffer_pool is True:
+            buffer_pool = FrameBufferPool()
+        elif buffer_pool is False:
+            buffer_pool = None
+        self._buffer_pool = buffer_pool
+        self._datetime = datetime
+        self._uri = Path(pathname).resolve().as_uri()
+        first_frame_number, last_frame_number = self.frame_range(start, end)
+        self._first_frame_number = first_frame_number
+        self._last_frame_number = last_frame_number
+        self._iterable = self._read_video(first_frame_number, last_frame_number)
+
+    @property
+    def fps(self):
+        return self._fps
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def datetime(self):
+        return self._datetime
+
+    @property
+    def uri(self):
+        return self._uri
+
+    def __iter__(self):
+        return self
+
+    @property
+    def num_frames(self):
+        return self._num_frames
+
+    def frame_range(self, start=None, end=None):
+        """Maps a time range of the video to a range of frame numbers.
+
+        Parameters
+        ----------
+        start : timedelta or None, optional
+            The elapsed time since the beginning of the video at which the time range starts. When
+            ``None`` or unspecified, the time range starts at the beginning of the video.
+        end : timedelta or None, optional
+            The elapsed time since the beginning of the video at which the time range ends. When
+            ``None`` or unspecified, the time range ends at the end of the video.
+
+        Returns
+        -------
+        first_frame_number : int
+            The number of the first frame that was captured at or after the start of the time range.
+        last_frame_number : int or None
+            The number of the last frame that was captured at or before the end of the time range,
+            or ``None`` if the time range ends at the end of the video.
+        """
+
+        if start is None:
+            first_frame_number = 1
+        else:
+            first_frame_number = max(0, ceil(start.total_seconds() * self.fps - 1e-6)) + 1
+        if end is None:
+            last_frame_number = None
+        else:
+            last_frame_number = floor(end.total_seconds() * self.fps + 1e-6) + 1
+        return (first_frame_number, last_frame_number)
+
+    def seek(self, frame_number):
+        """Repositions the video, so that it continues with a specified frame.
+
+        Notes
+        -----
+        The FFmpeg process is restarted, and it seeks to the specified frame.
+
+        Parameters
+        ----------
+        frame_number : int
+            The number of the next produced frame. If a frame stride is specified, then the frame
+            stride is counted from this frame. If a sampling framerate is specified, then the next
+            produced frame is the first frame at or after this frame that is sampled.
+
+        Raises
+        ------
+        ValueError
+            If the frame number is less than one.
+        """
+
+        self.frames(frame_number)
+
+    def frames(self, start=None, end=None):
+        """Repositions the video, so that it produces only frames in a specified range.
+
+        Notes
+        -----
+        The produced iterator shares the position with the video. Further repositioning of the video
+        changes the frames produced by the iterator.
+
+        Parameters
+        ----------
+        start : int or None, optional
+            The number of the first produced frame. When ``None`` or unspecified, the first produced
+            frame is the first frame of the video.
+        end : int or None, optional
+            The number of the last produced frame. When ``None`` or unspecified, the last produced
+            frame is the last frame of the video.
+
+        Returns
+        -------
+        frames : iterator of VideoFileFrame
+            An iterable of the frames of the video in the range.
+
+        Raises
+        ------
+        ValueError
+            If the number of the first produced frame is less than one.
+        """
+
+        if start is None:
+            start = 1
+        if start < 1:
+            raise ValueError('Frame indexing is one-based')
+        self._iterable.close()
+        self._first_frame_number = start
+        self._last_frame_number = end
+        self._iterable = self._read_video(start, end)
+        return self
+
+    def sampled_frame_numbers(self, frame_numbers):
+        """Selects the frames produced by the video without decoding them.
+
+        Parameters
+        ----------
+        frame_numbers : iterable of int
+            The numbers of frames in ascending order.
+
+        Returns
+        -------
+        sampled_frame_numbers : list of int
+            The numbers of the frames that the video produces in its current range of frames.
+        """
+
+        first_frame_number = self._first_frame_number
+        last_frame_number = self._last_frame_number
+        return [
+            int(frame_number)
+            for frame_number in frame_numbers
+            if frame_number >= first_frame_number and (
+                last_frame_number is None or frame_number <= last_frame_number
+            ) and self._is_sampled(frame_number, first_frame_number)
+        ]
+
+    def cache_key(self, frame_range=True):
+        """Returns a key that identifies the frames produced by the video in caches.
+
+        Parameters
+        ----------
+        frame_range : bool, optional
+            Whether the key identifies the range of frames produced by the video, so that videos
+            that produce different ranges of frames of the same video file have different keys.
+            True if unspecified.
+
+        Returns
+        -------
+        key : str
+            A key that consists of the resolved pathname, the size, and the time of the last
+            modification of the video file, of the frame stride, of the sampling framerate, and of
+            the dimensions of the produced video frames. The key changes when the video file is
+            modified.
+
+        Raises
+        ------
+        OSError
+            If the video file does not exist.
+        """
+
+        key = '{}\0{}\0{}\0{}\0{}'.format(
+            _file_key(self._pathname),
+            self._frame_stride,
+            self._sample_fps,
+            self._width,
+            self._height,
+        )
+        if frame_range:
+            key = '{}\0{}\0{}'.format(key, self._first_frame_number, self._last_frame_number)
+        return key
+
+    def _is_sampled(self, frame_number, first_frame_number):
+        """Decides whether a frame is produced.
+
+        Parameters
+        ----------
+        frame_number : int
+            The number of a frame.
+        first_frame_number : int
+            The number of the first frame in the range of produced frames.
+
+        Returns
+        -------
+        is_sampled : bool
+            Whether the frame is produced.
+        """
+
+        if frame_number == first_frame_number:
+            return True
+        if self._sample_fps is None:
+            return (frame_number - first_frame_number) % self._frame_stride == 0
+        sample_fps, fps = self._sample_fps, self._fps
+        sample_number = floor((frame_number - 1) / fps * sample_fps + 1e-6)
+        previous_sample_number = floor((frame_number - 2) / fps * sample_fps + 1e-6)
+        return sample_number != previous_sample_number
+
+    def _command(self, first_frame_number, last_frame_number):
+        """Produces the command line of an FFmpeg process that decodes a range of frames.
+
+        Parameters
+        ----------
+        first_frame_number : int
+            The number of the first decoded frame.
+        last_frame_number : int or None
+            The number of the last decoded frame, or ``None`` if frames are decoded until the end of
+            the video.
+
+        Returns
+        -------
+        command : list of str
+            The command line of the FFmpeg process.
+        """
+
+        command = [
+            CONFIGURATION['executable'],
+            '-nostdin',
+            '-loglevel', 'error',
+            '-threads', CONFIGURATION['threads'],
+        ]
+        if first_frame_number > 1:
+            start_time = (first_frame_number - 1.5) / self._fps
+            command.extend(['-ss', '{:.6f}'.format(start_time)])
+        else:
+            start_time = 0.0
+        if last_frame_number is not None:
+            end_time = max(start_time, (last_frame_number - 0.5) / self._fps)
+            command.extend(['-t', '{:.6f}'.format(end_time - start_time)])
+        command.extend(['-i', self._pathname, '-an', '-sn'])
+
+        filters = []
+        if self._sample_fps is not None:
+            filters.append(
+                "select='eq(n,0)+gt(floor((n+{offset})/{fps}*{sample_fps}+1e-6),"
+                "floor((n+{offset}-1)/{fps}*{sample_fps}+1e-6))'".format(
+                    offset=first_frame_number - 1,
+                    fps=self._fps,
+                    sample_fps=self._sample_fps,
+                )
+            )
+        elif self._frame_stride > 1:
+            filters.append("select='not(mod(n,{}))'".format(self._frame_stride))
+        if self._scale:
+            filters.append('scale={}:{}:flags={}'.format(
+                self._width,
+                self._height,
+                CONFIGURATION['scale_flags'],
+            ))
+        if filters:
+            command.extend(['-vf', ','.join(filters)])
+        command.extend(['-vsync', '0', '-pix_fmt', 'bgr24', '-f', 'rawvideo', 'pipe:1'])
+        return command
+
+    def _read_video(self, first_frame_number, last_frame_number):
+        pathname = self._pathname
+        verbose = self._verbose
+        buffer_pool = self._buffer_pool
+        shape = (self._height, self._width, 3)
+        if last_frame_number is not None and last_frame_number < first_frame_number:
+            return
+        command = self._command(first_frame_number, last_frame_number)
+        LOGGER.debug('Running {}'.format(' '.join(command)))
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, bufsize=-1)
+        first_frame_time = datetime.now()
+        frame_number = first_frame_number - 1
+        try:
+            while True:
+                if buffer_pool is None:
+                    bgr_frame_image = np.empty(shape, dtype=np.uint8)
+                else:
+                    bgr_frame_image = buffer_pool.acquire(shape)
+                if not _read_exactly(process.stdout, bgr_frame_image):
+                    if buffer_pool is not None:
+                        buffer_pool.release(bgr_frame_image)
+                    break
+                frame_number += 1
+                while not self._is_sampled(frame_number, first_frame_number):
+                    frame_number += 1
+                video_duration = timedelta(seconds=(frame_number - 1) / self._fps)
+                yield VideoFileFrame(self, frame_number, video_duration, bgr_frame_image, buffer_pool)
+                if verbose:
+                    conversion_duration = datetime.now() - first_frame_time
+                    try:
+                        conversion_speed = (
+                            (frame_number - first_frame_number) / self._fps /
+                            conversion_duration.total_seconds()
+                        )
+                    except ZeroDivisionError:
+                        conversion_speed = 0
+                    status = '\rReading {}: frame {}, time {}, speed {:.2f}x'.format(
+                        pathname,
+                        frame_number,
+                        video_duration,
+                        conversion_speed,
+                    )
+                    print(status, end='')
+        finally:
+            is_terminated = process.poll() is None
+            if is_terminated:
+                process.kill()
+            process.stdout.close()
+            returncode = process.wait()
+            if returncode and not is_terminated:
+                LOGGER.warning('FFmpeg exited with status {} while reading {}'.format(
+                    returncode,
+                    pathname,
+                ))
+        if verbose:
+            print()
+
+    def __next__(self):
+        return next(self._iterable)
+
+    def close(self):
+        """Stops reading the video file, and terminates the FFmpeg process.
+
+        """
+        self._iterable.close()
+
+    def __del__(self):
+        if hasattr(self, '_iterable'):  # the initialization may have raised an exception
+            self.close()
@@ -6,15 +6,271 @@
 
 from collections.abc import Iterator
 from datetime import datetime, timedelta
+from hashlib import sha256
+from logging import getLogger
+from math import ceil, floor
+import os
 from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Event, Thread
 
 import cv2 as cv
+import numpy as np
 
-from ..interface import VideoABC, FrameABC
+from ..configuration import evict_cache_files, get_cache_dirname, get_configuration
+from ..interface import VideoABC
 from ..frame.image import ImageFrame
+from ..frame.pool import FrameBufferPool
 
 
-class VideoFileFrame(FrameABC):
+LOGGER = getLogger(__name__)
+CONFIGURATION = get_configuration()['VideoFile']
+
+
+def _file_key(pathname):
+    """Returns a key that identifies the content of a video file.
+
+    Parameters
+    ----------
+    pathname : str
+        The pathname of a video file.
+
+    Returns
+    -------
+    key : str
+        A key that consists of the resolved pathname, the size, and the time of the last
+        modification of the video file. The key changes when the video file is modified.
+    """
+
+    video_path = Path(pathname).resolve()
+    video_stat = video_path.stat()
+    return '{}\0{}\0{}'.format(video_path, video_stat.st_size, video_stat.st_mtime_ns)
+
+
+def _index_pathname(pathname):
+    """Returns the pathname of the cached frame timestamp index of a video file.
+
+    Parameters
+    ----------
+    pathname : str
+        The pathname of a video file.
+
+    Returns
+    -------
+    index_pathname : str
+        The pathname of the cached frame timestamp index. The pathname changes when the video file
+        is modified.
+    """
+
+    key = sha256(_file_key(pathname).encode('utf8')).hexdigest()
+    return os.path.join(get_cache_dirname('video-index'), '{}.npy'.format(key))
+
+
+def _load_index(pathname):
+    """Loads a cached frame timestamp index of a video file, and marks it as recently used.
+
+    Parameters
+    ----------
+    pathname : str
+        The pathname of a video file.
+
+    Returns
+    -------
+    timestamps : array_like or None
+        The elapsed times since the beginning of the video in milliseconds for all frames of the
+        video, or ``None`` if the index is not cached.
+    """
+
+    try:
+        index_pathname = _index_pathname(pathname)
+        timestamps = np.load(index_pathname)
+        os.utime(index_pathname)
+        LOGGER.debug('Loaded frame timestamp index {}'.format(index_pathname))
+        return timestamps
+    except (OSError, ValueError) as err:
+        LOGGER.debug('Failed to load frame timestamp index of {}: {}'.format(pathname, err))
+        return None
+
+
+def _save_index(pathname, timestamps):
+    """Stores a frame timestamp index of a video file in the XDG cache directory.
+
+    When the stored indices exceed the ``index_cache_max_bytes`` configuration option, the least
+    recently used indices are removed.
+
+    Parameters
+    ----------
+    pathname : str
+        The pathname of a video file.
+    timestamps : array_like
+        The elapsed times since the beginning of the video in milliseconds for all frames of the
+        video.
+    """
+
+    try:
+        index_pathname = _index_pathname(pathname)
+        np.save(index_pathname, timestamps)
+        LOGGER.debug('Stored frame timestamp index {}'.format(index_pathname))
+        evict_cache_files(
+            os.path.dirname(index_pathname),
+            CONFIGURATION.getint('index_cache_max_bytes'),
+            ('.npy', ),
+        )
+    except OSError as err:
+        LOGGER.warning('Failed to store frame timestamp index of {}: {}'.format(pathname, err))
+
+
+def _decode_frames(cap, first_frame_number=1, last_frame_number=None, frame_stride=1,
+                   sample_fps=None, timestamps=None, buffer_pool=None):
+    """Decodes video frames from an OpenCV video capture.
+
+    Notes
+    -----
+    Frames that are not sampled are only grabbed from the video capture, and they are not
+    retrieved.
+
+    Parameters
+    ----------
+    cap : cv.VideoCapture
+        An opened OpenCV video capture.
+    first_frame_number : int, optional
+        The number of the first decoded frame. If the video capture is at a different position, it
+        is repositioned. If the first decoded frame follows the position closely, as specified by
+        the ``max_grabbed_frames`` configuration option, the preceding frames are grabbed instead.
+        One if unspecified.
+    last_frame_number : int or None, optional
+        The number of the last decoded frame. When ``None`` or unspecified, frames are decoded until
+        the end of the video.
+    frame_stride : int, optional
+        Only every ``frame_stride``-th frame starting with the first frame is decoded. One if
+        unspecified.
+    sample_fps : scalar or None, optional
+        When not ``None``, only the first frame in every ``1 / sample_fps`` seconds of the video is
+        decoded and the frame stride is disregarded. ``None`` if unspecified.
+    timestamps : list or None, optional
+        When not ``None``, the elapsed times since the beginning of the video in milliseconds for
+        all grabbed frames are appended to the list. ``None`` if unspecified.
+    buffer_pool : FrameBufferPool or None, optional
+        When not ``None``, the frames are decoded into buffers acquired from the frame buffer pool.
+        ``None`` if unspecified.
+
+    Returns
+    -------
+    decoded_frames : iterator of (int, timedelta, array_like)
+        The frame numbers, the elapsed times since the beginning of the video, and the image data
+        of the frames as OpenCV CV_8UC3 BGR matrices.
+    """
+
+    num_skipped_frames = first_frame_number - 1 - int(cap.get(cv.CAP_PROP_POS_FRAMES))
+    if 0 < num_skipped_frames <= CONFIGURATION.getint('max_grabbed_frames'):
+        for _ in range(num_skipped_frames):
+            cap.grab()
+    elif num_skipped_frames != 0:
+        cap.set(cv.CAP_PROP_POS_FRAMES, first_frame_number - 1)
+    frame_number = first_frame_number - 1
+    previous_sample_number = None
+    shape = (
+        int(cap.get(cv.CAP_PROP_FRAME_HEIGHT)),
+        int(cap.get(cv.CAP_PROP_FRAME_WIDTH)),
+        3,
+    )
+    while last_frame_number is None or frame_number < last_frame_number:
+        frame_number += 1
+        if not cap.grab():
+            break
+        video_timestamp = cap.get(cv.CAP_PROP_POS_MSEC)
+        if timestamps is not None:
+            timestamps.append(video_timestamp)
+        video_duration = timedelta(milliseconds=video_timestamp)
+        if sample_fps is None:
+            if (frame_number - first_frame_number) % frame_stride:
+                continue
+        else:
+            sample_number = floor(video_duration.total_seconds() * sample_fps + 1e-6)
+            if sample_number == previous_sample_number:
+                continue
+            previous_sample_number = sample_number
+        if buffer_pool is None:
+            retval, bgr_frame_image = cap.retrieve()
+        else:
+            buffer = buffer_pool.acquire(shape)
+            retval, bgr_frame_image = cap.retrieve(image=buffer)
+            if not retval:
+                buffer_pool.release(buffer)
+        if not retval:
+            break
+        yield (frame_number, video_duration, bgr_frame_image)
+
+
+def _prefetch_frames(decoded_frames, queue_size):
+    """Decodes video frames in a background thread that fills a bounded queue.
+
+    Notes
+    -----
+    The background thread is stopped as soon as the produced iterator is exhausted, closed, or
+    finalized. The background thread never holds a reference to the video, so that the video can be
+    finalized while the thread is running.
+
+    Parameters
+    ----------
+    decoded_frames : iterator
+        An iterator of decoded video frames that will be exhausted by the background thread.
+    queue_size : int
+        The maximum number of decoded video frames that are kept in the queue.
+
+    Returns
+    -------
+    decoded_frames : iterator
+        The decoded video frames in the original order.
+    """
+
+    timeout = CONFIGURATION.getfloat('prefetch_timeout')
+    queue = Queue(maxsize=queue_size)
+    stopped = Event()
+    end_of_video = object()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=timeout)
+                return True
+            except Full:
+                pass
+        return False
+
+    def decode():
+        try:
+            for decoded_frame in decoded_frames:
+                if not put((decoded_frame, None)):
+                    break
+        except Exception as err:
+            put((end_of_video, err))
+        else:
+            put((end_of_video, None))
+        finally:
+            decoded_frames.close()
+
+    decoder_thread = Thread(target=decode, name='VideoFileDecoder', daemon=True)
+    decoder_thread.start()
+    try:
+        while True:
+            decoded_frame, err = queue.get()
+            if err is not None:
+                raise err
+            if decoded_frame is end_of_video:
+                break
+            yield decoded_frame
+    finally:
+        stopped.set()
+        try:
+            while True:
+                queue.get_nowait()
+        except Empty:
+            pass
+        decoder_thread.join()
+
+
+class VideoFileFrame(ImageFrame):
     """A frame of a video read from a video file.
 
     Parameters
@@ -26,10 +282,12 @@ class VideoFileFrame(FrameABC):
         i.e. the first frame has number 1.
     duration : timedelta
         The elapsed time since the beginning of the video.
-    image : array_like
-        The image data of the frame as an OpenCV CV_8UC3 RGBA matrix, where the alpha channel (A)
-        is currently unused and all pixels are fully opaque, i.e. they have the maximum alpha of
-        255.
+    bgr_image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 BGR matrix, i.e. in the color space
+        produced by the OpenCV video decoder.
+    buffer_pool : FrameBufferPool or None, optional
+        The frame buffer pool to which the image data are released when the frame is released.
+        ``None`` if unspecified.
 
     Attributes
     ----------
@@ -41,7 +299,15 @@ class VideoFileFrame(FrameABC):
     image : array_like
         The image data of the frame as an OpenCV CV_8UC3 RGBA matrix, where the alpha channel (A)
         is currently unused and all pixels are fully opaque, i.e. they have the maximum alpha of
-        255.
+        255. The image data are converted from the BGR color space when they are first accessed.
+    rgb_image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 RGB matrix.
+    bgr_image : array_like
+        The image data of the frame as an OpenCV CV_8UC3 BGR matrix.
+    gray_image : array_like
+        The image data of the frame as an OpenCV CV_8UC1 grayscale matrix.
+    thumbnail_image : array_like
+        The downscaled image data of the frame as an OpenCV CV_8UC1 grayscale matrix.
     width : int
         The width of the image data.
     height : int
@@ -52,21 +318,11 @@ class VideoFileFrame(FrameABC):
         The date, and time at which the frame was captured.
     """
 
-    def __init__(self, video, number, duration, image):
-        self._frame = ImageFrame(video, number, image)
-        self._duration = duration
-
-    @property
-    def video(self):
-        return self._frame.video
-
-    @property
-    def number(self):
-        return self._frame.number
+    __slots__ = ('_duration', )
 
-    @property
-    def image(self):
-        return self._frame.image
+    def __init__(self, video, number, duration, bgr_image, buffer_pool=None):
+        super().__init__(video, number, bgr_image=bgr_image, buffer_pool=buffer_pool)
+        self._duration = duration
 
     @property
     def duration(self):
@@ -80,9 +336,30 @@ class VideoFile(VideoABC, Iterator):
 
     Notes
     -----
-    It is not possible to repeatedly iterate over all video frames.
+    It is not possible to repeatedly iterate over all video frames, unless the video is
+    repositioned using :meth:`seek`, or :meth:`frames`.
     A video file is opened as soon as the class is instantiated, and released only after the
-    finalization of the object or after the last frame has been read.
+    finalization of the object, after the last frame of the video has been read, or after
+    :meth:`close` has been called. After the last frame of a range of frames has been read, the
+    video file is not released, so that the following range is decoded from the current position.
+    A released video file is reopened when the video is repositioned.
+    After all frames of a video file have been read, the elapsed times of all frames are stored in
+    the XDG cache directory unless the ``cache_index`` configuration option is disabled. The cached
+    index is used to map time ranges to frame numbers. Without the index, the framerate of the
+    video is used instead, which is inaccurate for videos with a variable framerate.
+    When frame prefetching is enabled, video frames are decoded in a background thread, which
+    fills a bounded queue, while the previously decoded frames are being processed. The size of
+    the queue is specified by the ``prefetch_queue_size`` configuration option.
+    Decoded frames are kept in the BGR color space produced by the video decoder. The RGBA, RGB,
+    grayscale, and downscaled image data are computed only when they are first accessed.
+    When a frame stride or a sampling framerate is specified, the video produces non-consecutive
+    frames. The frames that are skipped are only grabbed from the video file, and they are not
+    retrieved. The frame numbers and the elapsed times of the
+    produced frames are the same as if no frames were skipped.
+    When a frame buffer pool is enabled, video frames are decoded into recycled buffers, and the
+    image data in other color spaces are computed into recycled buffers as well. The buffers of a
+    frame are returned to the pool when :meth:`FrameABC.release` is called. Frames that are never
+    released are freed by the garbage collector as usual.
 
     Parameters
     ----------
@@ -92,6 +369,24 @@ class VideoFile(VideoABC, Iterator):
         The date, and time at which the video was captured.
     verbose : bool, optional
         Whether a progress bar will be shown during the reading of the video. False if unspecified.
+    prefetch : bool, optional
+        Whether video frames will be decoded in a background thread. False if unspecified.
+    frame_stride : int or None, optional
+        When not ``None``, only every ``frame_stride``-th frame of the video will be produced.
+        ``None`` if unspecified.
+    sample_fps : scalar or None, optional
+        When not ``None``, only the first frame in every ``1 / sample_fps`` seconds of the video
+        will be produced. ``None`` if unspecified.
+    buffer_pool : bool or FrameBufferPool, optional
+        Whether video frames will be decoded into buffers acquired from a frame buffer pool. When a
+        :class:`FrameBufferPool` is specified, it will be used instead of a new pool. False if
+        unspecified.
+    start : timedelta or None, optional
+        When not ``None``, the video will start with the first frame that was captured at or after
+        the elapsed time since the beginning of the video. ``None`` if unspecified.
+    end : timedelta or None, optional
+        When not ``None``, the video will end with the last frame that was captured at or before the
+        elapsed time since the beginning of the video. ``None`` if unspecified.
 
     Attributes
     ----------
@@ -106,21 +401,48 @@ class VideoFile(VideoABC, Iterator):
     uri : string
         An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
         of a program.
+    num_frames : int
+        The number of frames in the video file including the frames that are not produced. Unless
+        the index is cached, the number is estimated from the video file metadata.
 
     Raises
     ------
     OSError
         If the video file cannot be opened by OpenCV.
+    ValueError
+        If both the frame stride and the sampling framerate are specified, or if either is not
+        positive.
     """
 
-    def __init__(self, pathname, datetime, verbose=False):
+    def __init__(self, pathname, datetime, verbose=False, prefetch=False, frame_stride=None,
+                 sample_fps=None, buffer_pool=False, start=None, end=None):
+        if frame_stride is not None and sample_fps is not None:
+            raise ValueError('The frame stride and the sampling framerate are mutually exclusive')
+        if frame_stride is not None and frame_stride < 1:
+            raise ValueError('The frame stride must be positive')
+        if sample_fps is not None and sample_fps <= 0:
+            raise ValueError('The sampling framerate must be positive')
         self._cap = cv.VideoCapture(pathname)
-        self._iterable = self._read_video(pathname, verbose)
+        self._pathname = pathname
+        self._verbose = verbose
+        self._prefetch = prefetch
+        self._frame_stride = frame_stride if frame_stride is not None else 1
+        self._sample_fps = sample_fps
+        if buffer_pool is True:
+            buffer_pool = FrameBufferPool()
+        elif buffer_pool is False:
+            buffer_pool = None
+        self._buffer_pool = buffer_pool
         self._fps = self._cap.get(cv.CAP_PROP_FPS)
         self._width = int(self._cap.get(cv.CAP_PROP_FRAME_WIDTH))
         self._height = int(self._cap.get(cv.CAP_PROP_FRAME_HEIGHT))
         self._datetime = datetime
         self._uri = Path(pathname).resolve().as_uri()
+        self._timestamps = _load_index(pathname) if self._cap.isOpened() else None
+        first_frame_number, last_frame_number = self.frame_range(start, end)
+        self._first_frame_number = first_frame_number
+        self._last_frame_number = last_frame_number
+        self._iterable = self._read_video(first_frame_number, last_frame_number)
 
     @property
     def fps(self):
@@ -145,42 +467,260 @@ class VideoFile(VideoABC, Iterator):
     def __iter__(self):
         return self
 
-    def _read_video(self, pathname, verbose):
+    @property
+    def num_frames(self):
+        if self._timestamps is not None:
+            return len(self._timestamps)
+        return int(self._cap.get(cv.CAP_PROP_FRAME_COUNT))
+
+    def frame_range(self, start=None, end=None):
+        """Maps a time range of the video to a range of frame numbers.
+
+        Parameters
+        ----------
+        start : timedelta or None, optional
+            The elapsed time since the beginning of the video at which the time range starts. When
+            ``None`` or unspecified, the time range starts at the beginning of the video.
+        end : timedelta or None, optional
+            The elapsed time since the beginning of the video at which the time range ends. When
+            ``None`` or unspecified, the time range ends at the end of the video.
+
+        Returns
+        -------
+        first_frame_number : int
+            The number of the first frame that was captured at or after the start of the time range.
+        last_frame_number : int or None
+            The number of the last frame that was captured at or before the end of the time range,
+            or ``None`` if the time range ends at the end of the video.
+        """
+
+        timestamps = self._timestamps
+        if start is None:
+            first_frame_number = 1
+        elif timestamps is not None:
+            milliseconds = start.total_seconds() * 1000.0
+            first_frame_number = int(np.searchsorted(timestamps, milliseconds - 1e-3, side='left')) + 1
+        else:
+            first_frame_number = max(0, ceil(start.total_seconds() * self.fps - 1e-6)) + 1
+        if end is None:
+            last_frame_number = None
+        elif timestamps is not None:
+            milliseconds = end.total_seconds() * 1000.0
+            last_frame_number = int(np.searchsorted(timestamps, milliseconds + 1e-3, side='right'))
+        else:
+            last_frame_number = floor(end.total_seconds() * self.fps + 1e-6) + 1
+        return (first_frame_number, last_frame_number)
+
+    def seek(self, frame_number):
+        """Repositions the video, so that it continues with a specified frame.
+
+        Notes
+        -----
+        The video capture backend seeks to the nearest preceding keyframe, and decodes the frames
+        up to the specified frame. If frame prefetching is enabled, the background decoder thread is
+        stopped before the video is repositioned.
+
+        Parameters
+        ----------
+        frame_number : int
+            The number of the next produced frame. If a frame stride is specified, then the frame
+            stride is counted from this frame. If a sampling framerate is specified, then the next
+            produced frame is the first frame at or after this frame that is sampled.
+
+        Raises
+        ------
+        ValueError
+            If the frame number is less than one.
+        """
+
+        self.frames(frame_number)
+
+    def frames(self, start=None, end=None):
+        """Repositions the video, so that it produces only frames in a specified range.
+
+        Notes
+        -----
+        The produced iterator shares the position with the video. Further repositioning of the video
+        changes the frames produced by the iterator.
+
+        Parameters
+        ----------
+        start : int or None, optional
+            The number of the first produced frame. When ``None`` or unspecified, the first produced
+            frame is the first frame of the video.
+        end : int or None, optional
+            The number of the last produced frame. When ``None`` or unspecified, the last produced
+            frame is the last frame of the video.
+
+        Returns
+        -------
+        frames : iterator of VideoFileFrame
+            An iterable of the frames of the video in the range.
+
+        Raises
+        ------
+        ValueError
+            If the number of the first produced frame is less than one.
+        """
+
+        if start is None:
+            start = 1
+        if start < 1:
+            raise ValueError('Frame indexing is one-based')
+        self._iterable.close()
+        self._first_frame_number = start
+        self._last_frame_number = end
+        self._iterable = self._read_video(start, end)
+        return self
+
+    def sampled_frame_numbers(self, frame_numbers):
+        """Selects the frames produced by the video without decoding them.
+
+        Notes
+        -----
+        When a sampling framerate is specified, the elapsed times of the frames are read from the
+        cached index. Without the index, the framerate of the video is used instead.
+
+        Parameters
+        ----------
+        frame_numbers : iterable of int
+            The numbers of frames in ascending order.
+
+        Returns
+        -------
+        sampled_frame_numbers : list of int
+            The numbers of the frames that the video produces in its current range of frames.
+        """
+
+        first_frame_number = self._first_frame_number
+        last_frame_number = self._last_frame_number
+        frame_numbers = np.asarray(frame_numbers, dtype=np.int64)
+        frame_numbers = frame_numbers[frame_numbers >= first_frame_number]
+        if last_frame_number is not None:
+            frame_numbers = frame_numbers[frame_numbers <= last_frame_number]
+        if self._sample_fps is None:
+            is_sampled = (frame_numbers - first_frame_number) % self._frame_stride == 0
+        else:
+            num_frames = int(frame_numbers[-1]) if len(frame_numbers) else 0
+            timestamps = self._timestamps
+            if timestamps is not None and num_frames <= len(timestamps):
+                seconds = timestamps[:num_frames] / 1000.0
+            else:
+                seconds = np.arange(num_frames) / self._fps
+            sample_numbers = np.floor(np.append(-1.0, seconds * self._sample_fps + 1e-6))
+            is_sampled = (frame_numbers == first_frame_number) | (
+                sample_numbers[frame_numbers] != sample_numbers[frame_numbers - 1]
+            )
+        return [int(frame_number) for frame_number in frame_numbers[is_sampled]]
+
+    def cache_key(self, frame_range=True):
+        """Returns a key that identifies the frames produced by the video in caches.
+
+        Parameters
+        ----------
+        frame_range : bool, optional
+            Whether the key identifies the range of frames produced by the video, so that videos
+            that produce different ranges of frames of the same video file have different keys.
+            True if unspecified.
+
+        Returns
+        -------
+        key : str
+            A key that consists of the resolved pathname, the size, and the time of the last
+            modification of the video file, of the frame stride, and of the sampling framerate.
+            The key changes when the video file is modified.
+
+        Raises
+        ------
+        OSError
+            If the video file does not exist.
+        """
+
+        key = '{}\0{}\0{}'.format(_file_key(self._pathname), self._frame_stride, self._sample_fps)
+        if frame_range:
+            key = '{}\0{}\0{}'.format(key, self._first_frame_number, self._last_frame_number)
+        return key
+
+    def _read_video(self, first_frame_number, last_frame_number):
+        pathname = self._pathname
+        verbose = self._verbose
+        if first_frame_number == 1 and self._cap.get(cv.CAP_PROP_POS_FRAMES) > 0:
+            self._cap.release()  # rewinding by reopening is exact even where seeking is unsupported
+        if not self._cap.isOpened():
+            self._cap.open(pathname)
         if not self._cap.isOpened():
             raise OSError('Unable to open video file "{}"'.format(pathname))
-        frame_number = 0
+        if first_frame_number == 1 and last_frame_number is None and self._timestamps is None \
+                and CONFIGURATION.getboolean('cache_index'):
+            timestamps = []
+        else:
+            timestamps = None
+        decoded_frames = _decode_frames(
+            self._cap,
+            first_frame_number,
+            last_frame_number,
+            self._frame_stride,
+            self._sample_fps,
+            timestamps,
+            self._buffer_pool,
+        )
+        if self._prefetch:
+            prefetch_queue_size = CONFIGURATION.getint('prefetch_queue_size')
+            decoded_frames = _prefetch_frames(decoded_frames, prefetch_queue_size)
         first_frame_time = datetime.now()
-        while True:
-            video_duration = timedelta(milliseconds=self._cap.get(cv.CAP_PROP_POS_MSEC))
-            frame_number += 1
-            retval, bgr_frame_image = self._cap.read()
-            if not retval:
-                self._cap.release()
-                if verbose:
-                    print()
-                break
-            rgba_frame_image = cv.cvtColor(bgr_frame_image, cv.COLOR_BGR2RGBA)
-            yield VideoFileFrame(self, frame_number, video_duration, rgba_frame_image)
-            if verbose:
-                last_frame_time = datetime.now()
-                conversion_duration = last_frame_time - first_frame_time
-                try:
-                    conversion_speed = (
-                        video_duration.total_seconds() /
-                        conversion_duration.total_seconds()
-                    )
-                except ZeroDivisionError:
-                    conversion_speed = 0
-                status = '\rReading {}: frame {}, time {}, speed {:.2f}x'.format(
-                    pathname,
+        first_video_duration = None
+        try:
+            for frame_number, video_duration, bgr_frame_image in decoded_frames:
+                yield VideoFileFrame(
+                    self,
                     frame_number,
                     video_duration,
-                    conversion_speed,
+                    bgr_frame_image,
+                    self._buffer_pool,
                 )
-                print(status, end='')
+                if verbose:
+                    if first_video_duration is None:
+                        first_video_duration = video_duration
+                    last_frame_time = datetime.now()
+                    conversion_duration = last_frame_time - first_frame_time
+                    try:
+                        conversion_speed = (
+                            (video_duration - first_video_duration).total_seconds() /
+                            conversion_duration.total_seconds()
+                        )
+                    except ZeroDivisionError:
+                        conversion_speed = 0
+                    status = '\rReading {}: frame {}, time {}, speed {:.2f}x'.format(
+                        pathname,
+                        frame_number,
+                        video_duration,
+                        conversion_speed,
+                    )
+                    print(status, end='')
+        finally:
+            decoded_frames.close()
+        if timestamps:
+            self._timestamps = np.array(timestamps, dtype=np.float64)
+            _save_index(pathname, self._timestamps)
+        if last_frame_number is None:
+            self._cap.release()  # a bounded range keeps the position for the next range
+        if verbose:
+            print()
 
     def __next__(self):
         return next(self._iterable)
 
-    def __del__(self):
+    def close(self):
+        """Stops reading the video file, and releases the video file.
+
+        Notes
+        -----
+        If frame prefetching is enabled, the background decoder thread is stopped. After the video
+        file has been released, no more frames will be produced.
+        """
+        self._iterable.close()
         self._cap.release()
+
+    def __del__(self):
+        if hasattr(self, '_iterable'):  # the initialization may have raised an exception
+            self.close()
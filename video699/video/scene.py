@@ -5,40 +5,109 @@
 """
 
 from collections.abc import Iterator
+from logging import getLogger
 
+import cv2 as cv
 import numpy as np
 
+from ..common import RGBA_DISTANCE_PER_GRAY_DISTANCE
 from ..configuration import get_configuration
 from ..interface import VideoABC
+from ..quadrangle.geos import GEOSConvexQuadrangle
+from ..screen.cached import CachedScreenDetector
 
 
+LOGGER = getLogger(__name__)
 CONFIGURATION = get_configuration()['FrameImageDistanceSceneDetector']
+SCREEN_REGION_CONFIGURATION = get_configuration()['ScreenRegionSceneDetector']
+ADAPTIVE_THRESHOLD_CONFIGURATION = get_configuration()['AdaptiveThresholdSceneDetector']
 
 
 class FrameImageDistanceSceneDetector(VideoABC, Iterator):
-    def __init__(self, video):
+    """A video that consists of the frames of a video, which start a new scene.
+
+    A frame starts a new scene if the mean distance between the image data of the frame and the
+    image data of the frame that started the previous scene exceeds a threshold.
+
+    When a low-resolution proxy of the video is provided, the distances are computed from the
+    grayscale image data of the proxy frames, and the threshold is specified by the
+    ``max_mean_proxy_distance`` configuration option. Only the frames of the original video that
+    start a new scene are then read from the original video, which needs to support the
+    repositioning to a range of frames using the ``frames`` method, such as
+    :class:`video699.video.file.VideoFile`, which decodes the consecutive ranges forward from its
+    current position.
+
+    When thumbnails are requested, the distances are computed from the downscaled grayscale image
+    data of the frames in the ``thumbnail_image`` attribute using integer arithmetic, and the
+    threshold is specified by the ``max_mean_distance`` configuration option. Since the RGBA image
+    data contain an alpha channel that is the same in all frames, the mean distance between the
+    grayscale image data is scaled by 3/4. The scaling calibrates the threshold to the true mean
+    absolute difference between the RGBA image data. The frames that do not start a new scene are
+    released using :meth:`FrameABC.release`.
+
+    Otherwise, the distances are computed from the RGBA image data of the frames of the original
+    video, and the threshold is specified by the ``max_mean_distance`` configuration option. The
+    image data are subtracted as unsigned 8-bit integers, so a pixel whose value decreases by
+    :math:`d` contributes :math:`256 - d` rather than :math:`d`. These distances are therefore not
+    comparable with the distances between thumbnails. Small decreases caused by noise already
+    produce large distances.
+
+    .. _RFC3987: https://tools.ietf.org/html/rfc3987
+
+    Parameters
+    ----------
+    video : VideoABC
+        The original video.
+    proxy_video : VideoABC or None, optional
+        A low-resolution proxy of the original video that produces the frames with the same frame
+        numbers as the original video. ``None`` if unspecified.
+    thumbnails : bool, optional
+        Whether the distances are computed from the downscaled grayscale image data of the frames.
+        Thumbnails are not used with a low-resolution proxy. False if unspecified.
+
+    Attributes
+    ----------
+    fps : int
+        The framerate of the video in frames per second.
+    width : int
+        The width of the video.
+    height : int
+        The height of the video.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program.
+    """
+
+    def __init__(self, video, proxy_video=None, thumbnails=False):
         self._video = video
-        self._iterable = self._read_video()
+        if proxy_video is not None:
+            self._iterable = self._read_proxy_video(proxy_video)
+        elif thumbnails:
+            self._iterable = self._read_thumbnails()
+        else:
+            self._iterable = self._read_video()
 
     @property
     def fps(self):
-        return self._video._fps
+        return self._video.fps
 
     @property
     def width(self):
-        return self._video._width
+        return self._video.width
 
     @property
     def height(self):
-        return self._video._height
+        return self._video.height
 
     @property
     def datetime(self):
-        return self._video._datetime
+        return self._video.datetime
 
     @property
     def uri(self):
-        return self._video._uri
+        return self._video.uri
 
     def __iter__(self):
         return self
@@ -60,5 +129,429 @@ class FrameImageDistanceSceneDetector(VideoABC, Iterator):
                     previous_frame = current_frame
                     yield current_frame
 
+    def _read_thumbnails(self):
+        max_mean_distance = CONFIGURATION.getfloat('max_mean_distance')
+        previous_image = None
+        max_distance = None
+        for current_frame in self._video:
+            current_image = current_frame.thumbnail_image
+            if previous_image is not None:
+                distance = cv.norm(current_image, previous_image, cv.NORM_L1)
+                if distance <= max_distance:
+                    current_frame.release()
+                    continue
+            else:
+                max_distance = max_mean_distance / RGBA_DISTANCE_PER_GRAY_DISTANCE * 255.0 * \
+                    current_image.size
+            previous_image = current_image
+            yield current_frame
+
+    def _read_proxy_video(self, proxy_video):
+        max_mean_proxy_distance = CONFIGURATION.getfloat('max_mean_proxy_distance')
+        previous_image = None
+        for proxy_frame in proxy_video:
+            current_image = proxy_frame.gray_image
+            if previous_image is not None:
+                mean_distance = np.mean(cv.absdiff(current_image, previous_image)) / 255.0
+                if mean_distance <= max_mean_proxy_distance:
+                    proxy_frame.release()
+                    continue
+            previous_image = current_image.copy()
+            proxy_frame.release()
+            frame_number = proxy_frame.number
+            for current_frame in self._video.frames(frame_number, frame_number):
+                yield current_frame
+
+    def __next__(self):
+        return next(self._iterable)
+
+
+class ScreenRegionSceneDetector(VideoABC, Iterator):
+    """A video that consists of the frames of a video, which start a new scene in projection screens.
+
+    Lit projection screens are detected in every frame that starts a new scene. A frame starts a new
+    scene if the mean distance between the image data inside any of the projection screens in the
+    frame and the image data inside the same projection screen in the frame that started the
+    previous scene exceeds the threshold specified by the ``max_mean_screen_distance``
+    configuration option. Small changes outside the projection screens, such as the motion of the
+    lecturer and the audience, are disregarded. The image data inside the projection screens are
+    warped to the screen coordinate system from the downscaled grayscale image data of the frames in
+    the ``thumbnail_image`` attribute. A frame also starts a new scene if the mean distance between
+    the downscaled grayscale image data of the whole frame and of the frame that started the
+    previous scene exceeds the looser threshold specified by the ``max_mean_frame_distance``
+    configuration option, so that a projection screen lit outside the known projection screens
+    is detected.
+
+    When no projection screens were detected in the frame that started the previous scene, the
+    distances are computed from the downscaled grayscale image data of the whole frames as in
+    :class:`FrameImageDistanceSceneDetector` with thumbnails.
+
+    The screens detected in the produced frames are reused by the screen detector in the
+    :attr:`screen_detector` attribute, which should be passed to a screen event detector, so that
+    screens are detected only once in every produced frame.
+
+    .. _RFC3987: https://tools.ietf.org/html/rfc3987
+
+    Notes
+    -----
+    It is not possible to repeatedly iterate over all video frames.
+    The frames that do not start a new scene are released using :meth:`FrameABC.release`.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The original video.
+    screen_detector : ScreenDetectorABC
+        The screen detector that will be used to detect lit projection screens in video frames.
+
+    Attributes
+    ----------
+    fps : int
+        The framerate of the video in frames per second.
+    width : int
+        The width of the video.
+    height : int
+        The height of the video.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program.
+    screen_detector : ScreenDetectorABC
+        A screen detector that reuses the screens detected by the scene detector in the produced
+        frames.
+    """
+
+    def __init__(self, video, screen_detector):
+        self._video = video
+        self.screen_detector = CachedScreenDetector(screen_detector)
+        self._iterable = self._read_video()
+
+    @property
+    def fps(self):
+        return self._video.fps
+
+    @property
+    def width(self):
+        return self._video.width
+
+    @property
+    def height(self):
+        return self._video.height
+
+    @property
+    def datetime(self):
+        return self._video.datetime
+
+    @property
+    def uri(self):
+        return self._video.uri
+
+    def __iter__(self):
+        return self
+
+    def _detect_screen_regions(self, frame):
+        """Detects the regions of lit projection screens in the downscaled image data of a frame.
+
+        Parameters
+        ----------
+        frame : FrameABC
+            A frame of a video.
+
+        Returns
+        -------
+        quadrangles : list of ConvexQuadrangleABC
+            Maps between the coordinate system of the downscaled image data of the frame, and the
+            coordinate systems of the detected projection screens. Screens that are less than two
+            pixels wide or high in the downscaled image data are omitted.
+        """
+
+        thumbnail_height, thumbnail_width = frame.thumbnail_image.shape
+        scale_x = thumbnail_width / frame.width
+        scale_y = thumbnail_height / frame.height
+        quadrangles = []
+        for screen in self.screen_detector.detect_and_cache(frame):
+            coordinates = screen.coordinates
+            quadrangle = GEOSConvexQuadrangle(*(
+                (x * scale_x, y * scale_y)
+                for x, y in (
+                    coordinates.top_left,
+                    coordinates.top_right,
+                    coordinates.bottom_left,
+                    coordinates.bottom_right,
+                )
+            ))
+            if quadrangle.width >= 2 and quadrangle.height >= 2:
+                quadrangles.append(quadrangle)
+        return quadrangles
+
+    def _read_video(self):
+        max_mean_screen_distance = SCREEN_REGION_CONFIGURATION.getfloat('max_mean_screen_distance')
+        max_mean_frame_distance = SCREEN_REGION_CONFIGURATION.getfloat('max_mean_frame_distance')
+        max_mean_distance = CONFIGURATION.getfloat('max_mean_distance') / \
+            RGBA_DISTANCE_PER_GRAY_DISTANCE
+
+        quadrangles = None
+        previous_images = None
+        for current_frame in self._video:
+            current_image = current_frame.thumbnail_image
+            if quadrangles is not None:
+                if quadrangles:
+                    current_images = [quadrangle.transform(current_image) for quadrangle in quadrangles]
+                    current_images.append(current_image)
+                    max_mean_distances = [max_mean_screen_distance] * len(quadrangles)
+                    max_mean_distances.append(max_mean_frame_distance)
+                else:
+                    current_images = [current_image]
+                    max_mean_distances = [max_mean_distance]
+                is_changed = any(
+                    cv.norm(image, previous_image, cv.NORM_L1) > distance * 255.0 * image.size
+                    for image, previous_image, distance
+                    in zip(current_images, previous_images, max_mean_distances)
+                )
+                if not is_changed:
+                    current_frame.release()
+                    continue
+            quadrangles = self._detect_screen_regions(current_frame)
+            previous_images = [quadrangle.transform(current_image) for quadrangle in quadrangles]
+            previous_images.append(current_image)
+            LOGGER.debug('{} starts a new scene with {} screens'.format(current_frame, len(quadrangles)))
+            yield current_frame
+
+    def __next__(self):
+        return next(self._iterable)
+
+
+class AdaptiveThresholdSceneDetector(VideoABC, Iterator):
+    """A video that consists of the frames of a video, whose distances to previous frames are outliers.
+
+    For every frame, a compact signature is computed by downscaling the grayscale image data of the
+    frame in the ``thumbnail_image`` attribute to the block means specified by the
+    ``signature_width``, and ``signature_height`` configuration options. The distance between a
+    frame and the previous frame is the mean absolute difference between their signatures in the
+    range [0; 1]. An exponentially weighted running mean, and variance of the distances are
+    maintained with the smoothing factor specified by the ``smoothing_factor`` configuration
+    option. A frame starts a new scene if the distance exceeds the running mean both by more than
+    the number of running standard deviations specified by the ``num_standard_deviations``
+    configuration option, and by more than the ``min_distance_difference`` configuration option.
+    The distances that start a new scene are not used to update the running statistics. No scenes
+    are started until the number of distances specified by the ``num_warmup_distances``
+    configuration option has been observed.
+
+    Unlike :class:`FrameImageDistanceSceneDetector`, the threshold adapts to the noise, and to the
+    motion in a video, so that it does not need to be tuned for every room, and every camera.
+
+    .. _RFC3987: https://tools.ietf.org/html/rfc3987
+
+    Notes
+    -----
+    It is not possible to repeatedly iterate over all video frames.
+    The detector runs in constant memory. The frames that do not start a new scene are released
+    using :meth:`FrameABC.release`.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The original video.
+
+    Attributes
+    ----------
+    fps : int
+        The framerate of the video in frames per second.
+    width : int
+        The width of the video.
+    height : int
+        The height of the video.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program.
+    mean_distance : float
+        The running mean of the distances between consecutive frames.
+    variance_distance : float
+        The running variance of the distances between consecutive frames.
+    """
+
+    def __init__(self, video):
+        self._video = video
+        self.mean_distance = 0.0
+        self.variance_distance = 0.0
+        self._iterable = self._read_video()
+
+    @property
+    def fps(self):
+        return self._video.fps
+
+    @property
+    def width(self):
+        return self._video.width
+
+    @property
+    def height(self):
+        return self._video.height
+
+    @property
+    def datetime(self):
+        return self._video.datetime
+
+    @property
+    def uri(self):
+        return self._video.uri
+
+    def __iter__(self):
+        return self
+
+    def _read_video(self):
+        signature_size = (
+            ADAPTIVE_THRESHOLD_CONFIGURATION.getint('signature_width'),
+            ADAPTIVE_THRESHOLD_CONFIGURATION.getint('signature_height'),
+        )
+        smoothing_factor = ADAPTIVE_THRESHOLD_CONFIGURATION.getfloat('smoothing_factor')
+        num_standard_deviations = ADAPTIVE_THRESHOLD_CONFIGURATION.getfloat('num_standard_deviations')
+        min_distance_difference = ADAPTIVE_THRESHOLD_CONFIGURATION.getfloat('min_distance_difference')
+        num_warmup_distances = ADAPTIVE_THRESHOLD_CONFIGURATION.getint('num_warmup_distances')
+        distance_scale = 1.0 / (255.0 * signature_size[0] * signature_size[1])
+
+        previous_signature = None
+        num_distances = 0
+        for current_frame in self._video:
+            current_signature = cv.resize(
+                current_frame.thumbnail_image,
+                signature_size,
+                interpolation=cv.INTER_AREA,
+            )
+            if previous_signature is None:
+                previous_signature = current_signature
+                yield current_frame
+                continue
+
+            distance = cv.norm(current_signature, previous_signature, cv.NORM_L1) * \
+                distance_scale
+            previous_signature = current_signature
+            if num_distances >= num_warmup_distances:
+                max_distance_difference = max(
+                    num_standard_deviations * self.variance_distance ** 0.5,
+                    min_distance_difference,
+                )
+                if distance - self.mean_distance > max_distance_difference:
+                    LOGGER.debug('{} starts a new scene with distance {:.4f}'.format(
+                        current_frame,
+                        distance,
+                    ))
+                    yield current_frame
+                    continue
+
+            if num_distances == 0:
+                self.mean_distance = distance
+            else:
+                difference = distance - self.mean_distance
+                increment = smoothing_factor * difference
+                self.mean_distance += increment
+                self.variance_distance = (1.0 - smoothing_factor) * (
+                    self.variance_distance + difference * increment
+                )
+            num_distances += 1
+            current_frame.release()
+
+    def __next__(self):
+        return next(self._iterable)
+
+
+class SignatureSceneDetector(VideoABC, Iterator):
+    """A video that consists of the frames of a video, which start a new scene in stored signatures.
+
+    The frames that start a new scene are selected from compact signatures of the video frames
+    stored in advance by :class:`video699.video.signature.FrameSignatures`, so that the scene
+    detection can be repeated with different thresholds without decoding the video again. A frame
+    starts a new scene if the mean distance between the signature of the frame and the signature
+    of the frame that started the previous scene exceeds a threshold. Only the frames that start a
+    new scene are then read from the original video, which needs to support the repositioning to
+    a range of frames using the ``frames`` method, and the selection of the produced frames using
+    the ``sampled_frame_numbers`` method, such as :class:`video699.video.file.VideoFile`.
+
+    .. _RFC3987: https://tools.ietf.org/html/rfc3987
+
+    Notes
+    -----
+    It is not possible to repeatedly iterate over all video frames.
+    The frames that do not start a new scene are not decoded.
+    The signatures may be stored for a superset of the frames produced by the original video, such
+    as for all frames of a video file, whose frames are sampled, or restricted to a time range.
+    The frames produced by the original video, for which no signature is stored, are disregarded.
+    The same frames are selected as by :meth:`FrameSignatures.select_scenes` for the frames
+    produced by the original video.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The original video.
+    signatures : FrameSignatures
+        The stored signatures of the frames of the original video.
+    max_mean_distance : float or None, optional
+        The highest mean distance between video frames, in the range [0; 1], before a scene
+        transition is detected. When unspecified or ``None``, the ``max_mean_distance``
+        configuration option is used.
+
+    Attributes
+    ----------
+    fps : int
+        The framerate of the video in frames per second.
+    width : int
+        The width of the video.
+    height : int
+        The height of the video.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program.
+
+    Raises
+    ------
+    ValueError
+        If the signatures were not stored for the original video.
+    """
+
+    def __init__(self, video, signatures, max_mean_distance=None):
+        if signatures.uri != video.uri:
+            raise ValueError('The signatures of {} do not belong to {}'.format(signatures.uri, video))
+        if max_mean_distance is None:
+            max_mean_distance = CONFIGURATION.getfloat('max_mean_distance')
+        self._video = video
+        self._signatures = signatures
+        self._max_mean_distance = max_mean_distance
+        self._iterable = self._read_video()
+
+    @property
+    def fps(self):
+        return self._video.fps
+
+    @property
+    def width(self):
+        return self._video.width
+
+    @property
+    def height(self):
+        return self._video.height
+
+    @property
+    def datetime(self):
+        return self._video.datetime
+
+    @property
+    def uri(self):
+        return self._video.uri
+
+    def __iter__(self):
+        return self
+
+    def _read_video(self):
+        signatures = self._signatures
+        frame_numbers = self._video.sampled_frame_numbers(signatures.frame_numbers)
+        for frame_number in signatures.select_scenes(self._max_mean_distance, frame_numbers):
+            for current_frame in self._video.frames(frame_number, frame_number):
+                yield current_frame
+
     def __next__(self):
         return next(self._iterable)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements a video, whose frames are stored in shared memory, so that they can be
+passed to worker processes without copying the image data.
+
+"""
+
+from ..frame.shared import SharedMemoryFrame
+from ..interface import VideoABC
+
+
+class SharedMemoryVideo(VideoABC):
+    """A video, whose frames are copied to shared memory.
+
+    The frames of the original video are copied to blocks of shared memory as
+    :class:`video699.frame.shared.SharedMemoryFrame` frames, and the original frames are released.
+
+    .. _RFC3987: https://tools.ietf.org/html/rfc3987
+
+    Notes
+    -----
+    It is possible to repeatedly iterate over all video frames if it is possible to repeatedly
+    iterate over all frames of the original video.
+    A consumer SHOULD release every produced frame using :meth:`FrameABC.release`, so that the block
+    of shared memory is freed. A consumer that passes a frame to worker processes SHOULD acquire an
+    additional reference using :meth:`video699.frame.shared.SharedMemoryFrame.retain`, and release it
+    after the worker processes have finished.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The original video.
+
+    Attributes
+    ----------
+    fps : scalar
+        The framerate of the video in frames per second.
+    width : int
+        The width of the video.
+    height : int
+        The height of the video.
+    datetime : aware datetime
+        The date, and time at which the video was captured.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program.
+    """
+
+    def __init__(self, video):
+        self._video = video
+
+    @property
+    def fps(self):
+        return self._video.fps
+
+    @property
+    def width(self):
+        return self._video.width
+
+    @property
+    def height(self):
+        return self._video.height
+
+    @property
+    def datetime(self):
+        return self._video.datetime
+
+    @property
+    def uri(self):
+        return self._video.uri
+
+    def __iter__(self):
+        for frame in self._video:
+            shared_frame = SharedMemoryFrame(self, frame.number, frame.duration, image=frame.image)
+            frame.release()
+            yield shared_frame
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements storing compact signatures of video frames in a memory-mapped file, and
+selecting the frames that start a new scene from the stored signatures.
+
+"""
+
+from collections.abc import Sized
+from hashlib import sha256
+from logging import getLogger
+import os
+
+import cv2 as cv
+import numpy as np
+
+from ..common import RGBA_DISTANCE_PER_GRAY_DISTANCE
+from ..configuration import get_cache_dirname, get_configuration
+
+
+LOGGER = getLogger(__name__)
+CONFIGURATION = get_configuration()['FrameSignatures']
+
+
+def _cache_key(video):
+    """Returns a key that identifies the frames of a video in the cache of frame signatures.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The video.
+
+    Returns
+    -------
+    key : str
+        The key produced by the ``cache_key`` method of the video, such as
+        :meth:`video699.video.file.VideoFile.cache_key`, which consists of the identity of the video
+        file, of the frame stride, and of the sampling framerate, but not of the range of frames,
+        so that the signatures can be reused for any subset of the frames.
+
+    Raises
+    ------
+    ValueError
+        If the video does not produce a key, since the URI of a video does not identify the
+        sampling of the produced frames, or the modifications of the video.
+    """
+
+    cache_key = getattr(video, 'cache_key', None)
+    if cache_key is None:
+        raise ValueError('The frames of {} cannot be identified in the cache'.format(video))
+    return cache_key(frame_range=False)
+
+
+def _cache_pathnames(key, width, height):
+    """Returns the pathnames of the stored signatures of video frames, and of their index.
+
+    Parameters
+    ----------
+    key : str
+        A key that identifies the frames of the video.
+    width : int
+        The width of the signatures.
+    height : int
+        The height of the signatures.
+
+    Returns
+    -------
+    signatures_pathname : str
+        The pathname of a raw array file that contains the signatures of the video frames.
+    index_pathname : str
+        The pathname of a NumPy array file that contains the frame numbers of the video frames.
+    """
+
+    digest = sha256('{}\0{}\0{}'.format(key, width, height).encode('utf8'))
+    pathname = os.path.join(get_cache_dirname('frame-signatures'), digest.hexdigest())
+    return ('{}.signatures'.format(pathname), '{}.npy'.format(pathname))
+
+
+class FrameSignatures(Sized):
+    """Compact signatures of all frames in a video stored in a memory-mapped file.
+
+    The signature of a video frame is the downscaled grayscale image data of the frame in the
+    ``thumbnail_image`` attribute, further downscaled to the block means specified by the
+    ``signature_width``, and ``signature_height`` configuration options. The signatures are computed
+    only once, and stored in a raw array file in the XDG cache directory keyed by the dimensions of
+    the signatures, and by the key produced by the ``cache_key`` method of the video, such as
+    :meth:`video699.video.file.VideoFile.cache_key`, i.e. by the pathname, the size, and the time of
+    the last modification of the video file, by the frame stride, and by the sampling framerate.
+    Subsequent instances for the same key read the signatures from the memory-mapped file without
+    decoding the video.
+
+    Notes
+    -----
+    If the signatures are not stored, all frames of the video are read, when the class is
+    instantiated. Videos with the same key MUST produce the same frames. Therefore, the signatures
+    SHOULD be stored for a video that produces all frames, so that they can be reused for any
+    subset of the frames.
+
+    Parameters
+    ----------
+    video : VideoABC
+        The video.
+
+    Attributes
+    ----------
+    uri : string
+        The IRI of the video.
+    frame_numbers : array_like
+        The frame numbers of the video frames.
+    signatures : array_like
+        The signatures of the video frames as a read-only memory-mapped array of OpenCV CV_8UC1
+        grayscale matrices.
+
+    Raises
+    ------
+    ValueError
+        If the video has no ``cache_key`` method.
+    """
+
+    def __init__(self, video):
+        width = CONFIGURATION.getint('signature_width')
+        height = CONFIGURATION.getint('signature_height')
+        self.uri = video.uri
+
+        signatures_pathname, index_pathname = _cache_pathnames(_cache_key(video), width, height)
+        try:
+            frame_numbers = np.load(index_pathname)
+            LOGGER.debug('Loaded frame signatures of {} from {}'.format(video, signatures_pathname))
+        except (OSError, ValueError):
+            frame_numbers = self._store(video, width, height, signatures_pathname, index_pathname)
+        self.frame_numbers = frame_numbers
+        if len(frame_numbers):
+            self.signatures = np.memmap(
+                signatures_pathname,
+                dtype=np.uint8,
+                mode='r',
+                shape=(len(frame_numbers), height, width),
+            )
+        else:
+            self.signatures = np.empty((0, height, width), dtype=np.uint8)
+
+    def _store(self, video, width, height, signatures_pathname, index_pathname):
+        """Computes the signatures of all frames in a video, and stores them in the cache.
+
+        Parameters
+        ----------
+        video : VideoABC
+            The video.
+        width : int
+            The width of the signatures.
+        height : int
+            The height of the signatures.
+        signatures_pathname : str
+            The pathname of a raw array file that will contain the signatures of the video frames.
+        index_pathname : str
+            The pathname of a NumPy array file that will contain the frame numbers of the video
+            frames.
+
+        Returns
+        -------
+        frame_numbers : array_like
+            The frame numbers of the video frames.
+        """
+
+        temporary_pathname = '{}.{}.tmp'.format(signatures_pathname, os.getpid())
+        frame_numbers = []
+        with open(temporary_pathname, 'wb') as f:
+            for frame in video:
+                signature = cv.resize(
+                    frame.thumbnail_image,
+                    (width, height),
+                    interpolation=cv.INTER_AREA,
+                )
+                f.write(np.ascontiguousarray(signature).tobytes())
+                frame_numbers.append(frame.number)
+                frame.release()
+        frame_numbers = np.array(frame_numbers, dtype=np.int64)
+        os.replace(temporary_pathname, signatures_pathname)
+        np.save(index_pathname, frame_numbers)
+        LOGGER.debug('Stored frame signatures of {} in {}'.format(video, signatures_pathname))
+        return frame_numbers
+
+    def select_scenes(self, max_mean_distance, frame_numbers=None):
+        """Selects the frames that start a new scene.
+
+        A frame starts a new scene if the mean distance between the signature of the frame and the
+        signature of the frame that started the previous scene exceeds a threshold. The threshold
+        has the same meaning as the ``max_mean_distance`` configuration option of
+        :class:`video699.video.scene.FrameImageDistanceSceneDetector`, i.e. the mean distance
+        between the grayscale signatures is scaled by 3/4 to account for the alpha channel in the
+        RGBA image data.
+
+        Parameters
+        ----------
+        max_mean_distance : float
+            The highest mean distance between video frames, in the range [0; 1], before a scene
+            transition is detected.
+        frame_numbers : iterable of int or None, optional
+            When not ``None``, only the frames with the numbers are considered, such as the frames
+            produced by a video, whose frames are sampled, or restricted to a time range. ``None``
+            if unspecified.
+
+        Returns
+        -------
+        frame_numbers : list of int
+            The frame numbers of the video frames that start a new scene.
+        """
+
+        signatures = np.asarray(self.signatures)
+        stored_frame_numbers = np.asarray(self.frame_numbers)
+        if frame_numbers is not None:
+            is_selected = np.isin(stored_frame_numbers, list(frame_numbers))
+            signatures = signatures[is_selected]
+            stored_frame_numbers = stored_frame_numbers[is_selected]
+        if not len(signatures):
+            return []
+        max_distance = max_mean_distance / RGBA_DISTANCE_PER_GRAY_DISTANCE * 255.0 * \
+            signatures[0].size
+        frame_numbers = [int(stored_frame_numbers[0])]
+        previous_signature = signatures[0]
+        for frame_number, signature in zip(stored_frame_numbers[1:], signatures[1:]):
+            if cv.norm(signature, previous_signature, cv.NORM_L1) > max_distance:
+                frame_numbers.append(int(frame_number))
+                previous_signature = signature
+        return frame_numbers
+
+    def __getitem__(self, frame_number):
+        """Produces the signature of a video frame.
+
+        Parameters
+        ----------
+        frame_number : int
+            The frame number of the video frame.
+
+        Returns
+        -------
+        signature : array_like
+            The signature of the video frame as an OpenCV CV_8UC1 grayscale matrix.
+
+        Raises
+        ------
+        KeyError
+            If no signature is stored for the video frame.
+        """
+        frame_numbers = self.frame_numbers
+        index = int(np.searchsorted(frame_numbers, frame_number))
+        if index >= len(frame_numbers) or frame_numbers[index] != frame_number:
+            raise KeyError('No signature is stored for frame #{}'.format(frame_number))
+        return np.asarray(self.signatures[index])
+
+    def __len__(self):
+        """Produces the number of stored video frame signatures.
+
+        Returns
+        -------
+        length : int
+            The number of stored video frame signatures.
+        """
+        return len(self.frame_numbers)
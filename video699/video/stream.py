@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+
+"""This module implements reading a live video from a pipe, a device, or a network stream.
+
+"""
+
+from collections import deque
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+import os
+from pathlib import Path
+from threading import Condition, Thread
+from time import monotonic
+
+import cv2 as cv
+
+from ..configuration import get_configuration
+from ..interface import VideoABC
+from ..frame.pool import FrameBufferPool
+from .file import VideoFileFrame
+
+
+LOGGER = getLogger(__name__)
+CONFIGURATION = get_configuration()['StreamVideo']
+DROP_POLICIES = ('drop-oldest', 'keep-latest')
+
+
+def _source_uri(source):
+    """Produces a URI of a video source.
+
+    Parameters
+    ----------
+    source : str or int
+        A pathname of a pipe or a device, a URL of a network stream, or an index of a video capture
+        device.
+
+    Returns
+    -------
+    uri : str
+        The URI of the video source.
+    """
+
+    if isinstance(source, int):
+        return 'device:{}'.format(source)
+    if '://' in source:
+        return source
+    return Path(source).resolve().as_uri()
+
+
+class _CaptureState(object):
+    """The state shared by a live video and the background thread that captures its frames.
+
+    Attributes
+    ----------
+    frames : deque of (float, int, timedelta, array_like)
+        The capture times, the frame numbers, the elapsed times, and the image data of the captured
+        frames that wait to be processed.
+    condition : Condition
+        A condition variable that guards the state, and that is notified when a frame is captured,
+        or when the capture finishes.
+    is_stopped : bool
+        Whether the capture has been requested to stop.
+    is_finished : bool
+        Whether the capture has finished.
+    num_captured_frames : int
+        The number of frames captured so far.
+    num_dropped_frames : int
+        The number of frames dropped so far.
+    """
+
+    def __init__(self):
+        self.frames = deque()
+        self.condition = Condition()
+        self.is_stopped = False
+        self.is_finished = False
+        self.num_captured_frames = 0
+        self.num_dropped_frames = 0
+
+
+def _drop_frame(state, frame_record, buffer_pool, uri):
+    """Drops a captured frame.
+
+    Parameters
+    ----------
+    state : _CaptureState
+        The state shared with the background thread that captured the frame.
+    frame_record : (float, int, timedelta, array_like)
+        The capture time, the frame number, the elapsed time, and the image data of the frame.
+    buffer_pool : FrameBufferPool or None
+        The frame buffer pool, from which the buffer of the frame was acquired, or ``None``.
+    uri : str
+        The URI of the video.
+    """
+
+    _, frame_number, _, bgr_frame_image = frame_record
+    LOGGER.debug('Dropped frame #{} of {}'.format(frame_number, uri))
+    state.num_dropped_frames += 1
+    if buffer_pool is not None:
+        buffer_pool.release(bgr_frame_image)
+
+
+def _capture_frames(cap, state, shape, queue_size, start_time, buffer_pool, uri):
+    """Captures video frames into a bounded queue until the video ends, or the capture is stopped.
+
+    Notes
+    -----
+    The function is executed by a background thread, which never holds a reference to the video, so
+    that the video can be finalized, and the capture stopped, while the thread is running. The video
+    capture is released when the function returns.
+
+    Parameters
+    ----------
+    cap : cv.VideoCapture
+        An opened OpenCV video capture.
+    state : _CaptureState
+        The state shared with the video.
+    shape : (int, int, int)
+        The shape of the image data of the captured frames.
+    queue_size : int
+        The maximum number of captured frames waiting to be processed.
+    start_time : float
+        The time of the monotonic clock at which the capture started.
+    buffer_pool : FrameBufferPool or None
+        When not ``None``, the frames are captured into buffers acquired from the frame buffer pool.
+    uri : str
+        The URI of the video.
+    """
+
+    frame_number = 0
+    try:
+        while not state.is_stopped:
+            if not cap.grab():
+                break
+            capture_time = monotonic()
+            if buffer_pool is None:
+                retval, bgr_frame_image = cap.retrieve()
+            else:
+                retval, bgr_frame_image = cap.retrieve(image=buffer_pool.acquire(shape))
+            if not retval:
+                break
+            frame_number += 1
+            video_duration = timedelta(seconds=capture_time - start_time)
+            frame_record = (capture_time, frame_number, video_duration, bgr_frame_image)
+            with state.condition:
+                state.num_captured_frames = frame_number
+                while len(state.frames) >= queue_size:
+                    _drop_frame(state, state.frames.popleft(), buffer_pool, uri)
+                state.frames.append(frame_record)
+                state.condition.notify()
+    finally:
+        cap.release()
+        with state.condition:
+            state.is_finished = True
+            state.condition.notify()
+
+
+class StreamVideo(VideoABC, Iterator):
+    """A live video read from a pipe, a device, or a network stream.
+
+    Video frames are captured in a background thread as soon as they are available, and they are
+    kept in a bounded queue until they are processed. When processing falls behind, frames are
+    dropped according to a drop policy instead of growing an unbounded backlog:
+
+    - ``drop-oldest`` drops the oldest frame in a full queue to make room for a newly captured
+      frame.
+    - ``keep-latest`` keeps only the most recently captured frame, and drops all older frames.
+
+    Additionally, when a frame is older than the latency budget by the time it is requested and a
+    newer frame is available, the frame is dropped.
+
+    .. _RFC3987: https://tools.ietf.org/html/rfc3987
+
+    Notes
+    -----
+    It is not possible to repeatedly iterate over all video frames.
+    The capture is stopped, and the video source is released, when the video is closed, or
+    finalized.
+    Frame numbers count all captured frames, including the dropped frames. The video therefore
+    produces non-consecutive frames when frames are dropped. The elapsed time of a frame is measured
+    by a monotonic clock at the time the frame was captured, so that the ``datetime`` attribute of a
+    frame approximates the wall-clock time at which the frame was captured.
+
+    Parameters
+    ----------
+    source : str or int
+        A pathname of a pipe or a device, a URL of a network stream, or an index of a video capture
+        device.
+    queue_size : int or None, optional
+        The maximum number of captured frames waiting to be processed. When unspecified or
+        ``None``, the ``queue_size`` configuration option is used.
+    drop_policy : str or None, optional
+        The policy for dropping frames, either ``drop-oldest``, or ``keep-latest``. When
+        unspecified or ``None``, the ``drop_policy`` configuration option is used.
+    latency_budget : timedelta or None, optional
+        The age of a frame after which the frame is dropped if a newer frame is available. When
+        unspecified or ``None``, the ``latency_budget`` configuration option is used.
+    buffer_pool : bool or FrameBufferPool, optional
+        Whether video frames will be decoded into buffers acquired from a frame buffer pool. When a
+        :class:`FrameBufferPool` is specified, it will be used instead of a new pool. False if
+        unspecified.
+
+    Attributes
+    ----------
+    fps : scalar
+        The framerate of the video in frames per second. If the stream does not specify the
+        framerate, the ``fps`` configuration option is used.
+    width : int
+        The width of the video.
+    height : int
+        The height of the video.
+    datetime : aware datetime
+        The date, and time at which the capture of the video started, i.e. the date, and time at
+        which the class was instantiated.
+    uri : string
+        An IRI, as defined in RFC3987_, that uniquely indentifies the video over the entire lifetime
+        of a program.
+    latency_budget : timedelta
+        The age of a frame after which the frame is dropped if a newer frame is available.
+    num_captured_frames : int
+        The number of frames captured so far.
+    num_dropped_frames : int
+        The number of frames dropped so far.
+
+    Raises
+    ------
+    OSError
+        If the video source cannot be opened by OpenCV.
+    ValueError
+        If the drop policy is unknown, or if the queue size is not positive.
+    """
+
+    def __init__(self, source, queue_size=None, drop_policy=None,
+                 latency_budget=None, buffer_pool=False):
+        if queue_size is None:
+            queue_size = CONFIGURATION.getint('queue_size')
+        if drop_policy is None:
+            drop_policy = CONFIGURATION['drop_policy']
+        if latency_budget is None:
+            latency_budget = timedelta(seconds=CONFIGURATION.getfloat('latency_budget'))
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError('Unknown drop policy "{}"'.format(drop_policy))
+        if queue_size < 1:
+            raise ValueError('The queue size must be positive')
+        if isinstance(source, str) and source.isdigit() and not os.path.exists(source):
+            source = int(source)
+        cap = cv.VideoCapture(source)
+        if not cap.isOpened():
+            raise OSError('Unable to open video source "{}"'.format(source))
+        self._fps = cap.get(cv.CAP_PROP_FPS) or CONFIGURATION.getfloat('fps')
+        self._width = int(cap.get(cv.CAP_PROP_FRAME_WIDTH))
+        self._height = int(cap.get(cv.CAP_PROP_FRAME_HEIGHT))
+        self._datetime = datetime.now(timezone.utc)
+        self._uri = _source_uri(source)
+        self.latency_budget = latency_budget
+        if buffer_pool is True:
+            buffer_pool = FrameBufferPool()
+        elif buffer_pool is False:
+            buffer_pool = None
+        self._buffer_pool = buffer_pool
+
+        self._state = _CaptureState()
+        self._thread = Thread(
+            target=_capture_frames,
+            args=(
+                cap,
+                self._state,
+                (self._height, self._width, 3),
+                queue_size if drop_policy == 'drop-oldest' else 1,
+                monotonic(),
+                buffer_pool,
+                self._uri,
+            ),
+            name='StreamVideoCapture',
+            daemon=True,
+        )
+        self._thread.start()
+
+    @property
+    def fps(self):
+        return self._fps
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def datetime(self):
+        return self._datetime
+
+    @property
+    def uri(self):
+        return self._uri
+
+    def __iter__(self):
+        return self
+
+    @property
+    def num_captured_frames(self):
+        return self._state.num_captured_frames
+
+    @property
+    def num_dropped_frames(self):
+        return self._state.num_dropped_frames
+
+    def __next__(self):
+        state = self._state
+        with state.condition:
+            while True:
+                while not state.frames and not state.is_finished:
+                    state.condition.wait()
+                if not state.frames:
+                    raise StopIteration
+                frame_record = state.frames.popleft()
+                capture_time = frame_record[0]
+                frame_age = monotonic() - capture_time
+                if state.frames and frame_age > self.latency_budget.total_seconds():
+                    _drop_frame(state, frame_record, self._buffer_pool, self.uri)
+                    continue
+                break
+        _, frame_number, video_duration, bgr_frame_image = frame_record
+        return VideoFileFrame(self, frame_number, video_duration, bgr_frame_image, self._buffer_pool)
+
+    def close(self):
+        """Stops capturing the video, and releases the video source.
+
+        Notes
+        -----
+        The frames that have already been captured are still produced.
+        """
+        self._state.is_stopped = True
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def __del__(self):
+        if hasattr(self, '_thread'):  # the initialization may have raised an exception
+            self.close()